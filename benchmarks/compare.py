@@ -0,0 +1,60 @@
+"""
+Benchmark Comparison for Economy Manager Bot
+Version: 0.5.0
+Prints the change of every timing between two benchmarks.run JSON files
+
+Usage:
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+"""
+
+import argparse
+import json
+from typing import Dict, Iterator, Tuple
+
+# Keys compared between runs; lower is better except for throughput
+LOWER_IS_BETTER = ('p50_ms', 'p99_ms', 'index_p50_ms', 'linear_p50_ms', 'index_build_s', 'seed_s', 'peak_mb')
+HIGHER_IS_BETTER = ('ops_per_s', 'speedup', 'top25_recall')
+
+def flatten(value, path: str = '') -> Iterator[Tuple[str, float]]:
+    """Yield (dotted path, number) for every comparable leaf."""
+    if isinstance(value, dict):
+        # Name list entries by their size/concurrency instead of position
+        for key, child in value.items():
+            if key in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+                if isinstance(child, (int, float)):
+                    yield f"{path}.{key}", float(child)
+            elif isinstance(child, (dict, list)):
+                yield from flatten(child, f"{path}.{key}" if path else key)
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            label = index
+            if isinstance(child, dict):
+                if 'concurrency' in child:
+                    label = f"c{child['concurrency']}"
+                elif 'size' in child:
+                    label = child['size']
+            yield from flatten(child, f"{path}[{label}]")
+            
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON files")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Percent change flagged as a regression")
+    args = parser.parse_args()
+    
+    with open(args.before, encoding='utf-8') as f:
+        before: Dict[str, float] = dict(flatten(json.load(f)))
+    with open(args.after, encoding='utf-8') as f:
+        after: Dict[str, float] = dict(flatten(json.load(f)))
+        
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change > args.threshold if key.rsplit('.', 1)[-1] in LOWER_IS_BETTER else change < -args.threshold
+        regressions += worse
+        print(f"{'!!' if worse else '  '} {key:<60} {old:>12.3f} -> {new:>12.3f} ({change:+.1f}%)")
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0f}%")
+    
+if __name__ == "__main__":
+    main()
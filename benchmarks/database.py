@@ -0,0 +1,213 @@
+"""
+Database Benchmark for Economy Manager Bot
+Version: 0.5.0
+Times DatabaseManager reads, writes and pagination against a seeded SQLite stand-in
+
+Usage:
+    python -m benchmarks.database
+    python -m benchmarks.database --sizes 1000 100000 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+from benchmarks.sqlite_backend import attach_pool, create_ledger_table, seed_database
+from bot.database.db_manager import DatabaseManager
+from bot.database.ledger import LedgerEntry, LedgerWriter
+from bot.database.player_directory import PlayerDirectory
+from bot.ui.views import PlayerListView
+from bot.utils.export import export_players
+from bot.utils.restore import restore_snapshot
+
+TABLE_NAME = 'coinsengine_users'
+LEDGER_TABLE = 'economy_ledger'
+
+def summarize(timings_ms: List[float]) -> dict:
+    """p50/p99/max of per-operation timings in milliseconds."""
+    ordered = sorted(timings_ms)
+    return {
+        'count': len(ordered),
+        'p50_ms': round(statistics.median(ordered), 3),
+        'p99_ms': round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+async def run_concurrent(operation: Callable[[int], Awaitable], operations: int, concurrency: int) -> dict:
+    """
+    Run `operations` calls split across `concurrency` workers.
+    
+    Args:
+        operation: Coroutine function taking the operation number
+        operations: Total calls
+        concurrency: Calls in flight at once
+        
+    Returns:
+        Latency summary plus throughput in operations per second
+    """
+    timings: List[float] = []
+    counter = iter(range(operations))
+    
+    async def worker():
+        for number in counter:
+            started = time.perf_counter()
+            await operation(number)
+            timings.append((time.perf_counter() - started) * 1000)
+            
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    result = summarize(timings)
+    result['concurrency'] = concurrency
+    result['ops_per_s'] = round(operations / elapsed, 1)
+    return result
+
+async def run(size: int, path: str, operations: int = 2000, concurrency: List[int] = (1, 8, 32),
+              pool_size: int = 5, pages: int = 20, repeats: int = 3) -> dict:
+    """Benchmark one table size and return the results."""
+    started = time.perf_counter()
+    players = seed_database(path, size, TABLE_NAME)
+    seed_seconds = time.perf_counter() - started
+    
+    db = DatabaseManager('localhost', 3306, 'bench', '', 'bench', pool_size=pool_size)
+    attach_pool(db, path)
+    rng = random.Random(1)
+    results = {'size': size, 'pool_size': pool_size, 'seed_s': round(seed_seconds, 3)}
+    
+    try:
+        # Full table load, as used by the player directory
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            loaded = await db.get_all_players(TABLE_NAME)
+            timings.append((time.perf_counter() - started) * 1000)
+        assert len(loaded) == size
+        results['get_all_players'] = summarize(timings)
+        
+        # Streaming export to gzip CSV; peak traced memory should not grow with the table
+        export_path = Path(path).with_suffix('.csv.gz')
+        tracemalloc.start()
+        started = time.perf_counter()
+        exported = await export_players(db, export_path, 'csv', TABLE_NAME)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert exported == size
+        results['export_players'] = {
+            'rows': exported,
+            'ops_per_s': round(exported / elapsed, 1),
+            'peak_mb': round(peak / 1024 / 1024, 2),
+        }
+        
+        # Diffing that snapshot back against the table, chunk by chunk (dry run of a restore)
+        started = time.perf_counter()
+        report = await restore_snapshot(db, export_path, TABLE_NAME)
+        elapsed = time.perf_counter() - started
+        export_path.unlink()
+        assert report.rows == size and not report.changed
+        results['restore_dry_run'] = {'rows': report.rows, 'ops_per_s': round(report.rows / elapsed, 1)}
+        
+        # Point lookups, by name (auto-detected column) and by UUID
+        names = [rng.choice(players)['name'] for _ in range(operations)]
+        uuids = [rng.choice(players)['uuid'] for _ in range(operations)]
+        results['get_player_balance'] = [
+            await run_concurrent(lambda n: db.get_player_balance(names[n], TABLE_NAME), operations, c)
+            for c in concurrency
+        ]
+        results['get_player_by_uuid'] = [
+            await run_concurrent(lambda n: db.get_player_by_uuid(uuids[n], TABLE_NAME), operations, c)
+            for c in concurrency
+        ]
+        
+        # Writes: locked SELECT plus relative UPDATE per call
+        results['update_currency'] = [
+            await run_concurrent(
+                lambda n: db.update_currency_by_uuid(uuids[n], 'gems', 1, 'add', TABLE_NAME), operations, c
+            )
+            for c in concurrency
+        ]
+        
+        # Ledger throughput: one INSERT per change vs group-committed batches
+        create_ledger_table(path, LEDGER_TABLE)
+        for batch_size in (1, 500):
+            writer = LedgerWriter(db, LEDGER_TABLE, max_queue=operations, flush_interval=0.01,
+                                  max_batch=batch_size)
+            writer.start()
+            started = time.perf_counter()
+            for n in range(operations):
+                writer.submit(LedgerEntry(uuids[n], 'gems', 1.0, 0.0, 1.0, None, 'benchmark'))
+            await writer.stop(timeout=600)
+            elapsed = time.perf_counter() - started
+            results[f'ledger_batch_{batch_size}'] = {
+                'entries': writer.written,
+                'batches': writer.batches,
+                'ops_per_s': round(writer.written / elapsed, 1),
+            }
+        history = await db.get_ledger_page(uuids[0], limit=25, table_name=LEDGER_TABLE)
+        assert history and all(entry.player_uuid == uuids[0] for entry in history)
+        
+        # One bulk transaction of up to 1000 rows
+        timings = []
+        for _ in range(repeats):
+            rows = [(rng.choice(players)['uuid'], 'coins', 1.0) for _ in range(min(1000, size))]
+            started = time.perf_counter()
+            await db.bulk_update_currency(rows, TABLE_NAME)
+            timings.append((time.perf_counter() - started) * 1000)
+        results['bulk_update_currency'] = summarize(timings)
+        results['bulk_update_currency']['rows'] = min(1000, size)
+        
+        # Keyset pagination through the first pages
+        timings = []
+        after_name = after_id = None
+        for _ in range(pages):
+            started = time.perf_counter()
+            page = await db.get_players_page(after_name, after_id, limit=26, table_name=TABLE_NAME)
+            timings.append((time.perf_counter() - started) * 1000)
+            if len(page) < 26:
+                break
+            after_name, after_id = page[24].name, page[24].id
+        results['get_players_page'] = summarize(timings)
+        
+        # Persistent player list pages resolved from the shared directory
+        directory = PlayerDirectory(db, table_name=TABLE_NAME)
+        await directory.refresh()
+        page_count = (len(directory) - 1) // 25 + 1
+        timings = []
+        for _ in range(pages):
+            page = rng.randrange(page_count)
+            started = time.perf_counter()
+            await PlayerListView.build(directory, page)
+            timings.append((time.perf_counter() - started) * 1000)
+        results['player_select_view'] = summarize(timings)
+    finally:
+        await db.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager against SQLite")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--operations', type=int, default=2000, help="Calls per read/write benchmark")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=20, help="Pages walked in the pagination benchmarks")
+    parser.add_argument('--workdir', default=None, help="Directory for the SQLite files (default: temp dir)")
+    args = parser.parse_args()
+    
+    workdir = args.workdir or tempfile.mkdtemp(prefix='economy_bench_')
+    results = [
+        asyncio.run(run(size, os.path.join(workdir, f'players_{size}.db'), args.operations,
+                        args.concurrency, args.pool_size, args.pages))
+        for size in args.sizes
+    ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Player Memory Benchmark for Economy Manager Bot
+Version: 0.5.0
+Compares the memory held by dictionary rows, Player records and PlayerTable
+
+Usage:
+    python -m benchmarks.memory
+    python -m benchmarks.memory --sizes 100000 --views 12
+"""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+import uuid
+from typing import Callable, List, Tuple
+
+from benchmarks.search import make_names
+from bot.database.models import PLAYER_COLUMNS, Player, PlayerTable
+from bot.ui.views import PAGE_SIZE, player_list_id
+
+def make_rows(count: int, seed: int = 42) -> List[Tuple]:
+    """Synthetic rows in PLAYER_COLUMNS order, as the driver returns them."""
+    rng = random.Random(seed)
+    return [
+        (i + 1, str(uuid.UUID(int=rng.getrandbits(128), version=4)), name,
+         float(rng.randint(0, 5000)), float(rng.randint(0, 100000)), 1_700_000_000_000 + rng.randint(0, 10**10))
+        for i, name in enumerate(make_names(count, seed))
+    ]
+
+def measure(build: Callable[[], object]) -> Tuple[int, object]:
+    """Bytes allocated (and still alive) by build(), plus its result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+def copy_rows(rows: List[Tuple]) -> List[Tuple]:
+    """Fresh copies of the row tuples and their strings, as a new query would return."""
+    return [(r[0], ''.join(r[1]), ''.join(r[2]), r[3], r[4], r[5]) for r in rows]
+
+def open_views(table: PlayerTable, views: int) -> list:
+    """
+    State kept by `views` open player lists spread over the table.
+
+    A view keeps the Player records of its page plus the lookahead row, its
+    component custom_ids and, for keyset paging, the start cursor of every
+    page up to its own (names come from separate query results, so they
+    are copied).
+    """
+    pages = max(1, (len(table) - 1) // PAGE_SIZE + 1)
+    state = []
+    for view in range(views):
+        page = view * pages // views
+        start = page * PAGE_SIZE
+        state.append((
+            table[start:start + PAGE_SIZE + 1],
+            [player_list_id(action, page) for action in ('pick', 'prev', 'next')],
+            [(''.join(table.names[i]), table.ids[i]) for i in range(0, start + 1, PAGE_SIZE)],
+        ))
+    return state
+
+def run(size: int, views: int) -> dict:
+    """Measure one player count and return the results."""
+    rows = make_rows(size)
+
+    def dict_directory():
+        # Previous layout: dict rows, a sort key list and a uuid -> row map
+        players = [dict(zip(PLAYER_COLUMNS, row)) for row in copy_rows(rows)]
+        players.sort(key=lambda p: (p['name'].lower(), p['id']))
+        sort_keys = [(p['name'].lower(), p['id']) for p in players]
+        by_uuid = {p['uuid']: p for p in players}
+        return players, sort_keys, by_uuid
+
+    def record_list():
+        return [Player(*row) for row in copy_rows(rows)]
+
+    def table_directory():
+        # Current layout: one sorted PlayerTable and a uuid -> row index map
+        table = PlayerTable.from_rows(copy_rows(rows)).sorted_by_name()
+        return table, table.uuid_positions()
+
+    dict_bytes, (dict_players, _, _) = measure(dict_directory)
+    # Each open view used to keep its own list of the rows
+    dict_views_bytes, _ = measure(lambda players=dict_players: [list(players) for _ in range(views)])
+    del dict_players
+    record_bytes, _ = measure(record_list)
+    table_bytes, (table, _) = measure(table_directory)
+    # Views now keep only their page and paging state; the rows stay in the shared table
+    table_views_bytes, _ = measure(lambda: open_views(table, views))
+
+    old_total = dict_bytes + dict_views_bytes
+    new_total = table_bytes + table_views_bytes
+    return {
+        'size': size,
+        'views': views,
+        'dict_directory_mb': round(dict_bytes / 2**20, 2),
+        'dict_views_mb': round(dict_views_bytes / 2**20, 2),
+        'player_records_mb': round(record_bytes / 2**20, 2),
+        'table_directory_mb': round(table_bytes / 2**20, 2),
+        'table_views_mb': round(table_views_bytes / 2**20, 2),
+        'bytes_per_player_dict': round(dict_bytes / size),
+        'bytes_per_player_record': round(record_bytes / size),
+        'bytes_per_player_table': round(table_bytes / size),
+        'bytes_per_view_dict': round(dict_views_bytes / views) if views else 0,
+        'bytes_per_view_table': round(table_views_bytes / views) if views else 0,
+        'directory_reduction': round(1 - table_bytes / dict_bytes, 3),
+        'reduction': round(1 - new_total / old_total, 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare player row memory layouts")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--views', type=int, default=12, help="Open player list views sharing the data")
+    args = parser.parse_args()
+    print(json.dumps([run(size, args.views) for size in args.sizes], indent=2))
+
+if __name__ == "__main__":
+    main()
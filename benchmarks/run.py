@@ -0,0 +1,82 @@
+"""
+Benchmark Runner for Economy Manager Bot
+Version: 0.5.0
+Runs the database and search benchmarks and writes one JSON document
+
+Usage:
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --sizes 1000 10000 100000 1000000 --output bench.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks import database, search
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, if run inside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+        
+def main():
+    parser = argparse.ArgumentParser(description="Run all benchmarks and emit JSON")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--operations', type=int, default=2000, help="Calls per read/write benchmark")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=30, help="Search queries per size")
+    parser.add_argument('--linear-queries', type=int, default=3, help="Queries run against the linear scan")
+    parser.add_argument('--skip-database', action='store_true')
+    parser.add_argument('--skip-search', action='store_true')
+    parser.add_argument('--workdir', default=None, help="Directory for the SQLite files (default: temp dir)")
+    parser.add_argument('--output', default=None, help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+    
+    workdir = args.workdir or tempfile.mkdtemp(prefix='economy_bench_')
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'sizes': args.sizes,
+        },
+        'database': [],
+        'search': [],
+    }
+    
+    for size in args.sizes:
+        if not args.skip_database:
+            print(f"database: {size} players", file=sys.stderr)
+            report['database'].append(asyncio.run(database.run(
+                size, os.path.join(workdir, f'players_{size}.db'), args.operations,
+                args.concurrency, args.pool_size
+            )))
+        if not args.skip_search:
+            print(f"search: {size} players", file=sys.stderr)
+            report['search'].append(search.run(size, args.queries, args.linear_queries, limit=500))
+            
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+        
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Player Search Benchmark for Economy Manager Bot
+Version: 0.5.0
+Compares the linear fuzzy_match_score scan with PlayerSearchIndex
+
+Usage:
+    python -m benchmarks.search
+    python -m benchmarks.search --sizes 10000 100000 --queries 50
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+from collections import Counter
+from typing import List
+
+from bot.utils.search_index import MATCH_THRESHOLD, PlayerSearchIndex, fuzzy_match_score
+
+WORDS = [
+    'dragon', 'slayer', 'craft', 'miner', 'steve', 'alex', 'shadow', 'ninja',
+    'pvp', 'gamer', 'king', 'queen', 'wolf', 'fire', 'ice', 'storm', 'pro',
+    'noob', 'builder', 'creeper', 'ender', 'nether', 'diamond', 'gold',
+]
+
+def make_names(count: int, seed: int = 42) -> List[str]:
+    """Generate Minecraft-style player names (3-16 chars of words, digits and underscores)."""
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        style = rng.random()
+        if style < 0.5:
+            name = ''.join(w.capitalize() for w in rng.sample(WORDS, rng.randint(1, 3)))
+            if rng.random() < 0.5:
+                name += str(rng.randint(0, 9999))
+        elif style < 0.8:
+            name = rng.choice(WORDS) + '_' + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6)))
+        else:
+            name = ''.join(rng.choices(string.ascii_letters + string.digits + '_', k=rng.randint(3, 16)))
+        names.append(name[:16])
+    return names
+
+def make_queries(names: List[str], count: int, seed: int = 7) -> List[str]:
+    """Mix of exact names, substrings and names with a typo, like real admin searches."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        name = rng.choice(names)
+        kind = i % 3
+        if kind == 0:
+            queries.append(name)
+        elif kind == 1 and len(name) > 4:
+            start = rng.randint(0, len(name) - 4)
+            queries.append(name[start:start + rng.randint(3, 6)])
+        else:
+            pos = rng.randrange(len(name))
+            queries.append(name[:pos] + rng.choice(string.ascii_lowercase) + name[pos + 1:])
+    return queries
+
+def linear_search(players: List[dict], search_term: str) -> List[dict]:
+    """The original PlayerSearchModal scan."""
+    scored = []
+    for player in players:
+        score = fuzzy_match_score(search_term, player['name'])
+        if score > MATCH_THRESHOLD:
+            scored.append((score, player))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [player for score, player in scored]
+
+def time_queries(func, queries: List[str]) -> List[float]:
+    """Run func on every query, returning per-query wall times in milliseconds."""
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def run(size: int, queries: int, linear_queries: int, limit: int) -> dict:
+    """Benchmark one player count and return the summary."""
+    names = make_names(size)
+    players = [{'id': i + 1, 'uuid': f'uuid-{i}', 'name': name} for i, name in enumerate(names)]
+    players.sort(key=lambda p: (p['name'].lower(), p['id']))  # Directory order
+    query_list = make_queries(names, queries)
+    
+    started = time.perf_counter()
+    index = PlayerSearchIndex((p['uuid'], p['name']) for p in players)
+    build_seconds = time.perf_counter() - started
+    
+    indexed = time_queries(lambda q: index.search(q, limit=limit), query_list)
+    linear_list = query_list[:linear_queries]
+    linear = time_queries(lambda q: linear_search(players, q), linear_list)
+    
+    # How many of the linear scan's top 25 scores the index reproduces
+    # (compared by score, since equal-score ties may be broken differently)
+    overlap = []
+    for query in linear_list:
+        expected = Counter(round(fuzzy_match_score(query, p['name']), 6)
+                           for p in linear_search(players, query)[:25])
+        found = Counter(round(score, 6) for score, _ in index.search(query, limit=25))
+        if expected:
+            overlap.append(sum((expected & found).values()) / sum(expected.values()))
+            
+    return {
+        'size': size,
+        'index_build_s': round(build_seconds, 3),
+        'index_p50_ms': round(statistics.median(indexed), 3),
+        'index_max_ms': round(max(indexed), 3),
+        'linear_p50_ms': round(statistics.median(linear), 3),
+        'linear_max_ms': round(max(linear), 3),
+        'speedup': round(statistics.median(linear) / max(statistics.median(indexed), 1e-6), 1),
+        'top25_recall': round(statistics.mean(overlap), 3) if overlap else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark player search")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=30, help="Queries run against the index")
+    parser.add_argument('--linear-queries', type=int, default=3, help="Queries run against the linear scan")
+    parser.add_argument('--limit', type=int, default=500, help="Result limit passed to the index")
+    args = parser.parse_args()
+    
+    header = f"{'players':>10} {'build s':>8} {'index p50':>10} {'index max':>10} " \
+             f"{'linear p50':>11} {'linear max':>11} {'speedup':>8} {'recall@25':>9}"
+    print(header)
+    for size in args.sizes:
+        r = run(size, args.queries, args.linear_queries, args.limit)
+        print(f"{r['size']:>10} {r['index_build_s']:>8} {r['index_p50_ms']:>8}ms {r['index_max_ms']:>8}ms "
+              f"{r['linear_p50_ms']:>9}ms {r['linear_max_ms']:>9}ms {r['speedup']:>7}x {r['top25_recall']!s:>9}")
+
+if __name__ == "__main__":
+    main()
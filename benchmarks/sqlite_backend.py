@@ -0,0 +1,213 @@
+"""
+SQLite Stand-in for Economy Manager Bot Benchmarks
+Version: 0.5.0
+Offline replacement for the MySQL connections used by DatabaseManager
+"""
+
+import os
+import random
+import re
+import sqlite3
+import uuid
+from typing import Any, List, Optional, Sequence
+
+from mysql.connector import Error
+
+from benchmarks.search import make_names
+from bot.database.pool import ConnectionPool
+
+# Row locks: SQLite has no FOR UPDATE, so the clause takes the database write lock instead
+_FOR_UPDATE = re.compile(r'\s+FOR\s+UPDATE\b', re.IGNORECASE)
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over sqlite3 (%s placeholders, dictionary rows)."""
+    
+    def __init__(self, connection: sqlite3.Connection, dictionary: bool = False):
+        self._connection = connection
+        self._cursor = connection.cursor()
+        self.dictionary = dictionary
+        self.rowcount = -1
+        self._results: List[Optional[List[Any]]] = []  # Remaining result sets of a multi-statement script
+        
+    @property
+    def with_rows(self) -> bool:
+        if self._results:
+            return self._results[0] is not None
+        return self._cursor.description is not None
+        
+    def execute(self, query: str, params: Sequence[Any] = ()):
+        self._results = []
+        statements = [statement.strip() for statement in query.split(';') if statement.strip()]
+        if len(statements) > 1:
+            self._execute_script(statements, list(params))
+        else:
+            self._execute_one(query, params)
+            
+    def _execute_one(self, query: str, params: Sequence[Any]):
+        query, locks = _FOR_UPDATE.subn('', query)
+        query = query.replace('%s', '?')
+        try:
+            if locks and not self._connection.in_transaction:
+                # Held until commit or rollback, like MySQL's row locks (but for every row)
+                self._connection.execute('BEGIN IMMEDIATE')
+            self._cursor.execute(query, tuple(params))
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+        self.rowcount = self._cursor.rowcount
+        
+    def _execute_script(self, statements: List[str], params: List[Any]):
+        """Run ;-separated statements like mysql.connector 9.2+, one result set per statement."""
+        for statement in statements:
+            count = statement.count('%s')
+            values, params = params[:count], params[count:]
+            if statement.upper() == 'COMMIT':
+                self._connection.commit()
+                self._results.append(None)
+                continue
+            self._execute_one(statement, values)
+            self._results.append(self.fetchall() if self._cursor.description is not None else None)
+            
+    def nextset(self) -> Optional[bool]:
+        if len(self._results) > 1:
+            self._results.pop(0)
+            return True
+        self._results = []
+        return None
+        
+    def executemany(self, query: str, seq_params: Sequence[Sequence[Any]]):
+        query = query.replace('%s', '?')
+        try:
+            self._cursor.executemany(query, [tuple(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise Error(msg=str(e)) from e
+        self.rowcount = self._cursor.rowcount
+        
+    def _row(self, row):
+        if row is None or not self.dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+        
+    def fetchone(self):
+        if self._results:
+            rows = self._results[0] or []
+            return rows.pop(0) if rows else None
+        return self._row(self._cursor.fetchone())
+        
+    def fetchmany(self, size: int = 1) -> List[Any]:
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+        
+    def fetchall(self) -> List[Any]:
+        return [self._row(row) for row in self._cursor.fetchall()]
+        
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """mysql.connector-style connection over sqlite3, opened by the ConnectionPool factory."""
+    
+    def __init__(self, path: str, timeout: float = 30.0):
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        
+    @property
+    def in_transaction(self) -> bool:
+        return self._connection.in_transaction
+        
+    def cursor(self, dictionary: bool = False, buffered: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self._connection, dictionary)
+        
+    def commit(self):
+        self._connection.commit()
+        
+    def rollback(self):
+        self._connection.rollback()
+        
+    def is_connected(self) -> bool:
+        return True
+        
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0):
+        pass
+        
+    def close(self):
+        self._connection.close()
+
+def seed_database(path: str, rows: int, table_name: str = 'coinsengine_users', seed: int = 42) -> List[dict]:
+    """
+    Create a synthetic CoinsEngine users table.
+    
+    Args:
+        path: SQLite database file (replaced if it exists)
+        rows: Players to insert
+        table_name: Table to create
+        seed: Random seed, so every run sees the same data
+        
+    Returns:
+        The inserted players (id, uuid, name)
+    """
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+            
+    rng = random.Random(seed)
+    names = make_names(rows, seed)
+    players = [
+        {'id': i + 1, 'uuid': str(uuid.UUID(int=rng.getrandbits(128), version=4)), 'name': f"{name}{i}"[-16:]}
+        for i, name in enumerate(names)
+    ]
+    
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(
+            f"CREATE TABLE {table_name} ("
+            f"id INTEGER PRIMARY KEY, uuid TEXT NOT NULL, name TEXT NOT NULL, "
+            f"gems REAL NOT NULL DEFAULT 0, coins REAL NOT NULL DEFAULT 0, last_online INTEGER NOT NULL DEFAULT 0)"
+        )
+        connection.executemany(
+            f"INSERT INTO {table_name} (id, uuid, name, gems, coins, last_online) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (p['id'], p['uuid'], p['name'], float(rng.randint(0, 5000)), float(rng.randint(0, 100000)),
+                 1_700_000_000_000 + rng.randint(0, 10**10))
+                for p in players
+            )
+        )
+        for column in ('uuid', 'name', 'last_online'):
+            connection.execute(f"CREATE INDEX idx_{table_name}_{column} ON {table_name} ({column})")
+        connection.commit()
+    finally:
+        connection.close()
+    return players
+
+def create_ledger_table(path: str, table_name: str = 'economy_ledger'):
+    """SQLite equivalent of DatabaseManager.ensure_ledger_table (which uses MySQL DDL)."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(f"DROP TABLE IF EXISTS {table_name}")
+        connection.execute(
+            f"CREATE TABLE {table_name} ("
+            f"id INTEGER PRIMARY KEY AUTOINCREMENT, player_uuid TEXT NOT NULL, currency TEXT NOT NULL, "
+            f"delta REAL NOT NULL, balance_before REAL NOT NULL, balance_after REAL NOT NULL, "
+            f"admin_id INTEGER, source TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        connection.execute(f"CREATE INDEX idx_{table_name}_player ON {table_name} (player_uuid, id)")
+        connection.commit()
+    finally:
+        connection.close()
+
+def attach_pool(db_manager, path: str) -> ConnectionPool:
+    """
+    Point a DatabaseManager at a SQLite file instead of MySQL.
+    
+    The manager's own ConnectionPool settings are kept, so pool behaviour
+    (overflow, checkout waits, validation) is part of what gets measured.
+    """
+    db_manager.pool = ConnectionPool(
+        lambda: SQLiteConnection(path),
+        pool_size=db_manager.pool_size,
+        max_overflow=db_manager.max_overflow,
+        timeout=db_manager.pool_timeout,
+        recycle=db_manager.pool_recycle,
+        pre_ping=db_manager.pre_ping,
+        name=db_manager.pool_name
+    )
+    return db_manager.pool
@@ -7,20 +7,86 @@ Handles economy-related commands and interactions
 import discord
 from discord.ext import commands
 from discord import app_commands
+import functools
 import logging
-from bot.ui.views import PlayerSelectView, EconomyManagementView, create_player_embed
+import time
+from pathlib import Path
+from typing import List, Literal, Optional, Tuple
+from bot.database.backends import EconomyBackend
+from bot.database.db_manager import BULK_CHUNK_SIZE
+from bot.database.models import Player
+from bot.database.scheduler import DatabaseOverloadedError
+from bot.ui.views import (PERSISTENT_ITEMS, PlayerListView, PlayerSelectView, EconomyManagementView,
+                          BulkConfirmationView, ConfirmationView, RestoreConfirmationView, build_leaderboard,
+                          build_network_leaderboard, create_player_embed, restore_message, upload_limit)
+from bot.utils.bulk_csv import parse_bulk_csv
+from bot.utils.export import export_filename, export_players
+from bot.utils.restore import restore_snapshot, snapshot_format
+from bot.utils.metrics import (DB_ERRORS, DB_QUERY_SECONDS, DB_SHED, DB_WAIT_SECONDS, INTERACTION_SECONDS,
+                               timed_interaction)
 
 logger = logging.getLogger('economy_bot')
 
+# Largest CSV accepted by /bulk
+BULK_MAX_FILE_BYTES = 5 * 1024 * 1024
+
+# Most suggestions Discord shows for an autocompleted option
+AUTOCOMPLETE_LIMIT = 25
+
 class Economy(commands.Cog):
     """Cog for handling economy management."""
     
+    economy_group = app_commands.Group(
+        name="economy",
+        description="Economy-wide reports",
+        default_permissions=discord.Permissions(administrator=True)
+    )
+    
     def __init__(self, bot):
         self.bot = bot
         
+    async def server_autocomplete(self, interaction: discord.Interaction,
+                                  current: str) -> List[app_commands.Choice[str]]:
+        """Suggest configured economy servers."""
+        current = current.strip().lower()
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in self.bot.backends.names() if current in name
+        ][:AUTOCOMPLETE_LIMIT]
+        
+    async def _get_backend(self, interaction: discord.Interaction,
+                           server: Optional[str]) -> Optional[EconomyBackend]:
+        """
+        Backend named by a command's server option (the default one when omitted).
+        
+        Sends an error follow-up for unknown names, so it must be called
+        after the interaction was deferred.
+        
+        Args:
+            interaction: Deferred interaction
+            server: Server option value, or None
+            
+        Returns:
+            EconomyBackend, or None if the name is unknown
+        """
+        backend = self.bot.backends.get(server)
+        if backend is None:
+            await interaction.followup.send(
+                f"❌ Unknown server '{server}'. Configured servers: {', '.join(self.bot.backends.names())}",
+                ephemeral=True
+            )
+        return backend
+        
+    def _server_id(self, backend: EconomyBackend) -> Optional[str]:
+        """Server recorded in persistent component ids (none while only one server is configured)."""
+        return backend.name if self.bot.backends.is_multi else None
+        
     @app_commands.command(name="manage", description="Manage player economy")
+    @app_commands.describe(server="Economy server (defaults to the first configured one)")
+    @app_commands.autocomplete(server=server_autocomplete)
     @app_commands.default_permissions(administrator=True)
-    async def manage_economy(self, interaction: discord.Interaction):
+    @timed_interaction('manage')
+    async def manage_economy(self, interaction: discord.Interaction, server: Optional[str] = None):
         """
         Main command to start economy management.
         Shows dropdown to select a player.
@@ -28,55 +94,77 @@ class Economy(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            # Fetch all players from database
-            players = await self.bot.db_manager.get_all_players()
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return
+            server_id = self._server_id(backend)
             
-            if not players:
+            if self.bot.config.PAGINATION_MODE == 'keyset':
+                # Fetch only the first page from the database
+                view = await PlayerSelectView.from_database(
+                    backend.db_manager,
+                    functools.partial(self.on_player_selected, server=server_id),
+                    directory=backend.player_directory,
+                    table_name=backend.table_name,
+                    server=server_id
+                )
+            else:
+                # Persistent view paging through the shared directory cache
+                view, _ = await PlayerListView.build(backend.player_directory, server=server_id)
+                
+            total_players = view.total_players
+            if not total_players:
                 await interaction.followup.send(
                     "❌ No players found in the database.",
                     ephemeral=True
                 )
                 return
                 
-            # Create and send player selection view
-            view = PlayerSelectView(players, self.on_player_selected)
-            
-            total_players = len(players)
             shown_players = min(25, total_players)
             
             message = f"**Economy Manager**\n"
+            if server_id:
+                message += f"🖥️ Server: **{server_id}**\n"
             message += f"📊 Total Players: {total_players}\n"
             message += f"📋 Showing: 1-{shown_players}\n\n"
             message += f"🔍 **Search**: Fuzzy search enabled - type partial names\n"
             if total_players > 25:
                 message += f"⬅️➡️ **Navigate**: Use Previous/Next buttons to browse all players"
-            
+                
             await interaction.followup.send(
                 message,
                 view=view,
                 ephemeral=True
             )
+            self.bot.mark_startup('first_manage')
             
         except Exception as e:
             logger.error(f"Error in manage_economy command: {e}", exc_info=True)
             await interaction.followup.send(
-                f"❌ An error occurred: {str(e)}",
+                _error_message(e),
                 ephemeral=True
             )
             
-    async def on_player_selected(self, interaction: discord.Interaction, player_uuid: str):
+    @timed_interaction('player_selected')
+    async def on_player_selected(self, interaction: discord.Interaction, player_uuid: str,
+                                 server: Optional[str] = None):
         """
         Callback when a player is selected from dropdown.
         
         Args:
             interaction: Discord interaction
             player_uuid: Selected player's UUID
+            server: Economy server of the list (None for the default one)
         """
         await interaction.response.defer()
         
         try:
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return
+                
             # Fetch player data using UUID
-            player_data = await self.bot.db_manager.get_player_balance(player_uuid)
+            player_data = await backend.db_manager.get_player_by_uuid(player_uuid, backend.table_name)
             
             if not player_data:
                 await interaction.followup.send(
@@ -86,14 +174,15 @@ class Economy(commands.Cog):
                 return
                 
             # Get player name from database result
-            player_name = player_data.get('name', 'Unknown')
+            player_name = player_data.name or 'Unknown'
             
             # Create embed with player info
             embed = create_player_embed(player_name, player_data)
             
             # Create management view with buttons (pass bot instance for logging and UUID for refresh)
-            view = EconomyManagementView(player_name, player_data, self.bot.db_manager, self.bot, player_uuid)
-            
+            view = EconomyManagementView(player_name, player_data, backend.db_manager, self.bot, player_uuid,
+                                         backend=backend)
+                                         
             await interaction.followup.send(
                 embed=embed,
                 view=view,
@@ -105,27 +194,666 @@ class Economy(commands.Cog):
         except Exception as e:
             logger.error(f"Error in on_player_selected: {e}", exc_info=True)
             await interaction.followup.send(
-                f"❌ An error occurred: {str(e)}",
+                _error_message(e),
                 ephemeral=True
             )
             
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """Sync slash commands when cog is ready."""
+    @timed_interaction('player_autocomplete')
+    async def player_autocomplete(self, interaction: discord.Interaction,
+                                  current: str) -> List[app_commands.Choice[str]]:
+        """
+        Suggest players whose name starts with what has been typed so far.
+        
+        Served from the directories' prefix indexes without touching the
+        database; falls back to the fuzzy index when no name has the prefix.
+        Searches the server chosen in the command's server option, or every
+        server when none is chosen. The choice value is the player's UUID.
+        """
+        server = getattr(interaction.namespace, 'server', None)
+        backends = [self.bot.backends.get(server)] if server else list(self.bot.backends)
+        multi = self.bot.backends.is_multi and not server
+        
+        found = []
+        for backend in backends:
+            directory = backend.player_directory if backend else None
+            if not directory or not directory.is_loaded:
+                continue
+            uuids = directory.search_index.prefix(current, AUTOCOMPLETE_LIMIT)
+            if not uuids and current.strip():
+                uuids = [u for _, u in directory.search_index.search(current, AUTOCOMPLETE_LIMIT)]
+            for player_uuid in uuids:
+                player = directory.get_cached(player_uuid)
+                if player is not None:
+                    found.append((backend.name, player))
+        if multi:
+            # Interleave servers by name; each server's list is already in match order
+            found.sort(key=lambda item: item[1].sort_key)
+            
+        choices, seen = [], set()
+        for server_name, player in found:
+            if player.uuid in seen:
+                continue
+            seen.add(player.uuid)
+            label = f"{player.name} (💎 {player.gems:,.2f} | 🪙 {player.coins:,.2f})"
+            if multi:
+                label += f" @ {server_name}"
+            choices.append(app_commands.Choice(name=label[:100], value=player.uuid))
+        return choices[:AUTOCOMPLETE_LIMIT]
+        
+    async def _locate_player(self, interaction: discord.Interaction, player: str,
+                             server: Optional[str]) -> Optional[Tuple[EconomyBackend, Player]]:
+        """
+        Find the player named by a command option.
+        
+        With a server option (or a single server) only that server is
+        searched; otherwise every server is searched concurrently. Sends an
+        error follow-up when the player is missing or exists on several
+        servers, so it must be called after the interaction was deferred.
+        
+        Args:
+            interaction: Deferred interaction
+            player: UUID picked from autocomplete, or a name typed in full
+            server: Server option value, or None
+            
+        Returns:
+            Tuple of (backend, fresh player record), or None after an error was sent
+        """
+        if server or not self.bot.backends.is_multi:
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return None
+            player_data = await backend.find_player(player)
+            if not player_data:
+                await interaction.followup.send(f"❌ Player '{player}' not found.", ephemeral=True)
+                return None
+            return backend, player_data
+            
+        found, errors = await self.bot.backends.find_player(player)
+        unavailable = f"\n⚠️ Not searched (unavailable): {', '.join(errors)}" if errors else ""
+        if not found:
+            await interaction.followup.send(f"❌ Player '{player}' not found.{unavailable}", ephemeral=True)
+            return None
+        if len(found) > 1:
+            listing = "\n".join(
+                f"• `{name}`: 💎 {p.gems:,.2f} | 🪙 {p.coins:,.2f}" for name, p in found.items()
+            )
+            await interaction.followup.send(
+                f"⚠️ **{player}** exists on {len(found)} servers; choose one with the `server` option:\n"
+                f"{listing}{unavailable}",
+                ephemeral=True
+            )
+            return None
+        name, player_data = next(iter(found.items()))
+        return self.bot.backends.get(name), player_data
+        
+    @app_commands.command(name="player", description="Show and manage a player's balance")
+    @app_commands.describe(player="Player name", server="Economy server (searches every server when omitted)")
+    @app_commands.autocomplete(player=player_autocomplete, server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('player')
+    async def player_command(self, interaction: discord.Interaction, player: str, server: Optional[str] = None):
+        """Open the management view for one player directly."""
+        await interaction.response.defer(ephemeral=True)
+        
         try:
-            # Sync to specific guild if configured for instant updates
-            if self.bot.config.GUILD_ID:
-                guild = discord.Object(id=self.bot.config.GUILD_ID)
-                self.bot.tree.copy_global_to(guild=guild)
-                synced = await self.bot.tree.sync(guild=guild)
-                logger.info(f"Synced {len(synced)} command(s) to guild {self.bot.config.GUILD_ID}")
+            located = await self._locate_player(interaction, player, server)
+            if not located:
+                return
+            backend, player_data = located
+            
+            player_name = player_data.name or 'Unknown'
+            embed = create_player_embed(player_name, player_data)
+            if self.bot.backends.is_multi:
+                embed.add_field(name="🖥️ Server", value=backend.name, inline=True)
+            view = EconomyManagementView(player_name, player_data, backend.db_manager, self.bot, player_data.uuid,
+                                         backend=backend)
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            logger.info(f"User {interaction.user} is managing economy for {player_name}")
+            
+        except Exception as e:
+            logger.error(f"Error in player command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    @app_commands.command(name="give", description="Give gems or coins to a player")
+    @app_commands.describe(player="Player name", currency="Currency to give", amount="Amount to give",
+                           server="Economy server (needed when the player is on several)")
+    @app_commands.autocomplete(player=player_autocomplete, server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('give')
+    async def give_command(self, interaction: discord.Interaction, player: str,
+                           currency: Literal['gems', 'coins'], amount: float, server: Optional[str] = None):
+        """Ask to confirm adding currency to a player."""
+        await self._confirm_change(interaction, player, currency, amount, 'add', server)
+        
+    @app_commands.command(name="take", description="Take gems or coins from a player")
+    @app_commands.describe(player="Player name", currency="Currency to take", amount="Amount to take",
+                           server="Economy server (needed when the player is on several)")
+    @app_commands.autocomplete(player=player_autocomplete, server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('take')
+    async def take_command(self, interaction: discord.Interaction, player: str,
+                           currency: Literal['gems', 'coins'], amount: float, server: Optional[str] = None):
+        """Ask to confirm removing currency from a player."""
+        await self._confirm_change(interaction, player, currency, amount, 'remove', server)
+        
+    async def _confirm_change(self, interaction: discord.Interaction, player: str,
+                              currency: str, amount: float, operation: str, server: Optional[str] = None):
+        """
+        Resolve the player and show the same confirmation as the manage buttons.
+        
+        Args:
+            interaction: Discord interaction
+            player: Command option (UUID from autocomplete or a name)
+            currency: 'gems' or 'coins'
+            amount: Positive amount
+            operation: 'add' or 'remove'
+            server: Server option (required when the player is on several servers)
+        """
+        if amount <= 0:
+            await interaction.response.send_message("❌ Amount must be positive!", ephemeral=True)
+            return
+            
+        await interaction.response.defer(ephemeral=True)
+        try:
+            located = await self._locate_player(interaction, player, server)
+            if not located:
+                return
+            backend, player_data = located
+            
+            player_name = player_data.name or 'Unknown'
+            view = ConfirmationView(
+                player_name=player_name,
+                currency_type=currency,
+                amount=amount,
+                operation=operation,
+                db_manager=backend.db_manager,
+                bot=self.bot,
+                player_uuid=player_data.uuid,
+                source='give' if operation == 'add' else 'take',
+                backend=backend
+            )
+            
+            emoji = "💎" if currency == "gems" else "🪙"
+            action = "Add" if operation == "add" else "Remove"
+            balance = getattr(player_data, currency)
+            on_server = f" on `{backend.name}`" if self.bot.backends.is_multi else ""
+            await interaction.followup.send(
+                f"**Confirmation Required**\n"
+                f"{action} **{amount:.2f}** {emoji} {currency} "
+                f"{'to' if operation == 'add' else 'from'} **{player_name}**{on_server}?\n"
+                f"Current balance: {balance:,.2f}",
+                view=view,
+                ephemeral=True
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in {operation} command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    @app_commands.command(name="leaderboard", description="Show the richest players")
+    @app_commands.describe(currency="Currency to rank by", page="Page to start at",
+                           server="Economy server (ranks every server together when omitted)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('leaderboard')
+    async def leaderboard(self, interaction: discord.Interaction, currency: Literal['gems', 'coins'],
+                          page: app_commands.Range[int, 1] = 1, server: Optional[str] = None):
+        """Top players by gems or coins, served from the directories' leaderboards."""
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            if not server and self.bot.backends.is_multi:
+                embed, view = await build_network_leaderboard(self.bot.backends, currency, page - 1)
             else:
-                # Global sync (takes up to 1 hour to propagate)
-                synced = await self.bot.tree.sync()
-                logger.info(f"Synced {len(synced)} command(s) globally (may take up to 1 hour)")
+                backend = await self._get_backend(interaction, server)
+                if backend is None:
+                    return
+                embed, view = await build_leaderboard(backend.player_directory, currency, page - 1,
+                                                      self._server_id(backend))
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in leaderboard command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    @economy_group.command(name="stats", description="Show supply, distribution and activity statistics")
+    @app_commands.describe(server="Economy server (defaults to the first configured one)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    @timed_interaction('economy_stats')
+    async def economy_stats(self, interaction: discord.Interaction, server: Optional[str] = None):
+        """
+        Economy analytics: supply, mean/median, percentiles, Gini coefficient
+        and histogram per currency, plus wealth held by inactive players.
+        """
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return
+            directory = backend.player_directory
+            stats = await directory.get_economy_stats()
+            title = "📊 Economy Statistics" + (f" — {backend.name}" if self.bot.backends.is_multi else "")
+            embed = discord.Embed(title=title, color=discord.Color.gold())
+            
+            for currency, data in stats['currencies'].items():
+                emoji = "💎" if currency == "gems" else "🪙"
+                percentiles = " | ".join(f"p{p}: {v:,.0f}" for p, v in data['percentiles'].items() if p != 50)
+                embed.add_field(
+                    name=f"{emoji} {currency.capitalize()}",
+                    value=(
+                        f"Supply: **{data['total']:,.2f}**\n"
+                        f"Mean: {data['mean']:,.2f} | Median: {data['median']:,.2f}\n"
+                        f"{percentiles}\n"
+                        f"Gini: {data['gini']:.3f} | Top 1% hold {data['top1_share']:.1%}"
+                    ),
+                    inline=False
+                )
+                embed.add_field(
+                    name=f"{emoji} {currency.capitalize()} distribution",
+                    value=_histogram_block(data['histogram']),
+                    inline=False
+                )
+                
+            totals = {c: data['total'] or 1.0 for c, data in stats['currencies'].items()}
+            activity = "\n".join(
+                f"`{group['label']:>7}` {group['players']:,} players — "
+                f"💎 {group['gems'] / totals['gems']:.1%} | 🪙 {group['coins'] / totals['coins']:.1%}"
+                for group in stats['activity']
+            )
+            embed.add_field(name="Wealth by last online", value=activity, inline=False)
+            embed.set_footer(
+                text=f"{stats['players']:,} players • snapshot v{directory.version} • "
+                     f"computed in {stats['elapsed_ms']:.0f} ms"
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
         except Exception as e:
-            logger.error(f"Failed to sync commands: {e}", exc_info=True)
+            logger.error(f"Error in economy stats command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    @economy_group.command(name="totals", description="Show players and currency supply on every server")
+    @timed_interaction('economy_totals')
+    async def economy_totals(self, interaction: discord.Interaction):
+        """
+        Per-server and network-wide supply, queried on every server at once.
+        Servers that fail or time out are listed as unavailable.
+        """
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            results, errors = await self.bot.backends.totals()
+            lines = []
+            for name in self.bot.backends.names():
+                if name in results:
+                    t = results[name]
+                    lines.append(f"`{name}` {t['players']:,} players — 💎 {t['gems']:,.2f} | 🪙 {t['coins']:,.2f}")
+                else:
+                    lines.append(f"`{name}` ⚠️ unavailable ({errors[name]})")
+                    
+            embed = discord.Embed(
+                title="🌐 Network Totals",
+                description="\n".join(lines)[:4000],
+                color=discord.Color.gold()
+            )
+            embed.add_field(
+                name="All servers",
+                value=(
+                    f"Players: **{sum(t['players'] for t in results.values()):,}**\n"
+                    f"💎 {sum(t['gems'] for t in results.values()):,.2f} | "
+                    f"🪙 {sum(t['coins'] for t in results.values()):,.2f}"
+                ),
+                inline=False
+            )
+            embed.set_footer(text=f"{len(results)}/{len(self.bot.backends)} servers answered")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            logger.error(f"Error in economy totals command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    @app_commands.command(name="bulk", description="Apply currency changes from a CSV file")
+    @app_commands.describe(file="CSV with columns: player (name or UUID), currency (gems/coins), delta",
+                           server="Economy server (defaults to the first configured one)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('bulk')
+    async def bulk_update(self, interaction: discord.Interaction, file: discord.Attachment,
+                          server: Optional[str] = None):
+        """
+        Bulk currency adjustment command.
+        Parses the attached CSV and asks for confirmation before applying it.
+        """
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return
+            if file.size > BULK_MAX_FILE_BYTES:
+                await interaction.followup.send(
+                    f"❌ File too large ({file.size / 1024 / 1024:.1f} MB). "
+                    f"Maximum is {BULK_MAX_FILE_BYTES // 1024 // 1024} MB.",
+                    ephemeral=True
+                )
+                return
+                
+            rows, errors = parse_bulk_csv(await file.read())
+            
+            if errors:
+                shown = "\n".join(f"• {error}" for error in errors[:10])
+                if len(errors) > 10:
+                    shown += f"\n• ... and {len(errors) - 10} more"
+                await interaction.followup.send(
+                    f"❌ **Could not read `{file.filename}`**\n{shown}",
+                    ephemeral=True
+                )
+                return
+                
+            if not rows:
+                await interaction.followup.send("❌ The file contains no rows.", ephemeral=True)
+                return
+                
+            totals = {}
+            for _, currency, delta in rows:
+                totals[currency] = totals.get(currency, 0.0) + delta
+            players = len({player.lower() for player, _, _ in rows})
+            net = "\n".join(f"• {currency}: {total:+,.2f}" for currency, total in sorted(totals.items()))
+            
+            view = BulkConfirmationView(rows, file.filename, backend.db_manager, self.bot,
+                                        backend.table_name, backend=backend)
+            on_server = f"🖥️ Server: **{backend.name}**\n" if self.bot.backends.is_multi else ""
+            await interaction.followup.send(
+                f"**Bulk Update Confirmation Required**\n"
+                f"📄 File: `{file.filename}`\n"
+                f"{on_server}"
+                f"📊 Rows: {len(rows)} | Players: {players}\n"
+                f"**Net change:**\n{net}\n\n"
+                f"All rows are applied in one transaction. Rows that fail validation are skipped and reported.",
+                view=view,
+                ephemeral=True
+            )
+            
+        except UnicodeDecodeError:
+            await interaction.followup.send("❌ File must be UTF-8 encoded CSV.", ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in bulk_update command: {e}", exc_info=True)
+            await interaction.followup.send(
+                _error_message(e),
+                ephemeral=True
+            )
+            
+    @app_commands.command(name="export", description="Export every player's balances to a compressed file")
+    @app_commands.describe(format="File format", server="Economy server (defaults to the first configured one)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('export')
+    async def export(self, interaction: discord.Interaction, format: Literal['csv', 'jsonl'] = 'csv',
+                     server: Optional[str] = None):
+        """
+        Snapshot command for rollbacks and wipes.
+        Streams the players table into a gzip file and uploads it, or keeps it
+        in EXPORT_DIR when it is larger than the upload limit.
+        """
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return
+                
+            path = Path(self.bot.config.EXPORT_DIR) / export_filename(backend.name, format)
+            started = time.monotonic()
+            rows = await export_players(backend.db_manager, path, format, backend.table_name)
+            size = path.stat().st_size
+            summary = (f"📦 Exported {rows:,} players from **{backend.name}** "
+                       f"in {time.monotonic() - started:.1f}s ({size / 1024 / 1024:.1f} MB)")
+            logger.info(f"{interaction.user} exported {rows} players from {backend.name} to {path}")
+            
+            limit = upload_limit(interaction)
+            if size <= limit:
+                await interaction.followup.send(summary, file=discord.File(path), ephemeral=True)
+                path.unlink()
+                saved = "uploaded"
+            else:
+                await interaction.followup.send(
+                    f"{summary}\nToo large to upload (limit {limit / 1024 / 1024:.0f} MB), "
+                    f"saved on the bot host as `{path}`.",
+                    ephemeral=True
+                )
+                saved = f"`{path}`"
+                
+            await self.bot.send_log(
+                f"📤 **Economy Export**\n"
+                f"**Server:** {backend.name}\n"
+                f"**Players:** {rows:,} ({format}, {saved})\n"
+                f"**Admin:** {interaction.user.mention}\n"
+                f"**Time:** <t:{int(interaction.created_at.timestamp())}:F>"
+            )
+            
+        except Exception as e:
+            logger.error(f"Error in export command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    async def snapshot_autocomplete(self, interaction: discord.Interaction,
+                                    current: str) -> List[app_commands.Choice[str]]:
+        """Suggest snapshot files in EXPORT_DIR, newest first."""
+        export_dir = Path(self.bot.config.EXPORT_DIR)
+        if not export_dir.is_dir():
+            return []
+        current = current.strip().lower()
+        files = sorted(
+            (f for f in export_dir.iterdir() if f.is_file() and f.name.startswith('economy_')),
+            key=lambda f: f.stat().st_mtime, reverse=True
+        )
+        return [
+            app_commands.Choice(name=f.name, value=f.name)
+            for f in files if current in f.name.lower()
+        ][:AUTOCOMPLETE_LIMIT]
+        
+    @app_commands.command(name="restore", description="Restore balances from an /export snapshot")
+    @app_commands.describe(snapshot="Snapshot in the export directory", file="Snapshot file to upload instead",
+                           server="Economy server (defaults to the first configured one)")
+    @app_commands.autocomplete(snapshot=snapshot_autocomplete, server=server_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    @timed_interaction('restore')
+    async def restore(self, interaction: discord.Interaction, snapshot: Optional[str] = None,
+                      file: Optional[discord.Attachment] = None, server: Optional[str] = None):
+        """
+        Snapshot restore command.
+        Runs a dry run of the restore and asks for confirmation before applying it.
+        """
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            backend = await self._get_backend(interaction, server)
+            if backend is None:
+                return
+            if (snapshot is None) == (file is None):
+                await interaction.followup.send("❌ Choose either a snapshot or a file to upload.", ephemeral=True)
+                return
+                
+            export_dir = Path(self.bot.config.EXPORT_DIR)
+            name = snapshot if file is None else file.filename
+            if Path(name).name != name:
+                await interaction.followup.send("❌ Invalid snapshot name.", ephemeral=True)
+                return
+            try:
+                snapshot_format(Path(name))
+            except ValueError as e:
+                await interaction.followup.send(f"❌ {e}", ephemeral=True)
+                return
+            if file is not None:
+                # Kept next to the exports, so the file the restore used stays on record
+                path = export_dir / f"uploaded_{interaction.id}_{name}"
+                export_dir.mkdir(parents=True, exist_ok=True)
+                await file.save(path)
+            else:
+                path = export_dir / name
+                if not path.is_file():
+                    await interaction.followup.send(f"❌ Snapshot `{name}` not found.", ephemeral=True)
+                    return
+                    
+            diff_path = export_dir / f"preview_{backend.name}_{time.strftime('%Y%m%d_%H%M%S', time.gmtime())}.csv.gz"
+            report = await restore_snapshot(backend.db_manager, path, backend.table_name, apply=False,
+                                            diff_path=diff_path)
+            message = restore_message(report, path.name, backend.name if self.bot.backends.is_multi else None)
+            
+            if not report.changed or report.error:
+                diff_path.unlink()
+                note = "Nothing to restore." if not report.error else "Fix the problem and run /restore again."
+                await interaction.followup.send(f"{message}\n{note}", ephemeral=True)
+                return
+                
+            files = []
+            if diff_path.stat().st_size <= upload_limit(interaction):
+                files.append(discord.File(diff_path))
+            view = RestoreConfirmationView(path, self.bot.config.EXPORT_DIR, backend.db_manager, self.bot,
+                                           backend.table_name, backend=backend)
+            await interaction.followup.send(
+                f"{message}\n"
+                f"{'The full diff is attached.' if files else f'The full diff is in `{diff_path}` on the bot host.'}\n"
+                f"Restoring writes the snapshot balances in transactions of up to {BULK_CHUNK_SIZE:,} players, "
+                f"including players whose balance changes after this preview.",
+                files=files,
+                view=view,
+                ephemeral=True
+            )
+            if files:
+                diff_path.unlink()
+                
+        except ValueError as e:
+            await interaction.followup.send(f"❌ Could not read the snapshot: {e}", ephemeral=True)
+        except Exception as e:
+            logger.error(f"Error in restore command: {e}", exc_info=True)
+            await interaction.followup.send(_error_message(e), ephemeral=True)
+            
+    @app_commands.command(name="stats", description="Show bot latency and pool statistics")
+    @app_commands.default_permissions(administrator=True)
+    async def stats(self, interaction: discord.Interaction):
+        """
+        Admin command showing p50/p99 latency per database operation and
+        interaction handler, plus pool and queue utilization.
+        """
+        embed = discord.Embed(title="📈 Bot Statistics", color=discord.Color.blurple())
+        
+        embed.add_field(
+            name="Database",
+            value=_latency_lines(DB_QUERY_SECONDS, 'operation', errors=DB_ERRORS),
+            inline=False
+        )
+        embed.add_field(
+            name="Database Wait",
+            value=_latency_lines(DB_WAIT_SECONDS, 'lane', errors=DB_SHED, errors_name='shed'),
+            inline=False
+        )
+        embed.add_field(
+            name="Interactions",
+            value=_latency_lines(INTERACTION_SECONDS, 'handler'),
+            inline=False
+        )
+        
+        for backend in self.bot.backends:
+            db = backend.db_manager
+            lanes = ", ".join(db.scheduler.describe())
+            embed.add_field(
+                name=f"Pool ({backend.name})" if self.bot.backends.is_multi else "Pool",
+                value=f"In use: {db.connections_in_use}/{db.pool_capacity}\n"
+                      f"Queued: {db.queue_depth}{f' ({lanes})' if lanes else ''}\n"
+                      f"Reconnects: {db.pool.reconnects if db.pool else 0}"
+                      + "".join(f"\nReplica {i}: {r.describe()}" for i, r in enumerate(db.replicas, 1)),
+                inline=True
+            )
+        sink = self.bot.log_sink
+        if sink:
+            embed.add_field(
+                name="Log Channel",
+                value=f"Queued: {sink.queue.qsize()}\nSent: {sink.sent}\n"
+                      f"Dropped: {sink.dropped}\nFailed: {sink.failed}",
+                inline=True
+            )
+        for backend in self.bot.backends:
+            directory = backend.player_directory
+            if directory is None:
+                continue
+            boards = ", ".join(
+                f"{currency} {len(board)}{' (rebuild due)' if board.needs_rebuild else ''}"
+                for currency, board in directory.leaderboards.items()
+            )
+            embed.add_field(
+                name=f"Player Cache ({backend.name})" if self.bot.backends.is_multi else "Player Cache",
+                value=f"Players: {len(directory)}{'' if directory.is_loaded else ' (loading)'}\n"
+                      f"Version: {directory.version}\n"
+                      f"Search index: {len(directory.search_index)}\n"
+                      f"Leaderboards: {boards}",
+                inline=True
+            )
+        timings = self.bot.startup_timings
+        if timings:
+            embed.add_field(
+                name="Startup",
+                value="\n".join(f"{milestone}: {seconds:.2f}s" for milestone, seconds in timings.items()),
+                inline=True
+            )
+            
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+def _error_message(error: Exception) -> str:
+    """Reply for an interaction that failed with `error`."""
+    if isinstance(error, DatabaseOverloadedError):
+        return f"⏳ {error}"
+    return f"❌ An error occurred: {str(error)}"
+
+def _latency_lines(histogram, label: str, errors=None, limit: int = 15, errors_name: str = 'errors') -> str:
+    """
+    One line per label value: count, p50 and p99 in milliseconds.
+    
+    Args:
+        histogram: Histogram to summarize
+        label: Label distinguishing the series
+        errors: Optional counter with the same labels
+        limit: Maximum lines (busiest first)
+        errors_name: What the errors counter counts
+        
+    Returns:
+        Text for an embed field
+    """
+    series = sorted(histogram.label_sets(), key=lambda labels: -histogram.count(**labels))
+    lines = []
+    for labels in series[:limit]:
+        p50 = histogram.quantile(0.5, **labels) * 1000
+        p99 = histogram.quantile(0.99, **labels) * 1000
+        line = f"`{labels.get(label, '?')}` n={histogram.count(**labels)} p50={p50:.1f}ms p99={p99:.1f}ms"
+        if errors:
+            failed = errors.value(**labels)
+            if failed:
+                line += f" {errors_name}={failed:.0f}"
+        lines.append(line)
+    return "\n".join(lines)[:1024] or "No samples yet"
+
+def _histogram_block(histogram, width: int = 20) -> str:
+    """
+    Render histogram buckets as a text bar chart.
+    
+    Args:
+        histogram: (label, players) per bucket
+        width: Characters in the longest bar
+        
+    Returns:
+        Code block for an embed field
+    """
+    if not histogram:
+        return "No players"
+    peak = max(count for _, count in histogram) or 1
+    label_width = max(len(label) for label, _ in histogram)
+    lines = [
+        f"{label:>{label_width}} {'█' * max(1 if count else 0, round(count / peak * width)):<{width}} {count:,}"
+        for label, count in histogram
+    ]
+    return "```\n" + "\n".join(lines)[:1000] + "\n```"
 
 async def setup(bot):
     """Setup function to add cog to bot."""
+    # Player list components are resolved from their custom_id, so lists
+    # sent before a restart keep working
+    bot.add_dynamic_items(*PERSISTENT_ITEMS)
     await bot.add_cog(Economy(bot))
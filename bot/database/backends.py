@@ -0,0 +1,210 @@
+"""
+Economy Backends for Economy Manager Bot
+Version: 0.5.0
+Registry of per-server economy databases with concurrent fan-out queries
+"""
+
+import asyncio
+import heapq
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from bot.database.db_manager import UUID_PATTERN
+from bot.database.models import Player
+
+logger = logging.getLogger('economy_bot')
+
+class EconomyBackend:
+    """One Minecraft server's economy: its database, players table and caches."""
+    
+    def __init__(self, name: str, db_manager, table_name: str = 'coinsengine_users',
+                 player_directory=None, ledger=None, balance_watcher=None):
+        """
+        Initialize a backend.
+        
+        Args:
+            name: Server name shown in commands
+            db_manager: DatabaseManager with this server's connection pool
+            table_name: Name of the players table
+            player_directory: PlayerDirectory over the players table
+            ledger: LedgerWriter for this database, if enabled
+            balance_watcher: BalanceWatcher alerting on external balance changes, if enabled
+        """
+        self.name = name
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.player_directory = player_directory
+        self.ledger = ledger
+        self.balance_watcher = balance_watcher
+        
+    async def find_player(self, value: str) -> Optional[Player]:
+        """
+        Look up a player by UUID or exact name.
+        
+        Args:
+            value: Player UUID or name
+            
+        Returns:
+            Fresh player record from the database, or None if not found
+        """
+        value = value.strip()
+        if UUID_PATTERN.match(value):
+            player = await self.db_manager.get_player_by_uuid(value, self.table_name)
+            if player:
+                return player
+        return await self.db_manager.get_player_by_name(value, self.table_name)
+        
+    async def close(self):
+        """Stop the balance watcher, write pending ledger entries and close the connection pool."""
+        if self.balance_watcher:
+            await self.balance_watcher.stop()
+        if self.ledger:
+            await self.ledger.stop()
+        await self.db_manager.close()
+        
+    def __repr__(self) -> str:
+        return f"EconomyBackend({self.name!r}, table={self.table_name!r})"
+
+class BackendRegistry:
+    """
+    Named economy backends, one per server; the first one added is the default.
+    
+    Cross-server queries run against every backend at once with
+    asyncio.gather, each bounded by `timeout`. A backend that fails or times
+    out is reported next to the results of the others instead of failing the
+    whole query.
+    """
+    
+    def __init__(self, timeout: float = 10.0):
+        """
+        Initialize an empty registry.
+        
+        Args:
+            timeout: Seconds each backend gets in a cross-server query
+        """
+        self.timeout = timeout
+        self._backends: Dict[str, EconomyBackend] = {}
+        
+    def add(self, backend: EconomyBackend):
+        """Register a backend (the first one becomes the default)."""
+        if backend.name in self._backends:
+            raise ValueError(f"Duplicate economy server name: {backend.name}")
+        self._backends[backend.name] = backend
+        
+    def get(self, name: Optional[str] = None) -> Optional[EconomyBackend]:
+        """
+        Get a backend by name.
+        
+        Args:
+            name: Server name, or None for the default
+            
+        Returns:
+            Backend, or None if no server has that name
+        """
+        if not name:
+            return self.default
+        return self._backends.get(name.lower())
+        
+    @property
+    def default(self) -> Optional[EconomyBackend]:
+        return next(iter(self._backends.values()), None)
+        
+    @property
+    def is_multi(self) -> bool:
+        """Whether more than one server is configured."""
+        return len(self._backends) > 1
+        
+    def names(self) -> List[str]:
+        return list(self._backends)
+        
+    def __iter__(self) -> Iterator[EconomyBackend]:
+        return iter(list(self._backends.values()))
+        
+    def __len__(self) -> int:
+        return len(self._backends)
+        
+    async def gather(self, func: Callable[[EconomyBackend], Awaitable[Any]],
+                     names: Optional[List[str]] = None) -> Tuple[Dict[str, Any], Dict[str, Exception]]:
+        """
+        Run a query against several backends concurrently.
+        
+        Args:
+            func: Coroutine function called with each backend
+            names: Servers to query (defaults to all)
+            
+        Returns:
+            Tuple of (results by server, errors by server), both in registration order
+        """
+        backends = [b for b in self if names is None or b.name in names]
+        
+        async def call(backend: EconomyBackend):
+            return await asyncio.wait_for(func(backend), self.timeout)
+            
+        outcomes = await asyncio.gather(*(call(b) for b in backends), return_exceptions=True)
+        results, errors = {}, {}
+        for backend, outcome in zip(backends, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, Exception):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    outcome = TimeoutError(f"no response within {self.timeout:g}s")
+                logger.warning(f"Economy server {backend.name} failed a cross-server query: {outcome}")
+                errors[backend.name] = outcome
+            else:
+                results[backend.name] = outcome
+        return results, errors
+        
+    async def find_player(self, value: str) -> Tuple[Dict[str, Player], Dict[str, Exception]]:
+        """
+        Look up a player on every server at once.
+        
+        Args:
+            value: Player UUID or name
+            
+        Returns:
+            Tuple of (player by server, for servers that have them; errors by server)
+        """
+        results, errors = await self.gather(lambda backend: backend.find_player(value))
+        return {name: player for name, player in results.items() if player}, errors
+        
+    async def totals(self) -> Tuple[Dict[str, dict], Dict[str, Exception]]:
+        """
+        Players and currency supply per server, from each directory's cached statistics.
+        
+        Returns:
+            Tuple of ({server: {'players', 'gems', 'coins'}}, errors by server)
+        """
+        async def server_totals(backend: EconomyBackend) -> dict:
+            stats = await backend.player_directory.get_economy_stats()
+            return {
+                'players': stats['players'],
+                **{currency: data['total'] for currency, data in stats['currencies'].items()},
+            }
+            
+        return await self.gather(server_totals)
+        
+    async def top(self, currency: str, limit: int) -> Tuple[List[Tuple[str, str, float]], Dict[str, Exception]]:
+        """
+        Network-wide ranking merged from every server's leaderboard.
+        
+        Args:
+            currency: 'gems' or 'coins'
+            limit: Entries to return
+            
+        Returns:
+            Tuple of ([(server, uuid, balance)] best first, errors by server)
+        """
+        async def server_top(backend: EconomyBackend) -> List[Tuple[float, str, str]]:
+            board = await backend.player_directory.get_leaderboard(currency)
+            return [(-balance, backend.name, player_uuid) for _, player_uuid, balance in board.page(0, limit)]
+            
+        results, errors = await self.gather(server_top)
+        merged = heapq.merge(*results.values())
+        return [(server, player_uuid, -key) for key, server, player_uuid in merged][:limit], errors
+        
+    async def close(self):
+        """Close every backend concurrently."""
+        outcomes = await asyncio.gather(*(b.close() for b in self), return_exceptions=True)
+        for backend, outcome in zip(self, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error closing economy server {backend.name}: {outcome}")
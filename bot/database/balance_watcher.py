@@ -0,0 +1,282 @@
+"""
+Balance Watcher for Economy Manager Bot
+Version: 0.5.0
+Flags unusual balance changes made outside the bot (plugin, console, exploits)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bot.database.models import Player, PlayerTable
+from bot.utils.leaderboard import CURRENCIES
+from bot.utils.metrics import BALANCE_ALERTS, BALANCE_CHANGES
+
+logger = logging.getLogger('economy_bot')
+
+# Recent external changes per currency the statistical threshold is measured against
+HISTORY_SIZE = 10_000
+
+# External changes needed before the statistical threshold applies
+MIN_SAMPLES = 200
+
+# Seconds a change made through the bot is waited for before it's forgotten
+EXPECTED_CHANGE_TTL = 900.0
+
+# Flagged changes listed per alert message (the rest are only counted)
+MAX_ALERT_LINES = 10
+
+# Balances closer than this are treated as unchanged (float noise from DECIMAL columns)
+EPSILON = 1e-6
+
+class BalanceChanges:
+    """Players whose balances moved between two snapshots, with before/after columns in CURRENCIES order."""
+    
+    __slots__ = ('uuids', 'names', 'before', 'after')
+    
+    def __init__(self, uuids: List[str], names: List[str], before: np.ndarray, after: np.ndarray):
+        self.uuids = uuids
+        self.names = names
+        self.before = before  # (players, currencies)
+        self.after = after
+        
+    def __len__(self) -> int:
+        return len(self.uuids)
+        
+    @classmethod
+    def from_rows(cls, pairs: Sequence[Tuple[Player, Player]]) -> 'BalanceChanges':
+        """Changes from (cached row, fresh row) pairs merged by an incremental refresh."""
+        before = np.array([[getattr(old, c) for c in CURRENCIES] for old, _ in pairs], dtype=np.float64)
+        after = np.array([[getattr(new, c) for c in CURRENCIES] for _, new in pairs], dtype=np.float64)
+        return cls([new.uuid for _, new in pairs], [new.name for _, new in pairs],
+                   before.reshape(-1, len(CURRENCIES)), after.reshape(-1, len(CURRENCIES)))
+        
+    @classmethod
+    def between(cls, old: PlayerTable, new: PlayerTable) -> 'BalanceChanges':
+        """
+        Changes between two full snapshots, matched by row id.
+        
+        Pure array work (argsort and searchsorted over the id columns), so a
+        million-row diff takes a fraction of a second; run it in a worker
+        thread. Players only in one of the snapshots are not changes.
+        """
+        old_ids = np.frombuffer(old.ids, dtype=np.int64)
+        new_ids = np.frombuffer(new.ids, dtype=np.int64)
+        empty = np.empty((0, len(CURRENCIES)))
+        if not old_ids.size or not new_ids.size:
+            return cls([], [], empty, empty)
+            
+        order = np.argsort(old_ids, kind='stable')
+        positions = np.minimum(np.searchsorted(old_ids, new_ids, sorter=order), old_ids.size - 1)
+        matched = old_ids[order[positions]] == new_ids
+        new_rows = np.flatnonzero(matched)
+        old_rows = order[positions[matched]]
+        
+        before = np.column_stack([np.frombuffer(getattr(old, c), dtype=np.float64)[old_rows] for c in CURRENCIES])
+        after = np.column_stack([np.frombuffer(getattr(new, c), dtype=np.float64)[new_rows] for c in CURRENCIES])
+        moved = np.flatnonzero((np.abs(after - before) > EPSILON).any(axis=1))
+        rows = new_rows[moved].tolist()
+        return cls([new.uuids[i] for i in rows], [new.names[i] for i in rows], before[moved], after[moved])
+
+class BalanceWatcher:
+    """
+    Alerts on balance changes the bot didn't make.
+    
+    The watcher rides on the server's PlayerDirectory: every `interval`
+    seconds it asks the directory to refresh, which pulls only rows past the
+    id and last_online watermarks (from a replica when one is configured)
+    and hands the watcher each changed player's old and new balances. Edits
+    that move neither watermark, such as console changes to offline players,
+    are found by `check_balances()`, which compares the next `scan_rows`
+    balances in id order with the cached ones every poll; the periodic full
+    reload is diffed against the previous snapshot as well. Changes made
+    through the bot are reported to `expect()` by the DatabaseManager and
+    subtracted, so only external changes remain.
+    
+    An external change is flagged when its size reaches the absolute
+    threshold for its currency, or when its robust z-score (distance from
+    the median in median absolute deviations) over the last HISTORY_SIZE
+    external changes reaches `zscore`. Flagged changes are sent as one
+    message per cycle.
+    """
+    
+    def __init__(self, directory, send: Callable[[str], Awaitable[None]], server: str = 'main',
+                 interval: float = 60.0, thresholds: Optional[Dict[str, float]] = None,
+                 zscore: float = 10.0, scan_rows: int = 200_000, show_server: bool = False):
+        """
+        Initialize the watcher.
+        
+        Args:
+            directory: PlayerDirectory of the watched server
+            send: Coroutine function posting a message (EconomyBot.send_log)
+            server: Server name (metrics label)
+            interval: Seconds between polls
+            thresholds: Absolute change per currency that always alerts (0 or missing disables)
+            zscore: Robust z-score that alerts (0 disables)
+            scan_rows: Balances compared with the cache per poll (0 disables)
+            show_server: Name the server in alerts (when several are configured)
+        """
+        self.directory = directory
+        self.send = send
+        self.interval = interval
+        self.thresholds = {c: float((thresholds or {}).get(c) or 0) for c in CURRENCIES}
+        self.zscore = zscore
+        self.scan_rows = scan_rows
+        self.server = server
+        self.show_server = show_server
+        self.observed = 0  # External changes seen
+        self.flagged = 0  # External changes alerted on
+        self._expected: Dict[str, Tuple[np.ndarray, float]] = {}  # UUID -> (deltas by the bot, monotonic time)
+        self._history = np.zeros((HISTORY_SIZE, len(CURRENCIES)))
+        self._history_size = np.zeros(len(CURRENCIES), dtype=np.int64)  # Samples ever added per currency
+        self._pending: List[Tuple[float, str, str, str, float, float]] = []  # Flagged, not yet sent
+        self._task: Optional[asyncio.Task] = None
+        
+    def start(self):
+        """Start polling in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+            
+    async def stop(self):
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            
+    def expect(self, player_uuid: str, currency: str, delta: float):
+        """
+        Record a change made through the bot, so it isn't alerted on.
+        
+        Args:
+            player_uuid: Player whose balance changed
+            currency: 'gems' or 'coins'
+            delta: Amount applied
+        """
+        deltas = self._expected[player_uuid][0] if player_uuid in self._expected else np.zeros(len(CURRENCIES))
+        deltas[CURRENCIES.index(currency)] += delta
+        self._expected[player_uuid] = (deltas, time.monotonic())
+        
+    def observe(self, changes: BalanceChanges):
+        """
+        Check the changes from one directory refresh and queue alerts for unusual ones.
+        
+        Args:
+            changes: Old and new balances of the players that changed
+        """
+        if not len(changes):
+            return
+        deltas = changes.after - changes.before
+        if self._expected:
+            # The bot's own changes (and the part of a concurrent change it made) aren't external
+            for row, player_uuid in enumerate(changes.uuids):
+                expected = self._expected.pop(player_uuid, None)
+                if expected is not None:
+                    deltas[row] -= expected[0]
+                    
+        external = np.abs(deltas) > EPSILON
+        flagged = np.zeros_like(external)
+        scores = np.zeros_like(deltas)
+        for column, currency in enumerate(CURRENCIES):
+            sizes = np.abs(deltas[external[:, column], column])
+            if not sizes.size:
+                continue
+            limit = self.thresholds[currency]
+            hits = sizes >= limit if limit > 0 else np.zeros(sizes.size, dtype=bool)
+            score = self._scores(column, sizes)
+            if score is not None:
+                hits |= score >= self.zscore
+                scores[external[:, column], column] = score
+            flagged[external[:, column], column] = hits
+            self._remember(column, sizes)
+            BALANCE_CHANGES.inc(int(sizes.size), server=self.server, currency=currency)
+            BALANCE_ALERTS.inc(int(hits.sum()), server=self.server, currency=currency)
+            
+        self.observed += int(external.sum())
+        self.flagged += int(flagged.sum())
+        for row, column in zip(*np.nonzero(flagged)):
+            self._pending.append((
+                float(scores[row, column]), changes.uuids[row], changes.names[row], CURRENCIES[column],
+                float(changes.before[row, column]), float(deltas[row, column]),
+            ))
+            
+    def _scores(self, column: int, sizes: np.ndarray) -> Optional[np.ndarray]:
+        """Robust z-scores of change sizes against the history, or None if it can't judge yet."""
+        if self.zscore <= 0 or self._history_size[column] < MIN_SAMPLES:
+            return None
+        history = self._history[:min(self._history_size[column], HISTORY_SIZE), column]
+        median = np.median(history)
+        spread = 1.4826 * np.median(np.abs(history - median))
+        if spread <= 0:
+            # Most recent changes were the same size; fall back to the mean deviation
+            spread = 1.2533 * np.mean(np.abs(history - median))
+        if spread <= 0:
+            return None
+        return (sizes - median) / spread
+        
+    def _remember(self, column: int, sizes: np.ndarray):
+        """Add change sizes to the ring buffer of recent external changes."""
+        sizes = sizes[-HISTORY_SIZE:]
+        start = self._history_size[column] % HISTORY_SIZE
+        slots = (start + np.arange(sizes.size)) % HISTORY_SIZE
+        self._history[slots, column] = sizes
+        self._history_size[column] += sizes.size
+        
+    def _expire(self):
+        """Forget bot changes that no refresh has picked up in time."""
+        cutoff = time.monotonic() - EXPECTED_CHANGE_TTL
+        for player_uuid in [u for u, (_, at) in self._expected.items() if at < cutoff]:
+            del self._expected[player_uuid]
+            
+    def alert_message(self) -> Optional[str]:
+        """
+        Take the queued flagged changes as one log message.
+        
+        Returns:
+            Message listing the largest changes first, or None if nothing was flagged
+        """
+        if not self._pending:
+            return None
+        pending, self._pending = self._pending, []
+        pending.sort(key=lambda item: abs(item[5]), reverse=True)
+        server = f" ({self.server})" if self.show_server else ''
+        lines = [f"🚨 **Unusual Balance Changes**{server} - {len(pending)} not made by the bot"]
+        for score, player_uuid, name, currency, before, delta in pending[:MAX_ALERT_LINES]:
+            icon = '💎' if currency == 'gems' else '🪙'
+            reasons = []
+            if self.thresholds[currency] > 0 and abs(delta) >= self.thresholds[currency]:
+                reasons.append(f"over {self.thresholds[currency]:,.0f}")
+            if self.zscore > 0 and score >= self.zscore:
+                reasons.append(f"z {score:,.1f}")
+            lines.append(
+                f"• **{name}** (`{player_uuid}`): {icon} {delta:+,.2f} {currency} "
+                f"({before:,.2f} → {before + delta:,.2f}) - {', '.join(reasons)}"
+            )
+        if len(pending) > MAX_ALERT_LINES:
+            lines.append(f"…and {len(pending) - MAX_ALERT_LINES} more")
+        lines.append(f"**Time:** <t:{int(time.time())}:F>")
+        return '\n'.join(lines)
+        
+    async def poll(self):
+        """Refresh the directory and check the next slice of balances (observing the changes), then send any alert."""
+        await self.directory.refresh()
+        if self.scan_rows > 0:
+            await self.directory.check_balances(self.scan_rows)
+        self._expire()
+        message = self.alert_message()
+        if message:
+            logger.warning(message.splitlines()[0].replace('**', ''))
+            await self.send(message)
+            
+    async def _worker(self):
+        """Poll every `interval` seconds."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Balance watcher poll failed: {e}", exc_info=True)
@@ -4,18 +4,122 @@ Version: 0.1.0
 Handles MySQL database connections and queries
 """
 
+import asyncio
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error, errors
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
-from typing import List, Dict, Optional, Tuple
+import re
+import time
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Sequence, Tuple
+
+from bot.database.ledger import LEDGER_COLUMNS, LEDGER_SELECT, LedgerEntry, LedgerWriter
+from bot.database.models import PLAYER_SELECT, Player, PlayerTable
+from bot.database.pool import ConnectionPool, PoolClosedError, PoolTimeoutError
+from bot.database.replicas import Replica, read_replication_lag
+from bot.database.scheduler import DatabaseOverloadedError, Lane, WorkScheduler
+from bot.utils.metrics import (DB_CHECKOUT_SECONDS, DB_ERRORS, DB_POOL_TIMEOUTS, DB_QUERY_SECONDS,
+                               DB_REPLICA_FALLBACKS, DB_SINGLE_FLIGHT, registry)
 
 logger = logging.getLogger('economy_bot')
 
+# Minecraft UUIDs, with or without dashes
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$')
+
+def normalize_uuid(value: str) -> str:
+    """
+    Bring a UUID matching UUID_PATTERN into the form CoinsEngine stores (lowercase, dashed).
+    
+    Args:
+        value: UUID with or without dashes, in any case
+        
+    Returns:
+        e.g. '069a79f4-44e9-4726-a5be-fca90e38aaf5'
+    """
+    digits = value.replace('-', '').lower()
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+# Columns the bot filters or sorts on: uuid/name point lookups, name keyset
+# pagination (InnoDB appends the primary key to secondary indexes) and
+# last_online incremental refreshes
+INDEXED_COLUMNS = ('uuid', 'name', 'last_online')
+
+# Rows per IN (...) list / CASE statement in bulk operations
+BULK_CHUNK_SIZE = 1000
+
+# Rows fetched per round trip when streaming a full table
+FETCH_BATCH_SIZE = 5000
+
+# Players pinned to the primary after a write, before old pins are pruned
+MAX_PINNED_PLAYERS = 1024
+
+# Scheduler lane per operation (see _operation_name); everything else is a lookup
+OPERATION_LANES = {
+    'adjust_currency': Lane.WRITE,
+    'insert_ledger_entries': Lane.WRITE,
+    'get_all_players': Lane.BULK,
+    'get_players_changed_since': Lane.BULK,
+    'get_players_after_id': Lane.BULK,
+    'count_players': Lane.BULK,
+    'bulk_update_currency': Lane.BULK,
+    'restore_balances': Lane.BULK,
+    'ensure_ledger_table': Lane.BULK,
+    'check_indexes': Lane.BULK,
+}
+
+def _execute_script(cursor, operation: str, params: Sequence[Any] = ()) -> List[Optional[tuple]]:
+    """
+    Run several ;-separated statements in a single round trip.
+    
+    Args:
+        cursor: Buffered cursor
+        operation: Statements, with %s placeholders across all of them
+        params: Parameters for every placeholder, in order
+        
+    Returns:
+        First row of each statement's result (None for statements without rows)
+    """
+    if mysql.connector.__version_info__[:2] < (9, 2):
+        # Older connectors only run multi-statement strings with multi=True
+        return [result.fetchone() if result.with_rows else None
+                for result in cursor.execute(operation, params, multi=True)]
+    cursor.execute(operation, params)
+    rows = [cursor.fetchone() if cursor.with_rows else None]
+    while cursor.nextset():
+        rows.append(cursor.fetchone() if cursor.with_rows else None)
+    return rows
+
 class DatabaseManager:
-    """Manages MySQL database connections and operations."""
+    """
+    Manages MySQL database connections and operations.
+    
+    mysql.connector is a blocking driver, so every pool checkout and query runs
+    on a bounded thread pool executor. The public coroutines never touch a
+    socket on the event loop thread. When every connection is busy, callers
+    wait on the event loop for one to free up (up to `pool_timeout`).
+    
+    Each pool is fronted by a WorkScheduler: writes are started before point
+    lookups and lookups before bulk work (OPERATION_LANES), bulk work never
+    takes every connection, and work beyond `max_queue` queued operations is
+    shed with DatabaseOverloadedError. Identical reads in flight at the same
+    time share one query.
+    
+    With replicas configured, read-only methods go to the least busy replica
+    whose replication lag is within `replica_max_lag`, and to the primary
+    when none is. Writes always go to the primary, and a player written
+    through this manager is read from the primary until replicas have had
+    time to catch up, so a read right after a change sees it.
+    """
     
     def __init__(self, host: str, port: int, user: str, password: str, database: str, 
-                 pool_name: str = "economy_pool", pool_size: int = 5):
+                 pool_name: str = "economy_pool", pool_size: int = 5,
+                 max_workers: Optional[int] = None, count_cache_ttl: float = 60.0,
+                 max_overflow: int = 0, pool_timeout: float = 10.0, pool_recycle: float = 3600.0,
+                 pre_ping: bool = True, connect_timeout: int = 10,
+                 replicas: Sequence[Tuple[str, int]] = (), replica_max_lag: float = 5.0,
+                 replica_check_interval: float = 5.0, max_queue: int = 100,
+                 bulk_concurrency: Optional[int] = None):
         """
         Initialize database manager with connection pooling.
         
@@ -27,6 +131,18 @@ class DatabaseManager:
             database: Database name
             pool_name: Connection pool name
             pool_size: Number of connections in pool
+            max_workers: Executor threads running queries (defaults to pool_size + max_overflow)
+            count_cache_ttl: Seconds to reuse a cached player count
+            max_overflow: Extra connections opened under load and closed when idle
+            pool_timeout: Seconds an operation waits for a free connection
+            pool_recycle: Replace connections older than this many seconds (0 disables)
+            pre_ping: Ping idle connections before reuse, reconnecting dead ones
+            connect_timeout: Seconds to wait when opening a connection
+            replicas: (host, port) of read replicas, reached with the same credentials
+            replica_max_lag: Most seconds a replica may lag behind and still serve reads
+            replica_check_interval: Seconds between replication lag checks per replica
+            max_queue: Operations waiting per pool before new ones are shed (0 never sheds)
+            bulk_concurrency: Connections bulk work may use at once (defaults to all but one)
         """
         self.config = {
             'host': host,
@@ -34,11 +150,229 @@ class DatabaseManager:
             'user': user,
             'password': password,
             'database': database,
-            'pool_name': pool_name,
-            'pool_size': pool_size
+            'connection_timeout': connect_timeout,
+            'autocommit': False
         }
-        self.pool = None
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pre_ping = pre_ping
+        self.pool: Optional[ConnectionPool] = None
+        self.count_cache_ttl = count_cache_ttl
+        self._count_cache: Dict[str, Tuple[int, float]] = {}  # table -> (count, fetched at)
+        self.replica_endpoints = list(replicas)
+        self.replica_max_lag = replica_max_lag
+        self.replica_check_interval = replica_check_interval
+        self.replicas: List[Replica] = []  # Created by connect()
+        self._pinned: Dict[str, float] = {}  # Player UUID/name -> monotonic time reads may use replicas again
+        # One worker per connection: more threads would only block on an
+        # exhausted pool, fewer would leave connections idle.
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.pool_capacity * (1 + len(self.replica_endpoints)),
+            thread_name_prefix=f"{pool_name}_worker"
+        )
+        # Operations wait here (on the event loop) for a free connection, so
+        # an exhausted pool queues callers instead of failing them
+        self.max_queue = max_queue
+        self.bulk_concurrency = bulk_concurrency
+        self.scheduler = WorkScheduler(pool_name, self.pool_capacity, max_queue, bulk_concurrency)
+        self._inflight: Dict[tuple, asyncio.Future] = {}  # Read key -> running query, shared by identical reads
+        self._closed = False
+        self.ledger: Optional[LedgerWriter] = None  # Records successful balance changes when set
+        self.balance_watcher = None  # BalanceWatcher told about the bot's own balance changes when set
+        registry.gauge('economy_db_pool_size', 'Connections that can be checked out at once').set_function(
+            lambda: self.pool_capacity, pool=pool_name)
+        registry.gauge('economy_db_pool_in_use', 'Connections checked out of the pool').set_function(
+            lambda: self.connections_in_use, pool=pool_name)
+        registry.gauge('economy_db_pool_idle', 'Open connections waiting in the pool').set_function(
+            lambda: self.pool.idle if self.pool else 0, pool=pool_name)
+        registry.gauge('economy_db_queue_depth', 'Operations waiting for a connection').set_function(
+            lambda: self.queue_depth, pool=pool_name)
+            
+    @property
+    def pool_capacity(self) -> int:
+        """Most connections in use at once (pool size plus overflow)."""
+        return self.pool_size + self.max_overflow
+        
+    @property
+    def connections_in_use(self) -> int:
+        """Connections currently checked out of the pool."""
+        return self.pool.checked_out if self.pool else 0
+        
+    @property
+    def queue_depth(self) -> int:
+        """Operations waiting for a connection, on the primary and replicas."""
+        return self.scheduler.waiting + sum(r.scheduler.waiting for r in self.replicas)
+        
+    @staticmethod
+    def _operation_name(func: Callable) -> str:
+        """Metric label for a sync body, e.g. _get_player_sync -> get_player."""
+        name = getattr(func, '__name__', 'unknown')
+        if name.endswith('_sync'):
+            name = name[:-len('_sync')]
+        return name.lstrip('_')
+        
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking database function on the executor.
+        
+        Waits up to `pool_timeout` seconds for a free connection first.
+        
+        Args:
+            func: Callable taking a pooled connection as its first argument
+            *args: Extra positional arguments for func
+            **kwargs: Extra keyword arguments for func
+            
+        Returns:
+            Whatever func returns
+            
+        Raises:
+            PoolTimeoutError: No connection became free in time
+            PoolClosedError: close() was called
+            DatabaseOverloadedError: Too much work is queued to accept this operation
+        """
+        return await self._submit(self._get_connection, self.scheduler, self.pool_name, func, args, kwargs)
+        
+    async def _run_read(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a read-only database function on a replica, or on the primary.
+        
+        Uses the least busy replica within replica_max_lag. If it fails with
+        a connection error, it is taken out of rotation for
+        replica_check_interval seconds and the primary answers instead.
+        
+        A call identical to one still running (same function and arguments)
+        waits for that one's result instead of running another query, so the
+        result is shared and must not be modified.
+        
+        Args:
+            func: Callable taking a pooled connection as its first argument
+            *args: Extra positional arguments for func
+            **kwargs: Extra keyword arguments for func
+            
+        Returns:
+            Whatever func returns
+        """
+        key = (self._operation_name(func), args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return await self._read_once(func, args, kwargs)
+            
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            DB_SINGLE_FLIGHT.inc(operation=key[0], pool=self.pool_name)
+        else:
+            inflight = asyncio.ensure_future(self._read_once(func, args, kwargs))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the query for the others
+        return await asyncio.shield(inflight)
+        
+    async def _read_once(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run one read on a usable replica, falling back to the primary."""
+        replica = await self._pick_replica()
+        if replica is not None:
+            try:
+                return await self._submit(replica.pool.get_connection, replica.scheduler, replica.name,
+                                          func, args, kwargs)
+            except (PoolClosedError, errors.ProgrammingError, errors.DataError, errors.IntegrityError):
+                # Not the replica's fault: the primary would fail the same way
+                raise
+            except DatabaseOverloadedError:
+                # Busy, not unreachable: it stays in rotation and the primary answers this read
+                DB_REPLICA_FALLBACKS.inc(pool=replica.name)
+            except Error as e:
+                replica.mark_failed(e, self.replica_check_interval)
+                DB_REPLICA_FALLBACKS.inc(pool=replica.name)
+        return await self._run(func, *args, **kwargs)
         
+    async def _pick_replica(self) -> Optional[Replica]:
+        """Least busy replica within replica_max_lag, re-checking lag where due."""
+        if not self.replicas:
+            return None
+        now = time.monotonic()
+        due = [r for r in self.replicas if not r.checking and now >= r.failed_until
+               and now - r.checked_at >= self.replica_check_interval]
+        if due:
+            await asyncio.gather(*(self._check_replica(r) for r in due))
+        usable = [r for r in self.replicas if r.usable(self.replica_max_lag)]
+        return min(usable, key=lambda r: r.pool.checked_out) if usable else None
+        
+    async def _check_replica(self, replica: Replica):
+        """Refresh a replica's replication lag."""
+        replica.checking = True
+        try:
+            lag = await self._submit(replica.pool.get_connection, replica.scheduler, replica.name,
+                                     read_replication_lag, (), {})
+            replica.record_lag(lag)
+        except (Error, DatabaseOverloadedError) as e:
+            replica.mark_failed(e, self.replica_check_interval)
+        finally:
+            replica.checking = False
+            
+    def _pin_to_primary(self, *keys: Optional[str]):
+        """Read these players from the primary until replicas have caught up with a write."""
+        if not self.replicas:
+            return
+        now = time.monotonic()
+        if len(self._pinned) >= MAX_PINNED_PLAYERS:
+            self._pinned = {k: until for k, until in self._pinned.items() if until > now}
+        # Lag may have grown up to replica_max_lag since the last check
+        until = now + self.replica_max_lag + self.replica_check_interval
+        for key in keys:
+            if key:
+                self._pinned[key.lower()] = until
+                
+    def _is_pinned(self, key: str) -> bool:
+        until = self._pinned.get(key.lower())
+        return until is not None and until > time.monotonic()
+        
+    async def _submit(self, get_connection: Callable, scheduler: WorkScheduler, pool_name: str,
+                      func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Wait for a slot in the operation's lane, then run func on the executor with a connection."""
+        if self._closed:
+            raise PoolClosedError(msg=f"Database manager {self.pool_name} is closed")
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._with_connection, get_connection, pool_name, func, *args, **kwargs)
+        operation = self._operation_name(func)
+        lane = OPERATION_LANES.get(operation, Lane.LOOKUP)
+        started = time.perf_counter()
+        try:
+            try:
+                await scheduler.acquire(lane, self.pool_timeout)
+            except asyncio.TimeoutError:
+                DB_POOL_TIMEOUTS.inc(pool=pool_name)
+                raise PoolTimeoutError(
+                    msg=f"Database busy: no connection available within {self.pool_timeout:g}s"
+                ) from None
+            try:
+                return await loop.run_in_executor(self.executor, call)
+            finally:
+                scheduler.release(lane)
+        except Exception:
+            DB_ERRORS.inc(operation=operation, pool=pool_name)
+            raise
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation=operation, pool=pool_name)
+            
+    @staticmethod
+    def _with_connection(get_connection: Callable, pool_name: str, func: Callable, *args, **kwargs) -> Any:
+        """Check out a connection, run func with it and return it to the pool (executor thread)."""
+        started = time.perf_counter()
+        connection = get_connection()
+        DB_CHECKOUT_SECONDS.observe(time.perf_counter() - started, pool=pool_name)
+        try:
+            return func(connection, *args, **kwargs)
+        except (errors.OperationalError, errors.InterfaceError):
+            # Lost connection: make sure it is not handed out again
+            connection.invalidate()
+            raise
+        finally:
+            connection.close()
+            
     async def connect(self) -> bool:
         """
         Establish database connection pool.
@@ -46,24 +380,80 @@ class DatabaseManager:
         Returns:
             True if successful, False otherwise
         """
+        # Replica pools open connections on first use; lag checks decide when they serve reads
+        self.replicas = []
+        for i, (host, port) in enumerate(self.replica_endpoints, 1):
+            pool = self._create_replica_pool(i, host, port)
+            self.replicas.append(Replica(pool, WorkScheduler(pool.name, pool.capacity, self.max_queue,
+                                                             self.bulk_concurrency)))
+        loop = asyncio.get_running_loop()
         try:
-            self.pool = mysql.connector.pooling.MySQLConnectionPool(**self.config)
-            logger.info(f"Database connection pool created: {self.config['pool_name']}")
+            return await loop.run_in_executor(self.executor, self._connect_sync)
+        except Error as e:
+            logger.error(f"Database connection error: {e}")
+            return False
             
-            # Test connection
-            connection = self.pool.get_connection()
+    def _connect_sync(self) -> bool:
+        """Create the pool and test a connection (executor thread)."""
+        self.pool = ConnectionPool(
+            functools.partial(mysql.connector.connect, **self.config),
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            timeout=self.pool_timeout,
+            recycle=self.pool_recycle,
+            pre_ping=self.pre_ping,
+            name=self.pool_name
+        )
+        logger.info(f"Database connection pool created: {self.pool_name} "
+                    f"(size {self.pool_size}, overflow {self.max_overflow})")
+                    
+        # Test connection
+        connection = self.pool.get_connection()
+        try:
             if connection.is_connected():
                 logger.info("Database connection test successful")
-                connection.close()
                 return True
-        except Error as e:
-            logger.error(f"Database connection error: {e}")
             return False
+        finally:
+            connection.close()
             
-    async def close(self):
-        """Close all database connections."""
-        # MySQL connector pool doesn't have explicit close, connections auto-close
-        logger.info("Database connections will auto-close")
+    def _create_replica_pool(self, number: int, host: str, port: int) -> ConnectionPool:
+        """Pool for one read replica, sized like the primary's (connections open on first use)."""
+        name = f"{self.pool_name}_replica{number}"
+        pool = ConnectionPool(
+            functools.partial(mysql.connector.connect, **{**self.config, 'host': host, 'port': port}),
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            timeout=self.pool_timeout,
+            recycle=self.pool_recycle,
+            pre_ping=self.pre_ping,
+            name=name
+        )
+        registry.gauge('economy_db_pool_in_use', 'Connections checked out of the pool').set_function(
+            lambda: pool.checked_out, pool=name)
+        registry.gauge('economy_db_pool_idle', 'Open connections waiting in the pool').set_function(
+            lambda: pool.idle, pool=name)
+        logger.info(f"Read replica pool created: {name} ({host}:{port})")
+        return pool
+        
+    async def close(self, timeout: float = 10.0):
+        """
+        Close all database connections.
+        
+        New operations fail immediately; running ones get up to `timeout`
+        seconds to finish before their connections are closed.
+        
+        Args:
+            timeout: Seconds to wait for checked-out connections
+        """
+        self._closed = True
+        for pool in [self.pool] + [r.pool for r in self.replicas]:
+            if pool:
+                remaining = await asyncio.to_thread(pool.close, timeout)
+                if remaining:
+                    logger.warning(f"Closed pool {pool.name} with {remaining} connection(s) still in use")
+        self.executor.shutdown(wait=False)
+        logger.info("Database connections closed")
         
     def _get_connection(self):
         """Get connection from pool."""
@@ -71,7 +461,7 @@ class DatabaseManager:
             raise Exception("Database pool not initialized")
         return self.pool.get_connection()
         
-    async def get_all_players(self, table_name: str = 'coinsengine_users') -> List[Dict[str, any]]:
+    async def get_all_players(self, table_name: str = 'coinsengine_users') -> PlayerTable:
         """
         Retrieve all players from database.
         
@@ -79,27 +469,327 @@ class DatabaseManager:
             table_name: Name of the players table
             
         Returns:
-            List of player dictionaries
+            Columnar table of players (empty on error)
         """
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor(dictionary=True)
+            players = await self._run_read(self._get_all_players_sync, table_name)
+            logger.debug(f"Retrieved {len(players)} players from database")
+            return players
             
-            query = f"SELECT id, uuid, name, gems, coins, last_online FROM {table_name} ORDER BY name"
+        except Error as e:
+            logger.error(f"Error fetching players: {e}")
+            return PlayerTable()
+            
+    def _get_all_players_sync(self, connection, table_name: str) -> PlayerTable:
+        """Blocking body of get_all_players (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            query = f"SELECT {PLAYER_SELECT} FROM {table_name} ORDER BY name"
             cursor.execute(query)
-            players = cursor.fetchall()
+            # Tuples straight into the columns, a batch at a time, so the
+            # full result never exists as one list of row objects
+            table = PlayerTable()
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+                if not rows:
+                    return table
+                for row in rows:
+                    table.append_row(row)
+        finally:
+            cursor.close()
             
+    async def stream_players(self, table_name: str = 'coinsengine_users',
+                             batch_size: int = FETCH_BATCH_SIZE) -> AsyncIterator[List[Player]]:
+        """
+        Stream every player in id order, one batch at a time.
+        
+        Rows come from a single unbuffered cursor, so MySQL sends them as
+        they are fetched and only one batch is held in memory whatever the
+        table size. One connection (a replica's when one is usable) is held
+        in the bulk lane until the generator is exhausted or closed; close it
+        with `aclose()` when stopping early.
+        
+        Args:
+            table_name: Name of the players table
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Lists of up to batch_size player records
+            
+        Raises:
+            Error: The query failed (batches already yielded are not repeated)
+            DatabaseOverloadedError: Too much work is queued to start an export
+        """
+        if self._closed:
+            raise PoolClosedError(msg=f"Database manager {self.pool_name} is closed")
+        replica = await self._pick_replica()
+        if replica is not None:
+            get_connection, scheduler, pool_name = replica.pool.get_connection, replica.scheduler, replica.name
+        else:
+            get_connection, scheduler, pool_name = self._get_connection, self.scheduler, self.pool_name
+            
+        try:
+            await scheduler.acquire(Lane.BULK, self.pool_timeout)
+        except asyncio.TimeoutError:
+            DB_POOL_TIMEOUTS.inc(pool=pool_name)
+            raise PoolTimeoutError(
+                msg=f"Database busy: no connection available within {self.pool_timeout:g}s"
+            ) from None
+            
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        connection = cursor = None
+        finished = False
+        try:
+            connection = await loop.run_in_executor(self.executor, get_connection)
+            cursor = await loop.run_in_executor(self.executor, self._open_player_stream_sync,
+                                                connection, table_name)
+            while True:
+                rows = await loop.run_in_executor(self.executor, cursor.fetchmany, batch_size)
+                if not rows:
+                    finished = True
+                    return
+                yield [Player.from_row(row) for row in rows]
+        except Exception:
+            DB_ERRORS.inc(operation='stream_players', pool=pool_name)
+            raise
+        finally:
+            if connection is not None:
+                await loop.run_in_executor(self.executor, self._close_stream_sync, connection, cursor, finished)
+            scheduler.release(Lane.BULK)
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation='stream_players', pool=pool_name)
+            
+    def _open_player_stream_sync(self, connection, table_name: str):
+        """Start the unbuffered players query of stream_players (executor thread)."""
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(f"SELECT {PLAYER_SELECT} FROM {table_name} ORDER BY id")
+            return cursor
+        except Exception:
             cursor.close()
+            raise
+            
+    @staticmethod
+    def _close_stream_sync(connection, cursor, finished: bool):
+        """Close a stream's cursor and return its connection (executor thread)."""
+        if not finished:
+            # Unread rows are still pending on the socket; don't hand this connection out again
+            connection.invalidate()
+        try:
+            if cursor is not None:
+                cursor.close()
+        except Error as e:
+            logger.debug(f"Ignoring error closing an abandoned player stream: {e}")
+        finally:
             connection.close()
             
-            logger.debug(f"Retrieved {len(players)} players from database")
+    async def get_players_page(self, after_name: Optional[str] = None, after_id: Optional[int] = None,
+                               limit: int = 25, table_name: str = 'coinsengine_users') -> List[Player]:
+        """
+        Retrieve one page of players ordered by (name, id) using keyset pagination.
+        
+        Pass the name and id of the last row of the previous page to get the
+        next one. Cost depends only on the page size, not on how deep the page is.
+        
+        Args:
+            after_name: Name of the last player on the previous page (None for the first page)
+            after_id: Id of the last player on the previous page (None for the first page)
+            limit: Maximum number of players to return
+            table_name: Name of the players table
+            
+        Returns:
+            List of player records (empty on error)
+        """
+        try:
+            return await self._run_read(self._get_players_page_sync, after_name, after_id, limit, table_name)
+            
+        except Error as e:
+            logger.error(f"Error fetching players page: {e}")
+            return []
+            
+    def _get_players_page_sync(self, connection, after_name: Optional[str], after_id: Optional[int],
+                               limit: int, table_name: str) -> List[Player]:
+        """Blocking body of get_players_page (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            columns = PLAYER_SELECT
+            if after_name is None:
+                cursor.execute(f"SELECT {columns} FROM {table_name} ORDER BY name, id LIMIT %s", (limit,))
+            else:
+                # Expanded row comparison: MySQL can range-scan an index on
+                # (name, id) with this form but not with (name, id) > (%s, %s)
+                cursor.execute(
+                    f"SELECT {columns} FROM {table_name} "
+                    f"WHERE name > %s OR (name = %s AND id > %s) ORDER BY name, id LIMIT %s",
+                    (after_name, after_name, after_id or 0, limit)
+                )
+            return [Player.from_row(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            
+    async def count_players(self, table_name: str = 'coinsengine_users') -> int:
+        """
+        Get the number of players, cached for count_cache_ttl seconds.
+        
+        Args:
+            table_name: Name of the players table
+            
+        Returns:
+            Player count (last known value, or 0, on error)
+        """
+        cached = self._count_cache.get(table_name)
+        if cached and time.monotonic() - cached[1] < self.count_cache_ttl:
+            return cached[0]
+            
+        try:
+            count = await self._run_read(self._count_players_sync, table_name)
+            self._count_cache[table_name] = (count, time.monotonic())
+            return count
+            
+        except Error as e:
+            logger.error(f"Error counting players: {e}")
+            return cached[0] if cached else 0
+            
+    def _count_players_sync(self, connection, table_name: str) -> int:
+        """Blocking body of count_players (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+            return int(cursor.fetchone()[0])
+        finally:
+            cursor.close()
+            
+    async def get_players_changed_since(self, after_id: int, since_last_online: int,
+                                        table_name: str = 'coinsengine_users',
+                                        limit: Optional[int] = None) -> List[Player]:
+        """
+        Retrieve players added or seen online since the given watermarks.
+        
+        With a limit, new rows come in id order and recently online rows in
+        last_online order, at most `limit` of each, so a caller that gets a
+        full page back can continue from its raised watermarks.
+        
+        Args:
+            after_id: Highest row id already known
+            since_last_online: Highest last_online value already known
+            table_name: Name of the players table
+            limit: Maximum rows per watermark, or None for all
+            
+        Returns:
+            List of player records (empty on error)
+        """
+        try:
+            players = await self._run_read(self._get_players_changed_since_sync,
+                                      after_id, since_last_online, table_name, limit)
+            logger.debug(f"Retrieved {len(players)} changed players from database")
             return players
             
         except Error as e:
-            logger.error(f"Error fetching players: {e}")
+            logger.error(f"Error fetching changed players: {e}")
+            return []
+            
+    def _get_players_changed_since_sync(self, connection, after_id: int, since_last_online: int,
+                                        table_name: str, limit: Optional[int] = None) -> List[Player]:
+        """Blocking body of get_players_changed_since (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            if limit is None:
+                # >= on last_online so rows touched within the same tick aren't missed
+                query = (
+                    f"SELECT {PLAYER_SELECT} FROM {table_name} "
+                    f"WHERE id > %s OR last_online >= %s"
+                )
+                cursor.execute(query, (after_id, since_last_online))
+                return [Player.from_row(row) for row in cursor.fetchall()]
+                
+            # Two index range scans instead of one OR, so each can stop at the limit
+            cursor.execute(
+                f"SELECT {PLAYER_SELECT} FROM {table_name} WHERE id > %s ORDER BY id LIMIT %s",
+                (after_id, limit)
+            )
+            players = {row[0]: Player.from_row(row) for row in cursor.fetchall()}
+            cursor.execute(
+                f"SELECT {PLAYER_SELECT} FROM {table_name} WHERE last_online >= %s ORDER BY last_online LIMIT %s",
+                (since_last_online, limit)
+            )
+            for row in cursor.fetchall():
+                players.setdefault(row[0], Player.from_row(row))
+            return list(players.values())
+        finally:
+            cursor.close()
+            
+    async def get_players_after_id(self, after_id: int, limit: int,
+                                   table_name: str = 'coinsengine_users') -> List[Player]:
+        """
+        Get the next page of players in id order (keyset pagination).
+        
+        Reads from a replica when one is configured; players written
+        recently are re-read from the primary.
+        
+        Args:
+            after_id: Last row id of the previous page (0 for the first page)
+            limit: Maximum number of players
+            table_name: Name of the players table
+            
+        Returns:
+            Player records ordered by id (empty on error or past the last row)
+        """
+        try:
+            players = await self._run_read(self._get_players_after_id_sync, after_id, limit, table_name)
+            pinned = [p.uuid for p in players if self._is_pinned(p.uuid)]
+            if pinned:
+                fresh = {p.uuid: p for p in await self.get_players_by_uuids(pinned, table_name)}
+                players = [fresh.get(p.uuid, p) for p in players]
+            return players
+            
+        except Error as e:
+            logger.error(f"Error fetching players after id {after_id}: {e}")
             return []
             
-    async def get_player_balance(self, player_name: str, table_name: str = 'coinsengine_users') -> Optional[Dict[str, any]]:
+    def _get_players_after_id_sync(self, connection, after_id: int, limit: int,
+                                   table_name: str) -> List[Player]:
+        """Blocking body of get_players_after_id (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT {PLAYER_SELECT} FROM {table_name} WHERE id > %s ORDER BY id LIMIT %s",
+                (after_id, limit)
+            )
+            return [Player.from_row(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            
+    async def get_player_by_uuid(self, player_uuid: str, table_name: str = 'coinsengine_users',
+                                 fresh: bool = False) -> Optional[Player]:
+        """
+        Get a player by UUID (single equality lookup on the uuid index).
+        
+        Args:
+            player_uuid: Player's UUID
+            table_name: Name of the players table
+            fresh: Read from the primary even when replicas are configured
+            
+        Returns:
+            Player record or None
+        """
+        return await self._get_player('uuid', player_uuid, table_name, fresh)
+        
+    async def get_player_by_name(self, player_name: str, table_name: str = 'coinsengine_users',
+                                 fresh: bool = False) -> Optional[Player]:
+        """
+        Get a player by name (single equality lookup on the name index).
+        
+        Args:
+            player_name: Player's name
+            table_name: Name of the players table
+            fresh: Read from the primary even when replicas are configured
+            
+        Returns:
+            Player record or None
+        """
+        return await self._get_player('name', player_name, table_name, fresh)
+        
+    async def get_player_balance(self, player_name: str, table_name: str = 'coinsengine_users') -> Optional[Player]:
         """
         Get a specific player's balance.
         
@@ -108,30 +798,108 @@ class DatabaseManager:
             table_name: Name of the players table
             
         Returns:
-            Dictionary with player data or None
+            Player record or None
         """
+        return await self._get_player(self._lookup_column(player_name), player_name, table_name)
+        
+    @staticmethod
+    def _lookup_column(identifier: str) -> str:
+        """Pick the column to match a name-or-UUID identifier against."""
+        return 'uuid' if UUID_PATTERN.match(identifier) else 'name'
+        
+    async def _get_player(self, column: str, value: str, table_name: str,
+                          fresh: bool = False) -> Optional[Player]:
+        """Fetch one player where column equals value (from the primary if fresh or recently written)."""
+        run = self._run if fresh or self._is_pinned(value) else self._run_read
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor(dictionary=True)
+            return await run(self._get_player_sync, column, value, table_name)
+            
+        except Error as e:
+            logger.error(f"Error fetching player balance: {e}")
+            return None
             
+    def _get_player_sync(self, connection, column: str, value: str,
+                         table_name: str) -> Optional[Player]:
+        """Blocking body of _get_player (executor thread)."""
+        cursor = connection.cursor()
+        try:
             # Using parameterized query to prevent SQL injection
             # Note: Column is 'name' not 'player_name' in coinsengine_users table
-            query = f"SELECT id, uuid, name, gems, coins, last_online FROM {table_name} WHERE name = %s OR uuid = %s"
-            cursor.execute(query, (player_name, player_name))
-            player = cursor.fetchone()
-            
+            query = f"SELECT {PLAYER_SELECT} FROM {table_name} WHERE {column} = %s"
+            cursor.execute(query, (value,))
+            return Player.from_row(cursor.fetchone())
+        finally:
             cursor.close()
-            connection.close()
             
-            return player
+    async def get_players_by_uuids(self, player_uuids: Sequence[str],
+                                   table_name: str = 'coinsengine_users') -> List[Player]:
+        """
+        Get many players by UUID with one IN (...) query per BULK_CHUNK_SIZE players.
+        
+        Reads from the primary when any of them was written recently.
+        
+        Args:
+            player_uuids: Player UUIDs
+            table_name: Name of the players table
+            
+        Returns:
+            Player records found, in no particular order (empty on error)
+        """
+        player_uuids = list(player_uuids)
+        if not player_uuids:
+            return []
+        run = self._run if any(self._is_pinned(u) for u in player_uuids) else self._run_read
+        try:
+            return await run(self._get_players_by_uuids_sync, player_uuids, table_name)
             
         except Error as e:
-            logger.error(f"Error fetching player balance: {e}")
-            return None
+            logger.error(f"Error fetching players by UUID: {e}")
+            return []
+            
+    def _get_players_by_uuids_sync(self, connection, player_uuids: List[str],
+                                   table_name: str) -> List[Player]:
+        """Blocking body of get_players_by_uuids (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            players = []
+            for i in range(0, len(player_uuids), BULK_CHUNK_SIZE):
+                chunk = player_uuids[i:i + BULK_CHUNK_SIZE]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"SELECT {PLAYER_SELECT} FROM {table_name} WHERE uuid IN ({placeholders})", chunk)
+                players.extend(Player.from_row(row) for row in cursor.fetchall())
+            return players
+        finally:
+            cursor.close()
             
+    async def update_currency_by_uuid(self, player_uuid: str, currency_type: str,
+                                      amount: float, operation: str = 'add',
+                                      table_name: str = 'coinsengine_users',
+                                      admin_id: Optional[int] = None, source: str = 'bot') -> Tuple[bool, str]:
+        """
+        Update a player's currency, matching the player by UUID.
+        
+        Same arguments and return value as update_currency.
+        """
+        return await self.update_currency(player_uuid, currency_type, amount, operation,
+                                          table_name, lookup='uuid', admin_id=admin_id, source=source)
+                                          
+    async def update_currency_by_name(self, player_name: str, currency_type: str,
+                                      amount: float, operation: str = 'add',
+                                      table_name: str = 'coinsengine_users',
+                                      admin_id: Optional[int] = None, source: str = 'bot') -> Tuple[bool, str]:
+        """
+        Update a player's currency, matching the player by name.
+        
+        Same arguments and return value as update_currency.
+        """
+        return await self.update_currency(player_name, currency_type, amount, operation,
+                                          table_name, lookup='name', admin_id=admin_id, source=source)
+                                          
     async def update_currency(self, player_name: str, currency_type: str, 
                             amount: float, operation: str = 'add',
-                            table_name: str = 'coinsengine_users') -> Tuple[bool, str]:
+                            table_name: str = 'coinsengine_users',
+                            lookup: Optional[str] = None, admin_id: Optional[int] = None,
+                            source: str = 'bot') -> Tuple[bool, str]:
         """
         Update player's currency (gems or coins).
         
@@ -141,64 +909,499 @@ class DatabaseManager:
             amount: Amount to add/remove (supports decimals)
             operation: 'add' or 'remove'
             table_name: Name of the players table
+            lookup: Column to match player_name against ('uuid' or 'name'); detected if None
+            admin_id: Discord user making the change, recorded in the ledger
+            source: What made the change (e.g. 'manage', 'give'), recorded in the ledger
             
         Returns:
             Tuple of (success: bool, message: str)
         """
-        if currency_type not in ['gems', 'coins']:
-            return False, "Invalid currency type. Use 'gems' or 'coins'."
+        if operation == 'add':
+            delta = amount
+        elif operation == 'remove':
+            delta = -amount
+        else:
+            return False, "Invalid operation. Use 'add' or 'remove'."
             
         if amount <= 0:
             return False, "Amount must be positive."
             
+        success, message, _ = await self.adjust_currency(player_name, currency_type, delta, table_name, lookup,
+                                                         admin_id=admin_id, source=source)
+        if success:
+            message = f"Successfully {operation}ed {amount:.2f} {currency_type}. {message}"
+        return success, message
+        
+    async def adjust_currency(self, player_name: str, currency_type: str, delta: float,
+                              table_name: str = 'coinsengine_users',
+                              lookup: Optional[str] = None, admin_id: Optional[int] = None,
+                              source: str = 'bot') -> Tuple[bool, str, Optional[float]]:
+        """
+        Atomically add a signed delta to a player's currency.
+        
+        The player's row is locked with SELECT ... FOR UPDATE, the balance is
+        checked and the change is applied relative to the stored value in the
+        same transaction, so concurrent writes from the CoinsEngine plugin are
+        never overwritten and the balance can't go negative.
+        
+        Args:
+            player_name: Player's name or UUID
+            currency_type: 'gems' or 'coins'
+            delta: Signed amount to apply (negative to remove)
+            table_name: Name of the players table
+            lookup: Column to match player_name against ('uuid' or 'name'); detected if None
+            admin_id: Discord user making the change, recorded in the ledger
+            source: What made the change, recorded in the ledger
+            
+        Returns:
+            Tuple of (success: bool, message: str, new_balance: float or None)
+        """
+        if currency_type not in ['gems', 'coins']:
+            return False, "Invalid currency type. Use 'gems' or 'coins'.", None
+            
+        if delta == 0:
+            return False, "Amount must be non-zero.", None
+            
+        column = lookup or self._lookup_column(player_name)
+        if column not in ('uuid', 'name'):
+            return False, "Invalid lookup. Use 'uuid' or 'name'.", None
+            
         try:
-            connection = self._get_connection()
-            cursor = connection.cursor(buffered=True)
+            success, message, new_balance, player_uuid = await self._run(
+                self._adjust_currency_sync, column, player_name, currency_type, delta, table_name
+            )
+            if success:
+                logger.info(f"Updated {player_name}: {delta:+} {currency_type}")
+                self._pin_to_primary(player_uuid, player_name)
+                self._record_change(player_uuid, currency_type, delta, new_balance, admin_id, source)
+            return success, message, new_balance
             
-            # First, get current balance to check for negative balance
-            # Note: Column is 'name' not 'player_name' in coinsengine_users table
+        except PoolTimeoutError as e:
+            logger.warning(f"Currency update for {player_name} not applied: {e}")
+            return False, f"{e.msg}. Nothing was changed, please try again.", None
+        except DatabaseOverloadedError as e:
+            logger.warning(f"Currency update for {player_name} shed: {e}")
+            return False, f"{e} Nothing was changed.", None
+        except Error as e:
+            logger.error(f"Error updating currency: {e}")
+            return False, f"Database error: {str(e)}", None
+            
+    def _adjust_currency_sync(self, connection, column: str, value: str, currency_type: str,
+                              delta: float, table_name: str) -> Tuple[bool, str, Optional[float], Optional[str]]:
+        """Blocking body of adjust_currency (executor thread); also returns the player's UUID."""
+        cursor = connection.cursor(buffered=True)
+        try:
+            # Lock the row, check the balance, then apply the relative UPDATE; the
+            # lock keeps the balance from moving between the check and the write.
+            # UPDATE and COMMIT go out together to save a round trip.
             cursor.execute(
-                f"SELECT {currency_type} FROM {table_name} WHERE name = %s OR uuid = %s",
-                (player_name, player_name)
+                f"SELECT uuid, {currency_type} FROM {table_name} WHERE {column} = %s FOR UPDATE",
+                (value,)
+            )
+            rows = cursor.fetchall()
+            if len(rows) != 1:
+                connection.rollback()
+                return False, "Ambiguous player name, use the UUID." if rows else "Player not found.", None, None
+            player_uuid, current_balance = rows[0]
+            new_balance = float(current_balance) + delta
+            if new_balance < 0:
+                connection.rollback()
+                return (False, f"Insufficient balance. Current: {float(current_balance):.2f}, "
+                        f"Trying to remove: {-delta:.2f}", None, None)
+            _execute_script(
+                cursor,
+                f"UPDATE {table_name} SET {currency_type} = {currency_type} + %s WHERE uuid = %s; COMMIT",
+                (delta, player_uuid)
             )
-            result = cursor.fetchone()
+            return True, f"New balance: {new_balance:.2f}", new_balance, player_uuid
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
             
-            if not result:
-                cursor.close()
-                connection.close()
-                return False, "Player not found."
+    async def bulk_update_currency(self, rows: List[Tuple[str, str, float]],
+                                   table_name: str = 'coinsengine_users', admin_id: Optional[int] = None,
+                                   source: str = 'bulk') -> List[Dict[str, any]]:
+        """
+        Apply many currency adjustments in one transaction.
+        
+        Rows are validated in order against a running balance, so a row that
+        would take a player below zero is rejected without affecting the rows
+        before it. Accepted deltas are summed per player and written with a
+        few batched relative UPDATEs. If the database write fails, nothing is
+        applied and every row reports the error.
+        
+        Args:
+            rows: (player name or UUID, 'gems' or 'coins', signed delta) per adjustment
+            table_name: Name of the players table
+            admin_id: Discord user making the change, recorded in the ledger
+            source: What made the change, recorded in the ledger
+            
+        Returns:
+            One dict per input row with keys: row, player, uuid, currency,
+            delta, success, message, new_balance
+        """
+        if not rows:
+            return []
+            
+        try:
+            results = await self._run(self._bulk_update_currency_sync, rows, table_name)
+        except (Error, DatabaseOverloadedError) as e:
+            logger.error(f"Error applying bulk currency update: {e}")
+            message = str(e) if isinstance(e, DatabaseOverloadedError) else f"Database error: {str(e)}"
+            return [
+                {'row': i + 1, 'player': player, 'uuid': None, 'currency': currency, 'delta': delta,
+                 'success': False, 'message': message, 'new_balance': None}
+                for i, (player, currency, delta) in enumerate(rows)
+            ]
+            
+        applied = 0
+        for r in results:
+            if r['success']:
+                applied += 1
+                self._pin_to_primary(r['uuid'], str(r['player']))
+                self._record_change(r['uuid'], r['currency'], r['delta'], r['new_balance'], admin_id, source)
+        logger.info(f"Bulk currency update: {applied}/{len(results)} rows applied")
+        return results
+        
+    def _record_change(self, player_uuid: Optional[str], currency: str, delta: float,
+                       new_balance: float, admin_id: Optional[int], source: str):
+        """Queue a ledger entry for a committed change (no database round trip)."""
+        if self.balance_watcher is not None and player_uuid is not None:
+            self.balance_watcher.expect(player_uuid, currency, delta)
+        if self.ledger is None or player_uuid is None:
+            return
+        self.ledger.submit(LedgerEntry(player_uuid, currency, delta, new_balance - delta, new_balance,
+                                       admin_id, source))
+                                       
+    def _bulk_update_currency_sync(self, connection, rows: List[Tuple[str, str, float]],
+                                   table_name: str) -> List[Dict[str, any]]:
+        """Blocking body of bulk_update_currency (executor thread)."""
+        cursor = connection.cursor(dictionary=True)
+        try:
+            # Lock every referenced player up front so balances can't move under us
+            uuids = {normalize_uuid(str(p)) for p, _, _ in rows if UUID_PATTERN.match(str(p))}
+            names = {str(p) for p, _, _ in rows if not UUID_PATTERN.match(str(p))}
+            by_uuid: Dict[str, dict] = {}
+            by_name: Dict[str, List[dict]] = {}
+            for column, values in (('uuid', uuids), ('name', names)):
+                values = list(values)
+                for i in range(0, len(values), BULK_CHUNK_SIZE):
+                    chunk = values[i:i + BULK_CHUNK_SIZE]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(
+                        f"SELECT uuid, name, gems, coins FROM {table_name} "
+                        f"WHERE {column} IN ({placeholders}) FOR UPDATE",
+                        chunk
+                    )
+                    for player in cursor.fetchall():
+                        by_uuid[player['uuid']] = player
+                        by_name.setdefault(str(player['name']).lower(), []).append(player)
+                        
+            # Validate in input order against running balances
+            balances: Dict[Tuple[str, str], float] = {}
+            deltas: Dict[str, Dict[str, float]] = {'gems': {}, 'coins': {}}
+            results = []
+            for i, (identifier, currency, delta) in enumerate(rows):
+                result = {'row': i + 1, 'player': identifier, 'uuid': None, 'currency': currency,
+                          'delta': delta, 'success': False, 'message': '', 'new_balance': None}
+                results.append(result)
                 
-            current_balance = float(result[0])
-            
-            # Calculate new balance
-            if operation == 'add':
-                new_balance = current_balance + amount
-            elif operation == 'remove':
-                new_balance = current_balance - amount
-                if new_balance < 0:
-                    cursor.close()
-                    connection.close()
-                    return False, f"Insufficient balance. Current: {current_balance:.2f}, Trying to remove: {amount:.2f}"
-            else:
-                cursor.close()
-                connection.close()
-                return False, "Invalid operation. Use 'add' or 'remove'."
+                if currency not in ('gems', 'coins'):
+                    result['message'] = "Invalid currency type. Use 'gems' or 'coins'."
+                    continue
+                if not delta:
+                    result['message'] = "Amount must be non-zero."
+                    continue
+                    
+                if UUID_PATTERN.match(str(identifier)):
+                    player = by_uuid.get(normalize_uuid(str(identifier)))
+                else:
+                    matches = by_name.get(str(identifier).lower(), [])
+                    if len(matches) > 1:
+                        result['message'] = "Ambiguous player name, use the UUID."
+                        continue
+                    player = matches[0] if matches else None
+                if not player:
+                    result['message'] = "Player not found."
+                    continue
+                    
+                key = (player['uuid'], currency)
+                current = balances.get(key, float(player[currency]))
+                if current + delta < 0:
+                    result['uuid'] = player['uuid']
+                    result['message'] = f"Insufficient balance. Current: {current:.2f}, Trying to remove: {-delta:.2f}"
+                    continue
+                    
+                balances[key] = current + delta
+                deltas[currency][player['uuid']] = deltas[currency].get(player['uuid'], 0.0) + delta
+                result.update(uuid=player['uuid'], success=True, message="OK", new_balance=current + delta)
                 
-            # Update database - use 'name' column instead of 'player_name'
-            query = f"UPDATE {table_name} SET {currency_type} = %s WHERE name = %s OR uuid = %s"
-            cursor.execute(query, (new_balance, player_name, player_name))
+            # Net change per player, written as batched relative UPDATEs
+            for currency, per_player in deltas.items():
+                items = list(per_player.items())
+                for i in range(0, len(items), BULK_CHUNK_SIZE):
+                    chunk = items[i:i + BULK_CHUNK_SIZE]
+                    cases = " ".join(["WHEN %s THEN %s"] * len(chunk))
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    params = [value for item in chunk for value in item] + [uuid for uuid, _ in chunk]
+                    cursor.execute(
+                        f"UPDATE {table_name} SET {currency} = {currency} + CASE uuid {cases} ELSE 0 END "
+                        f"WHERE uuid IN ({placeholders})",
+                        params
+                    )
             connection.commit()
+            return results
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
             
-            affected_rows = cursor.rowcount
+    async def restore_balances(self, balances: Sequence[Tuple[str, float, float]],
+                               table_name: str = 'coinsengine_users', apply: bool = False,
+                               admin_id: Optional[int] = None,
+                               source: str = 'restore') -> Tuple[List[Tuple[str, float, float, float, float]], int]:
+        """
+        Diff one chunk of snapshot balances against the table and optionally write the differences.
+        
+        With apply, the chunk's rows are locked, compared and updated in one
+        short transaction, so the game server is only held off those rows for
+        a single round of statements. Without it, the rows are only read,
+        still from the primary: a lagging replica could show a preview that
+        differs from what the apply then writes. Keep chunks at or below
+        BULK_CHUNK_SIZE players.
+        
+        Args:
+            balances: (uuid, gems, coins) per player; a later duplicate replaces an earlier one
+            table_name: Name of the players table
+            apply: Write the changed balances (otherwise a dry run)
+            admin_id: Discord user restoring, recorded in the ledger
+            source: What made the change, recorded in the ledger
+            
+        Returns:
+            Tuple of ([(uuid, gems before, coins before, gems after, coins after)] for
+            players whose balances differ, number of UUIDs not in the table)
+            
+        Raises:
+            Error: The chunk could not be read or written (nothing of it was applied)
+        """
+        wanted = {player_uuid: (float(gems), float(coins)) for player_uuid, gems, coins in balances}
+        if not wanted:
+            return [], 0
+        changes, missing = await self._run(self._restore_balances_sync, wanted, table_name, apply)
+        if apply:
+            for player_uuid, gems_before, coins_before, gems_after, coins_after in changes:
+                self._pin_to_primary(player_uuid)
+                if gems_after != gems_before:
+                    self._record_change(player_uuid, 'gems', gems_after - gems_before, gems_after, admin_id, source)
+                if coins_after != coins_before:
+                    self._record_change(player_uuid, 'coins', coins_after - coins_before, coins_after,
+                                        admin_id, source)
+        return changes, missing
+        
+    def _restore_balances_sync(self, connection, wanted: Dict[str, Tuple[float, float]], table_name: str,
+                               apply: bool) -> Tuple[List[Tuple[str, float, float, float, float]], int]:
+        """Blocking body of restore_balances (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            uuids = list(wanted)
+            placeholders = ", ".join(["%s"] * len(uuids))
+            cursor.execute(
+                f"SELECT uuid, gems, coins FROM {table_name} WHERE uuid IN ({placeholders})"
+                + (" FOR UPDATE" if apply else ""),
+                uuids
+            )
+            changes = []
+            found = 0
+            for player_uuid, gems, coins in cursor.fetchall():
+                found += 1
+                target = wanted.get(player_uuid)
+                if target is not None and (float(gems), float(coins)) != target:
+                    changes.append((player_uuid, float(gems), float(coins)) + target)
+                    
+            if apply and changes:
+                cases = " ".join(["WHEN %s THEN %s"] * len(changes))
+                placeholders = ", ".join(["%s"] * len(changes))
+                cursor.execute(
+                    f"UPDATE {table_name} SET gems = CASE uuid {cases} END, coins = CASE uuid {cases} END "
+                    f"WHERE uuid IN ({placeholders})",
+                    [value for c in changes for value in (c[0], c[3])]
+                    + [value for c in changes for value in (c[0], c[4])]
+                    + [c[0] for c in changes]
+                )
+            if apply:
+                connection.commit()
+            return changes, len(wanted) - found
+        except Error:
+            if apply:
+                connection.rollback()
+            raise
+        finally:
             cursor.close()
-            connection.close()
             
-            if affected_rows > 0:
-                logger.info(f"Updated {player_name}: {operation} {amount} {currency_type}")
-                return True, f"Successfully {operation}ed {amount:.2f} {currency_type}. New balance: {new_balance:.2f}"
+    async def ensure_ledger_table(self, table_name: str = 'economy_ledger') -> bool:
+        """
+        Create the ledger table if it doesn't exist.
+        
+        Args:
+            table_name: Name of the ledger table
+            
+        Returns:
+            True if the table exists now
+        """
+        try:
+            await self._run(self._ensure_ledger_table_sync, table_name)
+            return True
+        except Error as e:
+            logger.error(f"Error creating ledger table {table_name}: {e}")
+            return False
+            
+    def _ensure_ledger_table_sync(self, connection, table_name: str):
+        """Blocking body of ensure_ledger_table (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            # (player_uuid, id) serves the per-player history scan in id order
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} ("
+                f"id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY, "
+                f"player_uuid VARCHAR(36) NOT NULL, "
+                f"currency VARCHAR(16) NOT NULL, "
+                f"delta DOUBLE NOT NULL, "
+                f"balance_before DOUBLE NOT NULL, "
+                f"balance_after DOUBLE NOT NULL, "
+                f"admin_id BIGINT UNSIGNED NULL, "
+                f"source VARCHAR(32) NOT NULL, "
+                f"created_at BIGINT NOT NULL, "
+                f"INDEX idx_{table_name}_player (player_uuid, id)"
+                f")"
+            )
+            connection.commit()
+        finally:
+            cursor.close()
+            
+    async def insert_ledger_entries(self, entries: List[LedgerEntry], table_name: str = 'economy_ledger'):
+        """
+        Append ledger entries in one multi-row INSERT and one commit.
+        
+        Args:
+            entries: Entries to write
+            table_name: Name of the ledger table
+            
+        Raises:
+            Error: The batch could not be written (nothing was committed)
+        """
+        if entries:
+            await self._run(self._insert_ledger_entries_sync, entries, table_name)
+            
+    def _insert_ledger_entries_sync(self, connection, entries: List[LedgerEntry], table_name: str):
+        """Blocking body of insert_ledger_entries (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            # mysql.connector turns executemany on an INSERT into a single multi-row statement
+            placeholders = ", ".join(["%s"] * len(LEDGER_COLUMNS))
+            cursor.executemany(
+                f"INSERT INTO {table_name} ({', '.join(LEDGER_COLUMNS)}) VALUES ({placeholders})",
+                [entry.values() for entry in entries]
+            )
+            connection.commit()
+        except Error:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            
+    async def get_ledger_page(self, player_uuid: str, before_id: Optional[int] = None, limit: int = 25,
+                              table_name: str = 'economy_ledger') -> List[LedgerEntry]:
+        """
+        Get a page of a player's ledger, newest first.
+        
+        Uses a keyset scan on (player_uuid, id), so every page costs the same
+        regardless of how far back it is.
+        
+        Args:
+            player_uuid: Player's UUID
+            before_id: Id of the last entry on the previous page, or None for the newest page
+            limit: Entries per page
+            table_name: Name of the ledger table
+            
+        Returns:
+            List of ledger entries (empty on error or past the oldest entry)
+        """
+        try:
+            return await self._run_read(self._get_ledger_page_sync, player_uuid, before_id, limit, table_name)
+        except Error as e:
+            logger.error(f"Error fetching ledger page for {player_uuid}: {e}")
+            return []
+            
+    def _get_ledger_page_sync(self, connection, player_uuid: str, before_id: Optional[int],
+                              limit: int, table_name: str) -> List[LedgerEntry]:
+        """Blocking body of get_ledger_page (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            if before_id is None:
+                cursor.execute(
+                    f"SELECT {LEDGER_SELECT} FROM {table_name} WHERE player_uuid = %s "
+                    f"ORDER BY id DESC LIMIT %s",
+                    (player_uuid, limit)
+                )
             else:
-                return False, "No rows updated."
-                
+                cursor.execute(
+                    f"SELECT {LEDGER_SELECT} FROM {table_name} WHERE player_uuid = %s AND id < %s "
+                    f"ORDER BY id DESC LIMIT %s",
+                    (player_uuid, before_id, limit)
+                )
+            return [LedgerEntry.from_row(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            
+    async def check_indexes(self, table_name: str = 'coinsengine_users', create: bool = False) -> List[str]:
+        """
+        Check that the players table has the indexes the bot's lookups rely on.
+        
+        Looks up existing indexes in information_schema and reports (or, with
+        create=True, adds) any that are missing.
+        
+        Args:
+            table_name: Name of the players table
+            create: Create missing indexes instead of only reporting them
+            
+        Returns:
+            List of columns that are still missing an index
+        """
+        try:
+            missing = await self._run(self._check_indexes_sync, table_name, create)
         except Error as e:
-            logger.error(f"Error updating currency: {e}")
-            return False, f"Database error: {str(e)}"
+            logger.error(f"Error checking indexes on {table_name}: {e}")
+            return []
+            
+        for column in missing:
+            logger.warning(
+                f"Table {table_name} has no index on '{column}'; lookups on it will scan the table. "
+                f"Fix with: CREATE INDEX idx_{table_name}_{column} ON {table_name} ({column}) "
+                f"or set DB_CREATE_INDEXES=true"
+            )
+        return missing
+        
+    def _check_indexes_sync(self, connection, table_name: str, create: bool) -> List[str]:
+        """Blocking body of check_indexes (executor thread)."""
+        cursor = connection.cursor()
+        try:
+            # Only the leading column matters for single-column equality/range lookups
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND SEQ_IN_INDEX = 1",
+                (table_name,)
+            )
+            indexed = {row[0].lower() for row in cursor.fetchall()}
+            missing = [column for column in INDEXED_COLUMNS if column not in indexed]
+            
+            if create:
+                for column in list(missing):
+                    cursor.execute(f"CREATE INDEX idx_{table_name}_{column} ON {table_name} ({column})")
+                    logger.info(f"Created index idx_{table_name}_{column} on {table_name}")
+                    missing.remove(column)
+            return missing
+        finally:
+            cursor.close()
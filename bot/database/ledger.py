@@ -0,0 +1,166 @@
+"""
+Transaction Ledger for Economy Manager Bot
+Version: 0.5.0
+Append-only record of balance changes, written in group-committed batches
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, List, Optional, Sequence
+
+logger = logging.getLogger('economy_bot')
+
+# Columns written for a ledger entry, in order (id is assigned by the database)
+LEDGER_COLUMNS = ('player_uuid', 'currency', 'delta', 'balance_before', 'balance_after',
+                  'admin_id', 'source', 'created_at')
+LEDGER_SELECT = ', '.join(('id',) + LEDGER_COLUMNS)
+
+# Attempts to write a batch before its entries are spilled to the log file
+MAX_WRITE_ATTEMPTS = 3
+
+class LedgerEntry:
+    """One balance change."""
+    
+    __slots__ = ('id',) + LEDGER_COLUMNS
+    
+    def __init__(self, player_uuid: str, currency: str, delta: float, balance_before: float,
+                 balance_after: float, admin_id: Optional[int] = None, source: str = 'bot',
+                 created_at: Optional[int] = None, id: Optional[int] = None):
+        self.id = id
+        self.player_uuid = player_uuid
+        self.currency = currency
+        self.delta = float(delta)
+        self.balance_before = float(balance_before)
+        self.balance_after = float(balance_after)
+        self.admin_id = admin_id
+        self.source = source
+        # Milliseconds since the epoch, like the players table's last_online
+        self.created_at = int(time.time() * 1000) if created_at is None else int(created_at)
+        
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> 'LedgerEntry':
+        """Build an entry from a tuple in LEDGER_SELECT order."""
+        return cls(*row[1:], id=row[0])
+        
+    def values(self) -> tuple:
+        """Column values in LEDGER_COLUMNS order, for an INSERT."""
+        return tuple(getattr(self, column) for column in LEDGER_COLUMNS)
+        
+    def __repr__(self) -> str:
+        return (f"LedgerEntry(id={self.id}, player_uuid={self.player_uuid!r}, currency={self.currency!r}, "
+                f"delta={self.delta}, balance_after={self.balance_after}, source={self.source!r})")
+
+class LedgerWriter:
+    """
+    Buffered writer for ledger entries.
+    
+    `submit()` only enqueues, so a balance change never waits for its ledger
+    row. A worker task collects entries until `max_batch` are queued or
+    `flush_interval` seconds have passed since the first one, then writes
+    them with one multi-row INSERT and a single commit. Failed batches are
+    retried; entries that still can't be written, or that overflow the
+    queue, are counted and written to the local log file instead.
+    """
+    
+    def __init__(self, db_manager, table_name: str = 'economy_ledger', max_queue: int = 10000,
+                 flush_interval: float = 1.0, max_batch: int = 500):
+        """
+        Initialize the ledger writer.
+        
+        Args:
+            db_manager: DatabaseManager used for the inserts
+            table_name: Name of the ledger table
+            max_queue: Entries buffered before new ones are spilled to the log file
+            flush_interval: Seconds to wait for more entries before writing a batch
+            max_batch: Entries per INSERT
+        """
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.written = 0  # Entries committed
+        self.batches = 0  # INSERT batches committed
+        self.dropped = 0  # Entries lost to a full queue
+        self.failed = 0  # Entries whose batch could not be written
+        self._task: Optional[asyncio.Task] = None
+        
+    def start(self):
+        """Start the background worker."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+            
+    async def stop(self, timeout: float = 10.0):
+        """
+        Write pending entries and stop the worker.
+        
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Ledger writer stopped with {self.queue.qsize()} entries unwritten")
+        self._task.cancel()
+        self._task = None
+        
+    def submit(self, entry: LedgerEntry) -> bool:
+        """
+        Queue an entry without waiting.
+        
+        Args:
+            entry: Ledger entry to write
+            
+        Returns:
+            True if queued, False if spilled to the log file
+        """
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Ledger queue full ({self.dropped} dropped), spilled: {entry!r}")
+            return False
+            
+    async def _worker(self):
+        """Collect batches from the queue and write them."""
+        while True:
+            batch: List[LedgerEntry] = [await self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+                    
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+                    
+    async def _write_batch(self, batch: List[LedgerEntry]):
+        """Insert a batch, retrying with backoff before giving up on it."""
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                await self.db_manager.insert_ledger_entries(batch, self.table_name)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt < MAX_WRITE_ATTEMPTS:
+                    logger.warning(f"Ledger write of {len(batch)} entries failed (attempt {attempt}): {e}")
+                    await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                else:
+                    self.failed += len(batch)
+                    logger.error(f"Giving up on {len(batch)} ledger entries: {e}")
+                    for entry in batch:
+                        logger.info(f"Unwritten ledger entry: {entry!r}")
@@ -0,0 +1,206 @@
+"""
+Player Models for Economy Manager Bot
+Version: 0.5.0
+Compact player record and columnar player table
+"""
+
+import bisect
+import sys
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Columns selected for a player row, in order
+PLAYER_COLUMNS = ('id', 'uuid', 'name', 'gems', 'coins', 'last_online')
+PLAYER_SELECT = ', '.join(PLAYER_COLUMNS)
+
+class Player:
+    """
+    One row of the players table.
+
+    Uses `__slots__` instead of a per-row dict. `get()` and `[]` are kept so
+    code written against the old dictionary rows keeps working.
+    """
+
+    __slots__ = PLAYER_COLUMNS
+
+    def __init__(self, id: int, uuid: str, name: str, gems: float = 0.0, coins: float = 0.0,
+                 last_online: int = 0):
+        self.id = int(id or 0)
+        self.uuid = uuid
+        self.name = name or ''
+        self.gems = float(gems or 0)
+        self.coins = float(coins or 0)
+        self.last_online = int(last_online or 0)
+
+    @classmethod
+    def from_row(cls, row: Optional[Sequence[Any]]) -> Optional['Player']:
+        """Build a player from a tuple in PLAYER_COLUMNS order (None passes through)."""
+        return None if row is None else cls(*row)
+
+    @property
+    def sort_key(self) -> Tuple[str, int]:
+        """Name order (case-insensitive, like MySQL's default collation), then id."""
+        return (self.name.lower(), self.id)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dictionary-style access for a column."""
+        return getattr(self, key, default) if key in PLAYER_COLUMNS else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in PLAYER_COLUMNS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self) -> dict:
+        """Plain dictionary copy of the row."""
+        return {column: getattr(self, column) for column in PLAYER_COLUMNS}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Player):
+            return NotImplemented
+        return all(getattr(self, c) == getattr(other, c) for c in PLAYER_COLUMNS)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Player(id={self.id}, uuid={self.uuid!r}, name={self.name!r}, gems={self.gems}, coins={self.coins})"
+
+class PlayerTable:
+    """
+    Column-oriented list of players.
+
+    Numbers live in typed arrays (8 bytes per value, no per-value objects)
+    and strings in plain lists, so a large table costs a fraction of the
+    equivalent list of row objects. Indexing materializes a `Player` on
+    demand; slicing returns a list of them, which is what a page of a view
+    needs. Several views can share one table without copying it.
+    """
+
+    __slots__ = ('ids', 'uuids', 'names', 'gems', 'coins', 'last_online')
+
+    def __init__(self):
+        self.ids = array('q')
+        self.uuids: List[str] = []
+        self.names: List[str] = []
+        self.gems = array('d')
+        self.coins = array('d')
+        self.last_online = array('q')
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]]) -> 'PlayerTable':
+        """Build a table from tuples in PLAYER_COLUMNS order."""
+        table = cls()
+        for row in rows:
+            table.append_row(row)
+        return table
+
+    @classmethod
+    def from_players(cls, players: Iterable[Player]) -> 'PlayerTable':
+        """Build a table from player records."""
+        table = cls()
+        for player in players:
+            table.append(player)
+        return table
+
+    def append_row(self, row: Sequence[Any]):
+        """Append a tuple in PLAYER_COLUMNS order."""
+        player_id, player_uuid, name, gems, coins, last_online = row
+        self.ids.append(int(player_id or 0))
+        self.uuids.append(player_uuid)
+        self.names.append(name or '')
+        self.gems.append(float(gems or 0))
+        self.coins.append(float(coins or 0))
+        self.last_online.append(int(last_online or 0))
+
+    def append(self, player: Player):
+        """Append a player record."""
+        self.insert(len(self.ids), player)
+
+    def insert(self, index: int, player: Player):
+        """Insert a player record before `index`."""
+        self.ids.insert(index, player.id)
+        self.uuids.insert(index, player.uuid)
+        self.names.insert(index, player.name)
+        self.gems.insert(index, player.gems)
+        self.coins.insert(index, player.coins)
+        self.last_online.insert(index, player.last_online)
+
+    def update(self, index: int, player: Player):
+        """Overwrite the row at `index` in place."""
+        self.ids[index] = player.id
+        self.uuids[index] = player.uuid
+        self.names[index] = player.name
+        self.gems[index] = player.gems
+        self.coins[index] = player.coins
+        self.last_online[index] = player.last_online
+
+    def __delitem__(self, index: int):
+        for column in self.__slots__:
+            del getattr(self, column)[index]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, index: int) -> Player:
+        """Materialize the player at `index`."""
+        return Player(self.ids[index], self.uuids[index], self.names[index],
+                      self.gems[index], self.coins[index], self.last_online[index])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Player, List[Player]]:
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("player index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[Player]:
+        for index in range(len(self.ids)):
+            yield self.row(index)
+
+    def copy(self) -> 'PlayerTable':
+        """Shallow copy (strings are shared, arrays duplicated)."""
+        table = PlayerTable()
+        for column in self.__slots__:
+            setattr(table, column, getattr(self, column)[:])
+        return table
+
+    def take(self, indices: Iterable[int]) -> 'PlayerTable':
+        """New table with the rows at `indices`, in that order."""
+        indices = list(indices)
+        table = PlayerTable()
+        table.ids = array('q', (self.ids[i] for i in indices))
+        table.uuids = [self.uuids[i] for i in indices]
+        table.names = [self.names[i] for i in indices]
+        table.gems = array('d', (self.gems[i] for i in indices))
+        table.coins = array('d', (self.coins[i] for i in indices))
+        table.last_online = array('q', (self.last_online[i] for i in indices))
+        return table
+
+    def sort_key(self, index: int) -> Tuple[str, int]:
+        """Sort key of the row at `index` (see Player.sort_key)."""
+        return (self.names[index].lower(), self.ids[index])
+
+    def sorted_by_name(self) -> 'PlayerTable':
+        """New table ordered by Player.sort_key."""
+        names, ids = self.names, self.ids
+        return self.take(sorted(range(len(ids)), key=lambda i: (names[i].lower(), ids[i])))
+
+    def bisect(self, key: Tuple[str, int]) -> int:
+        """Insertion point for a sort key in a table ordered by name (leftmost)."""
+        return bisect.bisect_left(range(len(self.ids)), key, key=self.sort_key)
+
+    def uuid_positions(self) -> dict:
+        """Map of UUID -> row index."""
+        return {player_uuid: index for index, player_uuid in enumerate(self.uuids)}
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table, including its strings."""
+        total = sys.getsizeof(self)
+        for column in ('ids', 'gems', 'coins', 'last_online'):
+            total += sys.getsizeof(getattr(self, column))
+        for column in ('uuids', 'names'):
+            values = getattr(self, column)
+            total += sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+        return total
@@ -0,0 +1,438 @@
+"""
+Player Directory Cache for Economy Manager Bot
+Version: 0.5.0
+Process-wide, incrementally refreshed cache of the players table
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from bot.database.balance_watcher import EPSILON, BalanceChanges
+from bot.database.models import Player, PlayerTable
+from bot.utils.analytics import compute_economy_stats
+from bot.utils.leaderboard import CURRENCIES, Leaderboard
+from bot.utils.search_index import PlayerSearchIndex
+
+logger = logging.getLogger('economy_bot')
+
+# Above this many new or renamed players a merge re-sorts instead of inserting one by one
+MERGE_RESORT_THRESHOLD = 256
+
+# Rows past each watermark merged per incremental refresh (a full page makes the next one due at once)
+CHANGED_ROWS_LIMIT = 5000
+
+# Rows read per page by check_balances
+SCAN_PAGE_SIZE = 5000
+
+class PlayerDirectory:
+    """
+    Shared in-memory copy of the players table.
+    
+    The first load is a full scan; after that the directory only pulls rows
+    whose id or last_online moved past the highest values already seen, plus
+    any players explicitly invalidated after a balance change. A full reload
+    still happens every `ttl` seconds to pick up deletions. `check_balances()`
+    walks the table in id order between reloads to catch balance edits that
+    moved neither watermark.
+    
+    Readers always get the current snapshot immediately. Due refreshes run in
+    the background, and the table returned by `get_players()` never has rows
+    inserted or removed in place (balance changes are written in place), so
+    open views keep a consistent page.
+    
+    The snapshot is a columnar PlayerTable sorted by name; views share it
+    instead of holding their own copies. Per-currency leaderboards are built
+    with each full load and updated from the rows every refresh merges.
+    """
+    
+    def __init__(self, db_manager, table_name: str = 'coinsengine_users',
+                 ttl: float = 900.0, refresh_interval: float = 30.0, leaderboard_size: int = 1000):
+        """
+        Initialize the player directory.
+        
+        Args:
+            db_manager: DatabaseManager used to load players
+            table_name: Name of the players table
+            ttl: Seconds between full reloads
+            refresh_interval: Seconds between incremental refreshes
+            leaderboard_size: Ranks kept per currency leaderboard
+        """
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        
+        self._players = PlayerTable()
+        self._rows: Dict[str, int] = {}  # UUID -> row in _players
+        self.search_index = PlayerSearchIndex()
+        self.leaderboard_size = leaderboard_size
+        self.leaderboards: Dict[str, Leaderboard] = {c: Leaderboard(c, leaderboard_size) for c in CURRENCIES}
+        self._max_id = 0
+        self._max_last_online = 0
+        self._more_changes = False  # Last incremental refresh hit CHANGED_ROWS_LIMIT
+        self._scan_after = 0  # check_balances cursor (last row id compared)
+        self._dirty: Set[str] = set()
+        self._force_full = False
+        self._loaded_at: Optional[float] = None
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.version = 0  # Bumped whenever the snapshot changes
+        self._stats: Optional[Tuple[int, dict]] = None  # (version, economy stats)
+        self.balance_watcher = None  # BalanceWatcher told about every balance change seen, when set
+        
+    @property
+    def is_loaded(self) -> bool:
+        """Whether a full load has completed at least once."""
+        return self._loaded_at is not None
+        
+    def __len__(self) -> int:
+        return len(self._players)
+        
+    async def get_players(self) -> PlayerTable:
+        """
+        Get all players sorted by name.
+        
+        Blocks only for the very first load; later calls return the cached
+        snapshot and schedule a background refresh when one is due.
+        
+        Returns:
+            Player table (shared, do not modify)
+        """
+        if not self.is_loaded:
+            await self.refresh()
+        elif self._refresh_due():
+            self._schedule_refresh()
+        return self._players
+        
+    async def search(self, search_term: str, limit: Optional[int] = None) -> List[Tuple[float, Player]]:
+        """
+        Fuzzy search players by name using the search index.
+        
+        Args:
+            search_term: Text to search for
+            limit: Maximum number of results, or None for all
+            
+        Returns:
+            List of (score, player) tuples, best match first
+        """
+        await self.get_players()
+        results = []
+        for score, player_uuid in self.search_index.search(search_term, limit):
+            player = self.get_cached(player_uuid)
+            if player is not None:
+                results.append((score, player))
+        return results
+        
+    async def get_leaderboard(self, currency: str) -> Leaderboard:
+        """
+        Get the top players for a currency.
+        
+        Args:
+            currency: 'gems' or 'coins'
+            
+        Returns:
+            Leaderboard (shared, do not modify)
+        """
+        await self.get_players()
+        return self.leaderboards[currency]
+        
+    async def get_economy_stats(self) -> dict:
+        """
+        Get economy statistics for the current snapshot.
+        
+        Computed off the event loop and reused until the snapshot changes.
+        
+        Returns:
+            Result of compute_economy_stats
+        """
+        await self.get_players()
+        version = self.version
+        if self._stats is None or self._stats[0] != version:
+            stats = await asyncio.to_thread(compute_economy_stats, self._players)
+            self._stats = (version, stats)
+        return self._stats[1]
+        
+    async def get_player(self, player_uuid: str) -> Optional[Player]:
+        """
+        Get a cached player by UUID.
+        
+        Args:
+            player_uuid: Player's UUID
+            
+        Returns:
+            Player record or None if not cached
+        """
+        await self.get_players()
+        return self.get_cached(player_uuid)
+        
+    def get_cached(self, player_uuid: str) -> Optional[Player]:
+        """
+        Get a player from the current snapshot without loading or refreshing.
+        
+        Args:
+            player_uuid: Player's UUID
+            
+        Returns:
+            Player record or None if not cached
+        """
+        row = self._rows.get(player_uuid)
+        return None if row is None else self._players.row(row)
+        
+    def invalidate(self, player_uuid: Optional[str] = None):
+        """
+        Mark cached data as stale.
+        
+        Args:
+            player_uuid: Player to reload on the next refresh, or None to force a full reload
+        """
+        if player_uuid is None:
+            self._force_full = True
+        else:
+            self._dirty.add(player_uuid)
+        self._refreshed_at = 0.0
+        if self.is_loaded:
+            self._schedule_refresh()
+            
+    def _refresh_due(self) -> bool:
+        """Check whether a full or incremental refresh should run."""
+        now = time.monotonic()
+        return (
+            self._force_full
+            or bool(self._dirty)
+            or self._more_changes
+            or now - self._loaded_at >= self.ttl
+            or now - self._refreshed_at >= self.refresh_interval
+        )
+        
+    def _schedule_refresh(self):
+        """Start a background refresh unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+            
+    async def refresh(self, full: bool = False):
+        """
+        Bring the directory up to date.
+        
+        Args:
+            full: Reload the whole table even if the TTL hasn't expired
+        """
+        async with self._lock:
+            if not full and self.is_loaded and not self._refresh_due():
+                # Another caller refreshed while we waited for the lock
+                return
+            try:
+                if full or self._force_full or not self.is_loaded \
+                        or time.monotonic() - self._loaded_at >= self.ttl:
+                    await self._full_reload()
+                else:
+                    await self._incremental_refresh()
+            except Exception as e:
+                logger.error(f"Player directory refresh failed: {e}", exc_info=True)
+                
+    async def _full_reload(self):
+        """Replace the snapshot with a fresh full table scan."""
+        started = time.monotonic()
+        players = await self.db_manager.get_all_players(self.table_name)
+        if not players and self._players:
+            # get_all_players() returns an empty table on database errors; keep serving the old snapshot
+            logger.warning("Full player reload returned no rows, keeping cached directory")
+            self._refreshed_at = time.monotonic()
+            return
+            
+        # Sorting and the index build are pure CPU; keep them off the event loop thread
+        players = await asyncio.to_thread(players.sorted_by_name)
+        if self.balance_watcher is not None and self.is_loaded:
+            # Catches changes the watermarks can't see, such as offline players edited from the console
+            self.balance_watcher.observe(await asyncio.to_thread(BalanceChanges.between, self._players, players))
+        search_index = await asyncio.to_thread(PlayerSearchIndex, zip(players.uuids, players.names))
+        leaderboards = await asyncio.to_thread(self._build_leaderboards, players)
+        self._players = players
+        self.search_index = search_index
+        self.leaderboards = leaderboards
+        self._rows = players.uuid_positions()
+        self._max_id = max(players.ids, default=0)
+        self._max_last_online = max(players.last_online, default=0)
+        self._dirty.clear()
+        self._more_changes = False
+        self._force_full = False
+        self._loaded_at = self._refreshed_at = time.monotonic()
+        self.version += 1
+        logger.info(f"Player directory loaded {len(players)} players in {time.monotonic() - started:.2f}s")
+        
+    async def _incremental_refresh(self):
+        """Merge rows past the watermarks and reload invalidated players."""
+        dirty, self._dirty = self._dirty, set()
+        after_id, since_last_online = self._max_id, self._max_last_online
+        rows = await self.db_manager.get_players_changed_since(
+            after_id, since_last_online, self.table_name, limit=CHANGED_ROWS_LIMIT
+        )
+        # A full page means more rows wait past the raised watermark. Rows matching both conditions
+        # are counted twice, which at worst costs one extra refresh; a page stuck on a single
+        # last_online tick can't advance and is left to check_balances
+        online = [row.last_online for row in rows if row.last_online >= since_last_online]
+        self._more_changes = (
+            sum(row.id > after_id for row in rows) >= CHANGED_ROWS_LIMIT
+            or (len(online) >= CHANGED_ROWS_LIMIT and max(online) > since_last_online)
+        )
+        seen = {row.uuid for row in rows}
+        if dirty - seen:
+            # Batched, so a bulk update touching thousands of players costs a few queries
+            rows.extend(await self.db_manager.get_players_by_uuids(dirty - seen, self.table_name))
+            
+        await self._apply(rows)
+        self._refreshed_at = time.monotonic()
+        if rows:
+            logger.debug(f"Player directory merged {len(rows)} changed players")
+            
+    async def check_balances(self, rows: int) -> int:
+        """
+        Compare a slice of the table's balances with the snapshot and merge what moved.
+        
+        Reads SCAN_PAGE_SIZE rows at a time in id order, continuing where the
+        previous call stopped and wrapping around at the end of the table, so
+        repeated calls cover every player, offline ones included, at a bounded
+        cost per call. Rows that are older than the snapshot (a lagging
+        replica) are skipped.
+        
+        Args:
+            rows: Maximum rows to read in this call
+            
+        Returns:
+            Number of players whose balances differed from the snapshot
+        """
+        if not self.is_loaded:
+            return 0
+        found = 0
+        remaining = rows
+        while remaining > 0:
+            size = min(SCAN_PAGE_SIZE, remaining)
+            page = await self.db_manager.get_players_after_id(self._scan_after, size, self.table_name)
+            remaining -= size
+            if page:
+                async with self._lock:
+                    changed = self._changed_balances(page)
+                    if changed:
+                        # Not in last_online order, so the watermarks must not move past unread rows
+                        await self._apply(changed, watermarks=False)
+                found += len(changed)
+            if len(page) < size:
+                # End of the table: the next call starts over from the first row
+                self._scan_after = 0
+                break
+            self._scan_after = page[-1].id
+        if found:
+            logger.debug(f"Player directory balance check found {found} changed players")
+        return found
+        
+    def _changed_balances(self, page: List[Player]) -> List[Player]:
+        """Rows of a page whose balances differ from the snapshot, plus players it doesn't have."""
+        table = self._players
+        positions = np.fromiter((self._rows.get(p.uuid, -1) for p in page), dtype=np.int64, count=len(page))
+        known = positions >= 0
+        rows = positions[known]
+        fresh = np.array([[getattr(p, c) for c in CURRENCIES] for p in page], dtype=np.float64)[known]
+        cached = np.column_stack([np.frombuffer(getattr(table, c), dtype=np.float64)[rows] for c in CURRENCIES])
+        fresh_online = np.fromiter((p.last_online for p in page), dtype=np.int64, count=len(page))[known]
+        cached_online = np.frombuffer(table.last_online, dtype=np.int64)[rows]
+        
+        differs = ~known
+        differs[known] = (np.abs(fresh - cached) > EPSILON).any(axis=1) & (fresh_online >= cached_online)
+        return [page[i] for i in np.flatnonzero(differs)]
+        
+    async def _apply(self, rows: List[Player], watermarks: bool = True):
+        """Merge fresh rows, rebuild leaderboards that ran dry and report balance changes."""
+        changes: Optional[List[Tuple[Player, Player]]] = [] if self.balance_watcher is not None else None
+        if rows and await self._merge(rows, changes, watermarks):
+            self.version += 1
+            stale = [c for c, board in self.leaderboards.items() if board.needs_rebuild]
+            if stale:
+                # Members dropped out faster than others replaced them
+                rebuilt = await asyncio.to_thread(self._build_leaderboards, self._players, stale)
+                self.leaderboards.update(rebuilt)
+        if changes:
+            self.balance_watcher.observe(BalanceChanges.from_rows(changes))
+            
+    def _build_leaderboards(self, players: PlayerTable,
+                            currencies: Tuple[str, ...] = CURRENCIES) -> Dict[str, Leaderboard]:
+        """Build leaderboards from a full table (worker thread)."""
+        leaderboards = {}
+        for currency in currencies:
+            leaderboards[currency] = Leaderboard(currency, self.leaderboard_size)
+            leaderboards[currency].build(players)
+        return leaderboards
+        
+    def _update_leaderboards(self, row: Player):
+        """Apply a changed row's balances to the leaderboards."""
+        for currency, board in self.leaderboards.items():
+            board.update(row.uuid, row.id, getattr(row, currency))
+            
+    async def _merge(self, rows: List[Player], changes: Optional[List[Tuple[Player, Player]]] = None,
+                     watermarks: bool = True) -> bool:
+        """
+        Merge changed rows into the snapshot.
+        
+        Players whose sort position is unchanged are updated in place; new
+        or renamed players are placed into a copy of the table, built in a
+        worker thread.
+        
+        Args:
+            rows: Fresh rows
+            changes: Receives (cached row, fresh row) for players whose balances moved, if given
+            watermarks: Raise the id and last_online watermarks to the rows' values
+            
+        Returns:
+            True if anything changed
+        """
+        table = self._players
+        moved: Dict[str, Player] = {}
+        changed = False
+        for row in rows:
+            if watermarks:
+                self._max_id = max(self._max_id, row.id)
+                self._max_last_online = max(self._max_last_online, row.last_online)
+                
+            index = self._rows.get(row.uuid)
+            if index is not None and changes is not None:
+                cached = table.row(index)
+                if (cached.gems, cached.coins) != (row.gems, row.coins):
+                    changes.append((cached, row))
+            if index is not None and table.sort_key(index) == row.sort_key:
+                if table.row(index) != row:
+                    table.update(index, row)
+                    self._update_leaderboards(row)
+                    changed = True
+                continue
+            moved[row.uuid] = row
+            
+        if not moved:
+            return changed
+            
+        # Copying and re-sorting is O(N); keep it off the event loop thread like _full_reload
+        table, self._rows = await asyncio.to_thread(self._place_moved, table, self._rows, moved)
+        self._players = table
+        for row in moved.values():
+            self.search_index.upsert(row.uuid, row.name)
+            self._update_leaderboards(row)
+        return True
+        
+    @staticmethod
+    def _place_moved(table: PlayerTable, positions: Dict[str, int],
+                     moved: Dict[str, Player]) -> Tuple[PlayerTable, Dict[str, int]]:
+        """Place new or renamed players into a copy of the table (worker thread)."""
+        # Copy-on-write: views holding the old table keep their pages
+        table = table.copy()
+        for index in sorted((positions[u] for u in moved if u in positions), reverse=True):
+            del table[index]
+        if len(moved) > MERGE_RESORT_THRESHOLD:
+            for row in moved.values():
+                table.append(row)
+            table = table.sorted_by_name()
+        else:
+            for row in moved.values():
+                table.insert(table.bisect(row.sort_key), row)
+        return table, table.uuid_positions()
@@ -0,0 +1,237 @@
+"""
+Connection Pool for Economy Manager Bot
+Version: 0.5.0
+Thread-safe MySQL connection pool with overflow, validation and draining close
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+from mysql.connector import Error
+
+logger = logging.getLogger('economy_bot')
+
+# Connections idle for less than this are handed out without a ping
+PING_IDLE_SECONDS = 1.0
+
+class PoolTimeoutError(Error):
+    """No connection became available before the checkout deadline."""
+
+class PoolClosedError(Error):
+    """The pool was closed."""
+
+class _Record:
+    """Raw connection plus bookkeeping."""
+    
+    __slots__ = ('raw', 'created', 'last_used')
+    
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self.created = time.monotonic()
+        self.last_used = self.created
+
+class PooledConnection:
+    """
+    Checked-out connection.
+    
+    Behaves like the underlying connection; `close()` hands it back to the
+    pool, like mysql.connector's PooledMySQLConnection.
+    """
+    
+    def __init__(self, pool: 'ConnectionPool', record: _Record):
+        self._pool = pool
+        self._record = record
+        self._broken = False
+        
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._record.raw, name)
+        
+    def invalidate(self):
+        """Mark the connection as dead so the pool discards it on close()."""
+        self._broken = True
+        
+    def close(self):
+        """Return the connection to the pool."""
+        if self._record is not None:
+            record, self._record = self._record, None
+            self._pool._release(record, self._broken)
+
+class ConnectionPool:
+    """
+    Fixed-size connection pool with optional overflow.
+    
+    Up to `pool_size` connections are kept open; `max_overflow` more are
+    opened under load and closed when returned. Checkouts wait up to
+    `timeout` seconds for a free connection instead of failing at once.
+    Idle connections are pinged before reuse (reconnecting if the server
+    dropped them) and replaced after `recycle` seconds, so a MySQL restart
+    or `wait_timeout` does not fail the next query.
+    """
+    
+    def __init__(self, factory: Callable[[], Any], pool_size: int = 5, max_overflow: int = 0,
+                 timeout: float = 10.0, recycle: float = 3600.0, pre_ping: bool = True,
+                 name: str = 'economy_pool'):
+        """
+        Initialize the pool (no connections are opened yet).
+        
+        Args:
+            factory: Opens a new raw connection
+            pool_size: Connections kept open
+            max_overflow: Extra connections allowed under load
+            timeout: Seconds a checkout waits for a free connection
+            recycle: Replace connections older than this many seconds (0 disables)
+            pre_ping: Ping idle connections before handing them out
+            name: Pool name used in logs and metrics
+        """
+        self.factory = factory
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.name = name
+        self._idle: Deque[_Record] = deque()
+        self._condition = threading.Condition()
+        self._opened = 0  # Open connections, idle or checked out
+        self._checked_out = 0
+        self._closed = False
+        self.reconnects = 0  # Dead connections replaced
+        
+    @property
+    def capacity(self) -> int:
+        """Most connections that can be checked out at once."""
+        return self.pool_size + self.max_overflow
+        
+    @property
+    def checked_out(self) -> int:
+        return self._checked_out
+        
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+        
+    def get_connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Check out a validated connection, waiting for one to be returned if needed.
+        
+        Args:
+            timeout: Seconds to wait (defaults to the pool timeout)
+            
+        Returns:
+            Connection whose close() returns it to the pool
+            
+        Raises:
+            PoolTimeoutError: No connection became available in time
+            PoolClosedError: The pool is closed
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosedError(msg=f"Connection pool {self.name} is closed")
+                if self._idle:
+                    record = self._idle.pop()  # Most recently used: least likely to be stale
+                    break
+                if self._opened < self.capacity:
+                    self._opened += 1
+                    record = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        msg=f"No database connection available within {self.timeout:g}s "
+                            f"({self._checked_out}/{self.capacity} in use)"
+                    )
+                self._condition.wait(remaining)
+            self._checked_out += 1
+            
+        try:
+            if record is not None:
+                record = self._validate(record)
+            if record is None:
+                record = _Record(self.factory())
+        except Exception:
+            with self._condition:
+                self._opened -= 1
+                self._checked_out -= 1
+                self._condition.notify()
+            raise
+        return PooledConnection(self, record)
+        
+    def _validate(self, record: _Record) -> Optional[_Record]:
+        """Return the record if still usable, or None after closing it (executor thread)."""
+        now = time.monotonic()
+        if self.recycle and now - record.created > self.recycle:
+            self._close_raw(record.raw)
+            return None
+        if self.pre_ping and now - record.last_used >= PING_IDLE_SECONDS:
+            try:
+                record.raw.ping(reconnect=True, attempts=1, delay=0)
+            except Exception as e:
+                logger.warning(f"Discarding dead connection from {self.name}: {e}")
+                self._close_raw(record.raw)
+                self.reconnects += 1
+                return None
+        return record
+        
+    def _release(self, record: _Record, broken: bool = False):
+        """Take a connection back (called by PooledConnection.close)."""
+        if not broken:
+            try:
+                # End any transaction left open by a read, so the next user
+                # doesn't see a stale snapshot
+                if getattr(record.raw, 'in_transaction', True):
+                    record.raw.rollback()
+            except Exception:
+                broken = True
+                
+        with self._condition:
+            self._checked_out -= 1
+            keep = not (broken or self._closed or self._opened > self.pool_size)
+            if keep:
+                record.last_used = time.monotonic()
+                self._idle.append(record)
+            else:
+                self._opened -= 1
+            self._condition.notify_all()
+        if not keep:
+            if broken:
+                self.reconnects += 1
+            self._close_raw(record.raw)
+            
+    def close(self, timeout: float = 10.0) -> int:
+        """
+        Stop handing out connections, wait for checked-out ones to come back
+        and close everything.
+        
+        Args:
+            timeout: Seconds to wait for checked-out connections
+            
+        Returns:
+            Connections still checked out when the timeout expired
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            while self._checked_out:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            idle, self._idle = list(self._idle), deque()
+            self._opened -= len(idle)
+            remaining_out = self._checked_out
+        for record in idle:
+            self._close_raw(record.raw)
+        return remaining_out
+        
+    @staticmethod
+    def _close_raw(raw: Any):
+        try:
+            raw.close()
+        except Exception:
+            pass
@@ -0,0 +1,94 @@
+"""
+Read Replicas for Economy Manager Bot
+Version: 0.5.0
+Replica endpoints with replication lag tracking for read routing
+"""
+
+import logging
+import time
+from typing import Optional
+
+from mysql.connector import errors
+
+from bot.database.pool import ConnectionPool
+from bot.database.scheduler import WorkScheduler
+
+logger = logging.getLogger('economy_bot')
+
+# Replication status statements, newest syntax first (SHOW REPLICA STATUS needs MySQL 8.0.22+)
+REPLICA_STATUS_QUERIES = ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS")
+LAG_COLUMNS = ('Seconds_Behind_Source', 'Seconds_Behind_Master')
+
+def read_replication_lag(connection) -> Optional[float]:
+    """
+    Seconds a replica is behind its source (executor thread).
+    
+    Args:
+        connection: Connection to the replica
+        
+    Returns:
+        Largest lag over all replication channels, or None when unknown
+        (replication stopped, not a replica, or no privilege to check)
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for query in REPLICA_STATUS_QUERIES:
+            try:
+                cursor.execute(query)
+            except errors.ProgrammingError:
+                # Older server without the new syntax, or missing REPLICATION CLIENT
+                continue
+            lags = []
+            for row in cursor.fetchall():
+                value = next((row[c] for c in LAG_COLUMNS if c in row), None)
+                if value is None:
+                    return None
+                lags.append(float(value))
+            return max(lags) if lags else None
+        return None
+    finally:
+        cursor.close()
+
+class Replica:
+    """One read replica: its connection pool and last known replication lag."""
+    
+    def __init__(self, pool: ConnectionPool, scheduler: WorkScheduler):
+        """
+        Initialize a replica.
+        
+        Args:
+            pool: Connection pool for the replica (no connections opened yet)
+            scheduler: Admission control for the pool, like the primary's
+        """
+        self.pool = pool
+        self.name = pool.name
+        self.scheduler = scheduler
+        self.lag: Optional[float] = None  # Seconds behind the primary at the last check
+        self.checked_at = 0.0  # Monotonic time of the last lag check
+        self.failed_until = 0.0  # Not used before this monotonic time after a failure
+        self.checking = False
+        
+    def usable(self, max_lag: float) -> bool:
+        """Whether reads may go here: reachable and no more than max_lag seconds behind."""
+        return time.monotonic() >= self.failed_until and self.lag is not None and self.lag <= max_lag
+        
+    def record_lag(self, lag: Optional[float]):
+        """Store the result of a lag check."""
+        if lag is None and self.lag is not None:
+            logger.warning(f"Replica {self.name}: replication lag unknown, reads go to the primary")
+        self.lag = lag
+        self.checked_at = time.monotonic()
+        
+    def mark_failed(self, error: Exception, backoff: float):
+        """Take the replica out of rotation for `backoff` seconds."""
+        if time.monotonic() >= self.failed_until:
+            logger.warning(f"Replica {self.name} failed, using the primary for {backoff:g}s: {error}")
+        self.lag = None
+        self.checked_at = time.monotonic()
+        self.failed_until = self.checked_at + backoff
+        
+    def describe(self) -> str:
+        """Short status for /stats."""
+        if time.monotonic() < self.failed_until:
+            return "unavailable"
+        return "lag unknown" if self.lag is None else f"lag {self.lag:g}s"
@@ -0,0 +1,162 @@
+"""
+Work Scheduler for Economy Manager Bot
+Version: 0.5.0
+Prioritized admission control in front of a connection pool
+"""
+
+import asyncio
+import enum
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from bot.utils.metrics import DB_SHED, DB_WAIT_SECONDS, registry
+
+logger = logging.getLogger('economy_bot')
+
+class Lane(enum.IntEnum):
+    """Priority lanes, most urgent first."""
+    WRITE = 0   # Balance changes and ledger inserts
+    LOOKUP = 1  # Single players, pages and other small reads
+    BULK = 2    # Full-table reads, bulk updates and maintenance
+    
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+class DatabaseOverloadedError(Exception):
+    """
+    Too much database work is already queued, so the operation was not run.
+    
+    Deliberately not a mysql.connector Error: read methods turn those into
+    empty results, while this has to reach the interaction to be reported.
+    """
+    
+    def __init__(self, message: str = "The economy database is busy right now, please try again in a few seconds."):
+        super().__init__(message)
+
+class WorkScheduler:
+    """
+    Priority semaphore for one connection pool.
+    
+    At most `capacity` operations run at once. Waiting operations are started
+    lane by lane (writes, then lookups, then bulk work) and first come first
+    served within a lane. Bulk work may hold at most `bulk_limit` slots, so a
+    burst of table scans always leaves a connection for writes and lookups.
+    
+    When `max_queue` operations are already waiting, new lookups and bulk
+    work are shed with DatabaseOverloadedError instead of queueing; writes
+    are only shed when `max_queue` writes are waiting.
+    """
+    
+    def __init__(self, name: str, capacity: int, max_queue: int = 100, bulk_limit: Optional[int] = None):
+        """
+        Initialize a scheduler.
+        
+        Args:
+            name: Pool name used as the metrics label
+            capacity: Operations running at once (the pool's connection capacity)
+            max_queue: Waiting operations before new ones are shed (0 never sheds)
+            bulk_limit: Slots bulk work may hold at once (defaults to capacity - 1, at least 1)
+        """
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.bulk_limit = max(1, min(bulk_limit or capacity - 1, capacity))
+        self.active = 0
+        self._active: Dict[Lane, int] = {lane: 0 for lane in Lane}
+        self._waiters: Dict[Lane, Deque[asyncio.Future]] = {lane: deque() for lane in Lane}
+        for lane in Lane:
+            registry.gauge('economy_db_lane_queue_depth', 'Operations waiting for a slot, per lane').set_function(
+                lambda lane=lane: self._depth(lane), pool=name, lane=lane.label)
+                
+    @property
+    def waiting(self) -> int:
+        """Operations queued for a slot in any lane."""
+        return sum(self._depth(lane) for lane in Lane)
+        
+    def queued(self) -> Dict[str, int]:
+        """Waiting operations per lane, for /stats."""
+        return {lane.label: self._depth(lane) for lane in Lane}
+        
+    def _depth(self, lane: Lane) -> int:
+        """Waiters of a lane still waiting (cancelled ones may linger until they're unqueued)."""
+        return sum(not future.done() for future in self._waiters[lane])
+        
+    def _has_waiters(self, lane: Lane) -> bool:
+        """Whether anyone is still waiting in a lane, dropping cancelled waiters from its head."""
+        waiters = self._waiters[lane]
+        while waiters and waiters[0].done():
+            waiters.popleft()
+        return bool(waiters)
+        
+    def _can_start(self, lane: Lane) -> bool:
+        if self.active >= self.capacity:
+            return False
+        return lane != Lane.BULK or self._active[Lane.BULK] < self.bulk_limit
+        
+    def _start(self, lane: Lane):
+        self.active += 1
+        self._active[lane] += 1
+        
+    async def acquire(self, lane: Lane, timeout: Optional[float] = None):
+        """
+        Wait for a slot in the given lane.
+        
+        Args:
+            lane: Priority lane of the operation
+            timeout: Most seconds to wait, or None to wait indefinitely
+            
+        Raises:
+            DatabaseOverloadedError: The queue is too deep to accept the operation
+            asyncio.TimeoutError: No slot became free within timeout
+        """
+        started = time.perf_counter()
+        # Only overtake waiters of lower lanes; equal or more urgent ones keep their turn
+        if self._can_start(lane) and not any(self._has_waiters(l) for l in Lane if l <= lane):
+            self._start(lane)
+            DB_WAIT_SECONDS.observe(0.0, pool=self.name, lane=lane.label)
+            return
+            
+        backlog = self._depth(lane) if lane == Lane.WRITE else self.waiting
+        if self.max_queue and backlog >= self.max_queue:
+            DB_SHED.inc(pool=self.name, lane=lane.label)
+            raise DatabaseOverloadedError()
+            
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Handed a slot just as we gave up: pass it on
+                self.release(lane)
+            else:
+                try:
+                    self._waiters[lane].remove(future)
+                except ValueError:
+                    pass
+            raise
+        DB_WAIT_SECONDS.observe(time.perf_counter() - started, pool=self.name, lane=lane.label)
+        
+    def release(self, lane: Lane):
+        """Free a slot taken with acquire() and start the next waiter."""
+        self.active -= 1
+        self._active[lane] -= 1
+        self._wake()
+        
+    def _wake(self):
+        """Hand free slots to the most urgent waiters that may start."""
+        while self.active < self.capacity:
+            for lane in Lane:
+                if self._has_waiters(lane) and self._can_start(lane):
+                    self._start(lane)
+                    self._waiters[lane].popleft().set_result(None)
+                    break
+            else:
+                return
+                
+    def describe(self) -> List[str]:
+        """Lanes with waiting operations, e.g. ['lookup 3', 'bulk 12']."""
+        return [f"{label} {count}" for label, count in self.queued().items() if count]
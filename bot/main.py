@@ -3,8 +3,14 @@ Economy Manager V1 - Main Bot Entry Point
 Version: 0.2.2
 """
 
+import time
+
+# Reference point for the startup timings the bot reports
+PROCESS_STARTED = time.monotonic()
+
 import discord
 from discord.ext import commands
+import asyncio
 import os
 import sys
 import logging
@@ -15,15 +21,22 @@ from dotenv import load_dotenv
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from bot.utils.command_sync import sync_command_tree
 from bot.utils.config import Config
-from bot.utils.logger import setup_logger
+from bot.utils.logger import setup_logger_from_config, shutdown_logger
+from bot.utils.log_sink import LogSink
+from bot.utils.metrics import MetricsServer, registry
+from bot.database.backends import BackendRegistry, EconomyBackend
+from bot.database.balance_watcher import BalanceWatcher
 from bot.database.db_manager import DatabaseManager
+from bot.database.ledger import LedgerWriter
+from bot.database.player_directory import PlayerDirectory
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logger = setup_logger()
+# Setup logging (without validation, so configuration errors are logged too)
+logger = setup_logger_from_config(Config(validate=False))
 
 class EconomyBot(commands.Bot):
     """Main bot class for Economy Manager."""
@@ -37,66 +50,240 @@ class EconomyBot(commands.Bot):
         super().__init__(
             command_prefix='!',  # Fallback prefix, mainly using buttons
             intents=intents,
-            help_command=None
+            help_command=None,
+            # Sent with every identify, so it survives reconnects without a presence update
+            activity=discord.Activity(
+                type=discord.ActivityType.watching,
+                name="player economies 💎"
+            )
         )
         
         self.config = Config()
         self.db_manager = None
+        self.player_directory = None  # Shared player cache used by /manage and search
         self.log_channel = None  # Discord channel for action logs
+        self.log_sink = LogSink(
+            max_queue=self.config.LOG_CHANNEL_QUEUE_SIZE,
+            flush_interval=self.config.LOG_CHANNEL_FLUSH_INTERVAL
+        )
+        self.metrics_server = None  # Prometheus endpoint, when METRICS_PORT is set
+        self.ledger = None  # Batched writer for the transaction ledger
+        self.backends = None  # Economy servers by name (db_manager etc. above belong to the default one)
+        self.startup_timings = {}  # Milestone -> seconds after process start (first occurrence only)
+        self._background_tasks = set()  # Fire-and-forget tasks, referenced until done (asyncio only keeps weak refs)
         
     async def setup_hook(self):
         """Setup hook called before bot starts."""
         logger.info("Setting up bot...")
+        self.log_sink.start()
+        registry.gauge('economy_log_channel_queue_depth', 'Log channel entries waiting to be sent').set_function(
+            self.log_sink.queue.qsize)
+        registry.gauge('economy_log_channel_dropped', 'Log channel entries dropped (full queue or no channel)').set_function(
+            lambda: self.log_sink.dropped)
+        registry.gauge('economy_log_channel_failed', 'Log channel entries whose send failed').set_function(
+            lambda: self.log_sink.failed)
         
-        # Initialize database connection
-        self.db_manager = DatabaseManager(
-            host=self.config.DB_HOST,
-            port=self.config.DB_PORT,
-            user=self.config.DB_USER,
-            password=self.config.DB_PASSWORD,
-            database=self.config.DB_NAME
-        )
-        
-        await self.db_manager.connect()
-        logger.info("Database connection established")
+        if self.config.METRICS_PORT:
+            self.metrics_server = MetricsServer(registry, self.config.METRICS_HOST, self.config.METRICS_PORT)
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logger.error(f"Failed to start metrics endpoint: {e}")
+                self.metrics_server = None
+                
+        # One backend per economy server, connected concurrently; a server that
+        # is down is still registered, and its commands report it unavailable
+        self.backends = BackendRegistry(timeout=self.config.SERVER_QUERY_TIMEOUT)
+        backends = await asyncio.gather(*(self._start_backend(name) for name in self.config.ECONOMY_SERVERS))
+        for backend in backends:
+            self.backends.add(backend)
+            
+        # The default server serves commands that don't name one
+        default = self.backends.default
+        self.db_manager = default.db_manager
+        self.player_directory = default.player_directory
+        self.ledger = default.ledger
         
         # Load cogs
         await self.load_extension('bot.cogs.economy')
         logger.info("Loaded economy cog")
         
+        # Command sync runs alongside the gateway connection instead of delaying it
+        self._spawn(self._sync_commands(), 'command sync')
+        self.mark_startup('setup')
+        
+    async def _sync_commands(self):
+        """Sync slash commands once per process, and only if they changed since the last sync."""
+        try:
+            guild = None
+            if self.config.GUILD_ID:
+                # Sync to specific guild if configured for instant updates
+                guild = discord.Object(id=self.config.GUILD_ID)
+                self.tree.copy_global_to(guild=guild)
+            synced = await sync_command_tree(self.tree, self.config.COMMAND_SYNC_STATE_FILE, guild,
+                                             force=self.config.COMMAND_SYNC_FORCE)
+            if synced is not None:
+                scope = f"to guild {self.config.GUILD_ID}" if guild else "globally (may take up to 1 hour)"
+                logger.info(f"Synced {synced} command(s) {scope}")
+        except Exception as e:
+            logger.error(f"Failed to sync commands: {e}", exc_info=True)
+            
+    def _spawn(self, coro, description: str) -> asyncio.Task:
+        """
+        Run a coroutine in the background, keeping a reference until it finishes.
+        
+        Args:
+            coro: Coroutine to run
+            description: What it does, for the log if it fails
+            
+        Returns:
+            The task (cancelled by close() if still running)
+        """
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(lambda t: self._background_task_done(t, description))
+        return task
+        
+    def _background_task_done(self, task: asyncio.Task, description: str):
+        """Forget a finished background task and log its exception, if any."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task failed ({description})", exc_info=task.exception())
+            
+    def mark_startup(self, milestone: str):
+        """
+        Record how long after process start a milestone was first reached.
+        
+        Args:
+            milestone: e.g. 'setup', 'ready' or 'first_manage'
+        """
+        if milestone in self.startup_timings:
+            return
+        elapsed = time.monotonic() - PROCESS_STARTED
+        self.startup_timings[milestone] = elapsed
+        registry.gauge('economy_startup_seconds', 'Seconds from process start to a startup milestone').set(
+            elapsed, milestone=milestone)
+        logger.info(f"Startup: {milestone} after {elapsed:.2f}s")
+        
+    async def _start_backend(self, name: str) -> EconomyBackend:
+        """
+        Connect to one economy server and start its ledger and player cache.
+        
+        Args:
+            name: Server name from ECONOMY_SERVERS
+            
+        Returns:
+            The server's backend
+        """
+        settings = self.config.server_settings(name)
+        table_name = settings.pop('table_name')
+        multi = len(self.config.ECONOMY_SERVERS) > 1
+        db_manager = DatabaseManager(
+            **settings,
+            pool_size=self.config.DB_POOL_SIZE,
+            max_workers=self.config.DB_MAX_WORKERS,
+            max_overflow=self.config.DB_POOL_MAX_OVERFLOW,
+            pool_timeout=self.config.DB_POOL_TIMEOUT,
+            pool_recycle=self.config.DB_POOL_RECYCLE,
+            pre_ping=self.config.DB_POOL_PRE_PING,
+            connect_timeout=self.config.DB_CONNECT_TIMEOUT,
+            replica_max_lag=self.config.DB_REPLICA_MAX_LAG,
+            replica_check_interval=self.config.DB_REPLICA_CHECK_INTERVAL,
+            max_queue=self.config.DB_MAX_QUEUE,
+            bulk_concurrency=self.config.DB_BULK_CONCURRENCY,
+            pool_name=f"economy_{name}" if multi else 'economy_pool'
+        )
+        backend = EconomyBackend(name, db_manager, table_name=table_name)
+        
+        if not await db_manager.connect():
+            logger.error(f"Economy server {name} is unavailable; its commands will fail until it recovers")
+        else:
+            logger.info(f"Database connection established ({name})")
+            
+            # Point lookups and pagination rely on these indexes; the check only reports, so don't wait for it
+            self._spawn(db_manager.check_indexes(table_name, create=self.config.DB_CREATE_INDEXES),
+                        f"index check ({name})")
+            
+            # Every balance change is queued here and group-committed in the background
+            if self.config.LEDGER_ENABLED and await db_manager.ensure_ledger_table(self.config.LEDGER_TABLE):
+                ledger = LedgerWriter(
+                    db_manager,
+                    table_name=self.config.LEDGER_TABLE,
+                    max_queue=self.config.LEDGER_QUEUE_SIZE,
+                    flush_interval=self.config.LEDGER_FLUSH_INTERVAL,
+                    max_batch=self.config.LEDGER_BATCH_SIZE
+                )
+                ledger.start()
+                db_manager.ledger = backend.ledger = ledger
+                registry.gauge('economy_ledger_queue_depth', 'Ledger entries waiting to be written').set_function(
+                    ledger.queue.qsize, server=name)
+                registry.gauge('economy_ledger_failed', 'Ledger entries that could not be written').set_function(
+                    lambda: ledger.failed + ledger.dropped, server=name)
+                    
+        # Shared player cache, warmed in the background so startup isn't blocked
+        backend.player_directory = PlayerDirectory(
+            db_manager,
+            table_name=table_name,
+            ttl=self.config.PLAYER_CACHE_TTL,
+            refresh_interval=self.config.PLAYER_CACHE_REFRESH,
+            leaderboard_size=self.config.LEADERBOARD_SIZE
+        )
+        self._spawn(backend.player_directory.refresh(), f"player directory load ({name})")
+        
+        # Polls the directory every minute or so and alerts on balance changes the bot didn't make
+        if self.config.WATCH_ENABLED:
+            watcher = BalanceWatcher(
+                backend.player_directory,
+                self.send_log,
+                server=name,
+                interval=self.config.WATCH_INTERVAL,
+                thresholds={'gems': self.config.WATCH_ALERT_GEMS, 'coins': self.config.WATCH_ALERT_COINS},
+                zscore=self.config.WATCH_ZSCORE,
+                scan_rows=self.config.WATCH_SCAN_ROWS,
+                show_server=multi
+            )
+            backend.player_directory.balance_watcher = db_manager.balance_watcher = watcher
+            backend.balance_watcher = watcher
+            watcher.start()
+        return backend
+        
     async def on_ready(self):
-        """Called when bot is ready."""
+        """Called when bot is ready (again after every new gateway session)."""
+        if 'ready' in self.startup_timings:
+            logger.info(f"Reconnected to the gateway ({len(self.guilds)} guild(s))")
+            return
+        self.mark_startup('ready')
         logger.info(f'Logged in as {self.user.name} (ID: {self.user.id})')
         logger.info(f'Bot is ready! Connected to {len(self.guilds)} guild(s)')
         
-        # Setup log channel if configured
+        # Setup log channel if configured (may need an API call, so don't hold up on_ready)
         if self.config.LOG_CHANNEL_ID:
-            self.log_channel = self.get_channel(self.config.LOG_CHANNEL_ID)
-            if self.log_channel:
-                logger.info(f"Log channel configured: #{self.log_channel.name}")
-                await self.send_log("✅ **Bot Online** - Economy Manager started successfully")
-            else:
-                logger.warning(f"Log channel ID {self.config.LOG_CHANNEL_ID} not found")
-        
-        # Set bot status
-        await self.change_presence(
-            activity=discord.Activity(
-                type=discord.ActivityType.watching,
-                name="player economies 💎"
-            )
-        )
-    
+            self._spawn(self._setup_log_channel(), 'log channel setup')
+            
+    async def _setup_log_channel(self):
+        """Find the log channel, fetching it if it isn't cached, and announce the start."""
+        channel_id = self.config.LOG_CHANNEL_ID
+        try:
+            self.log_channel = self.get_channel(channel_id) or await self.fetch_channel(channel_id)
+        except discord.HTTPException as e:
+            logger.warning(f"Log channel ID {channel_id} not found: {e}")
+            self.log_sink.set_channel(None)
+            return
+        self.log_sink.set_channel(self.log_channel)
+        logger.info(f"Log channel configured: #{self.log_channel.name}")
+        await self.send_log("✅ **Bot Online** - Economy Manager started successfully")
+        
     async def send_log(self, message: str, embed: discord.Embed = None):
-        """Send a log message to the configured log channel."""
-        if self.log_channel:
-            try:
-                if embed:
-                    await self.log_channel.send(message, embed=embed)
-                else:
-                    await self.log_channel.send(message)
-            except Exception as e:
-                logger.error(f"Failed to send log to channel: {e}")
+        """
+        Send a log message to the configured log channel.
         
+        Returns immediately: messages are queued and delivered in batches by
+        the log sink, so interactions never wait on the log channel.
+        """
+        if self.config.LOG_CHANNEL_ID:
+            # Queued even before the channel is looked up; the sink holds entries until then
+            self.log_sink.submit(message, embed)
+            
     async def on_error(self, event, *args, **kwargs):
         """Global error handler."""
         logger.error(f"Error in event {event}", exc_info=True)
@@ -104,9 +291,17 @@ class EconomyBot(commands.Bot):
     async def close(self):
         """Cleanup before shutdown."""
         logger.info("Shutting down bot...")
-        if self.db_manager:
-            await self.db_manager.close()
-            logger.info("Database connection closed")
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.log_sink.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.backends:
+            # Each backend writes its queued ledger entries before closing its pool
+            await self.backends.close()
+            logger.info("Database connections closed")
         await super().close()
 
 def main():
@@ -119,6 +314,8 @@ def main():
         logger.info("Bot stopped by user")
     except Exception as e:
         logger.critical(f"Fatal error: {e}", exc_info=True)
+    finally:
+        shutdown_logger()
 
 if __name__ == "__main__":
     main()
@@ -6,27 +6,84 @@ Discord UI Views, Buttons, Modals, and Select Menus
 
 import discord
 from discord import ui
-from typing import List, Optional, Callable
+import functools
+import io
+import time
+from pathlib import Path
+from typing import List, Optional, Callable, Sequence, Tuple
 import logging
-from difflib import SequenceMatcher
+from bot.database.models import Player
+from bot.utils.bulk_csv import build_bulk_report
+from bot.utils.restore import RestoreReport, restore_snapshot
+from bot.utils.metrics import timed_interaction
+from bot.utils.search_index import MATCH_THRESHOLD, fuzzy_match_score
 
 logger = logging.getLogger('economy_bot')
 
+# Most search results kept for the results dropdown/pagination
+SEARCH_RESULT_LIMIT = 1000
+
+# Prefix of the custom_ids used by the persistent player list
+PLAYER_LIST_ID = 'economy:players'
+
+# Sort orders encoded in player list custom_ids
+SORT_NAME = 'n'
+SORT_RELEVANCE = 'r'
+
+# Optional economy server in persistent custom_ids ('economy:players@<server>:...');
+# ids without one belong to the default server
+SERVER_ID = r'(?:@(?P<server>[a-z0-9_-]{1,16}))?'
+
+# Server token of a network-wide (all servers) leaderboard
+ALL_SERVERS = '*'
+
+# Longest search query kept in a custom_id (Discord allows 100 characters in total)
+MAX_QUERY_LENGTH = 50
+
+# Players per page (Discord's limit for select options)
+PAGE_SIZE = 25
+
+# Attachment size limit outside guilds (guilds report their own)
+DEFAULT_UPLOAD_LIMIT = 10 * 1024 * 1024
+
 class PlayerSelectView(ui.View):
-    """View for selecting a player from dropdown with pagination and search."""
+    """
+    View for selecting a player from dropdown with pagination and search.
+    
+    Works in one of two modes:
+    - List mode: pages are sliced from an in-memory player sequence (used
+      when no directory is available; see PlayerListView otherwise).
+    - Keyset mode (db_manager given): only the rendered page is fetched from
+      the database, using (name, id) cursors kept in `cursors`.
+    """
     
-    def __init__(self, players: List[dict], callback: Callable, page: int = 0):
+    def __init__(self, players: Sequence[Player], callback: Callable, page: int = 0, directory=None,
+                 db_manager=None, cursors: Optional[List[Tuple[Optional[str], Optional[int]]]] = None,
+                 total_players: Optional[int] = None, table_name: str = 'coinsengine_users',
+                 server: Optional[str] = None):
         super().__init__(timeout=300)
         self.callback_func = callback
-        self.all_players = players  # Store all players
+        self.all_players = players  # Store all players (keyset mode: this page plus one lookahead row)
+        self.directory = directory  # Shared PlayerDirectory used for search
+        self.db_manager = db_manager  # Set in keyset mode
+        self.cursors = cursors or [(None, None)]  # Keyset mode: start cursor of every page up to this one
+        self.table_name = table_name
+        self.server = server  # Economy server the players belong to (passed on to searches)
         self.page = page
-        self.page_size = 25
+        self.page_size = PAGE_SIZE
         
         # Calculate pagination
-        total_pages = (len(players) - 1) // self.page_size + 1 if players else 0
-        start_idx = page * self.page_size
-        end_idx = start_idx + self.page_size
-        current_players = players[start_idx:end_idx]
+        if self.db_manager:
+            self.total_players = total_players if total_players is not None else len(players)
+            current_players = players[:self.page_size]
+            has_next = len(players) > self.page_size
+        else:
+            self.total_players = len(players)
+            start_idx = page * self.page_size
+            end_idx = start_idx + self.page_size
+            current_players = players[start_idx:end_idx]
+            has_next = end_idx < len(players)
+        total_pages = (self.total_players - 1) // self.page_size + 1 if self.total_players else 0
         
         # Add player select dropdown
         self.add_item(PlayerSelect(current_players, self.on_player_select))
@@ -36,13 +93,13 @@ class PlayerSelectView(ui.View):
             prev_button = ui.Button(label="Previous", style=discord.ButtonStyle.secondary, emoji="⬅️")
             prev_button.callback = self.previous_page
             self.add_item(prev_button)
-        
+            
         # Add Next button if there are more pages
-        if end_idx < len(players):
+        if has_next:
             next_button = ui.Button(label="Next", style=discord.ButtonStyle.secondary, emoji="➡️")
             next_button.callback = self.next_page
             self.add_item(next_button)
-        
+            
         # Page info (disabled button as label)
         page_info = ui.Button(
             label=f"Page {page + 1}/{total_pages}",
@@ -51,66 +108,99 @@ class PlayerSelectView(ui.View):
         )
         self.add_item(page_info)
         
+    @classmethod
+    async def from_database(cls, db_manager, callback: Callable, directory=None,
+                            cursors: Optional[List[Tuple[Optional[str], Optional[int]]]] = None,
+                            table_name: str = 'coinsengine_users',
+                            server: Optional[str] = None) -> 'PlayerSelectView':
+        """
+        Build a keyset-mode view, fetching only the page it renders.
+        
+        Args:
+            db_manager: DatabaseManager to page through
+            callback: Called with (interaction, player_uuid) on selection
+            directory: Shared PlayerDirectory used for search
+            cursors: Start cursor of every page up to the one to show (defaults to the first page)
+            table_name: Name of the players table
+            server: Economy server the database belongs to
+            
+        Returns:
+            PlayerSelectView for the last cursor's page
+        """
+        cursors = cursors or [(None, None)]
+        after_name, after_id = cursors[-1]
+        # One extra row tells us whether a next page exists
+        players = await db_manager.get_players_page(after_name, after_id, limit=26, table_name=table_name)
+        total_players = await db_manager.count_players(table_name)
+        return cls(players, callback, len(cursors) - 1, directory, db_manager, cursors,
+                   total_players, table_name, server)
+                   
     async def on_player_select(self, interaction: discord.Interaction, selected_player: str):
         """Handle player selection."""
         await self.callback_func(interaction, selected_player)
-    
-    async def previous_page(self, interaction: discord.Interaction):
-        """Go to previous page."""
-        new_view = PlayerSelectView(self.all_players, self.callback_func, self.page - 1)
         
-        total_players = len(self.all_players)
-        start_idx = (self.page - 1) * self.page_size + 1
-        end_idx = min(self.page * self.page_size, total_players)
+    async def _show_page(self, interaction: discord.Interaction, page: int):
+        """Replace the message with the given page."""
+        if self.db_manager:
+            if page > self.page:
+                last = self.all_players[self.page_size - 1]
+                cursors = self.cursors + [(last.name, last.id)]
+            else:
+                cursors = self.cursors[:page + 1]
+            new_view = await PlayerSelectView.from_database(
+                self.db_manager, self.callback_func, self.directory, cursors, self.table_name, self.server
+            )
+        else:
+            new_view = PlayerSelectView(self.all_players, self.callback_func, page, self.directory)
+            
+        total_players = new_view.total_players
+        start_idx = page * self.page_size + 1
+        end_idx = min((page + 1) * self.page_size, total_players)
         
         await interaction.response.edit_message(
             content=f"**Economy Manager**\n📊 Total Players: {total_players}\n📋 Showing: {start_idx}-{end_idx}",
             view=new_view
         )
-    
+        
+    @timed_interaction('select_previous_page')
+    async def previous_page(self, interaction: discord.Interaction):
+        """Go to previous page."""
+        await self._show_page(interaction, self.page - 1)
+        
+    @timed_interaction('select_next_page')
     async def next_page(self, interaction: discord.Interaction):
         """Go to next page."""
-        new_view = PlayerSelectView(self.all_players, self.callback_func, self.page + 1)
-        
-        total_players = len(self.all_players)
-        start_idx = (self.page + 1) * self.page_size + 1
-        end_idx = min((self.page + 2) * self.page_size, total_players)
+        await self._show_page(interaction, self.page + 1)
         
-        await interaction.response.edit_message(
-            content=f"**Economy Manager**\n📊 Total Players: {total_players}\n📋 Showing: {start_idx}-{end_idx}",
-            view=new_view
-        )
-    
     @ui.button(label="Search Player", style=discord.ButtonStyle.primary, emoji="🔍", row=4)
+    @timed_interaction('select_search')
     async def search_button(self, interaction: discord.Interaction, button: ui.Button):
         """Button to search for a player by name."""
-        modal = PlayerSearchModal(self.all_players, self.callback_func)
+        modal = PlayerSearchModal(self.all_players, self.callback_func, self.directory, self.server)
         await interaction.response.send_modal(modal)
 
 
 class PlayerSelect(ui.Select):
     """Dropdown menu for selecting players."""
     
-    def __init__(self, players: List[dict], callback: Callable):
+    def __init__(self, players: Sequence[Player], callback: Callable):
         self.callback_func = callback
-        self.player_map = {}  # Map UUID to player data
+        self.player_map = {}  # Map UUID to player name
         
         # Create options from players (max 25 options per Discord limitation)
         options = []
         for i, player in enumerate(players[:25]):
             # Use 'name' field from coinsengine_users table
-            player_name = player.get('name', player.get('uuid', f'Player {i+1}'))
-            uuid = player.get('uuid', f'unknown_{i}')
-            gems = player.get('gems', 0)
-            coins = player.get('coins', 0)
+            player_name = player.name or player.uuid or f'Player {i+1}'
+            uuid = player.uuid or f'unknown_{i}'
             
-            # Store player data mapped by UUID
+            # Store player name mapped by UUID
             self.player_map[uuid] = player_name
             
             options.append(
                 discord.SelectOption(
                     label=player_name,
-                    description=f"💎 {gems:.2f} gems | 🪙 {coins:.2f} coins",
+                    description=f"💎 {player.gems:.2f} gems | 🪙 {player.coins:.2f} coins",
                     value=uuid  # Use UUID as value to ensure uniqueness
                 )
             )
@@ -122,6 +212,7 @@ class PlayerSelect(ui.Select):
             options=options
         )
         
+    @timed_interaction('select_player')
     async def callback(self, interaction: discord.Interaction):
         """Handle selection callback."""
         selected_uuid = self.values[0]
@@ -129,18 +220,385 @@ class PlayerSelect(ui.Select):
         await self.callback_func(interaction, selected_uuid)
 
 
+def player_list_id(action: str, page: int = 0, sort: str = SORT_NAME, query: str = '',
+                   server: Optional[str] = None) -> str:
+    """
+    Build the custom_id of a player list component.
+    
+    Args:
+        action: Component action (prev, next, sort or pick)
+        page: Zero-based page shown by the message
+        sort: SORT_NAME or SORT_RELEVANCE
+        query: Search query, empty when browsing all players
+        server: Economy server, or None for the default one
+        
+    Returns:
+        custom_id of at most 100 characters
+    """
+    return f"{_list_prefix(server)}:{action}:{page}:{sort}:{query[:MAX_QUERY_LENGTH]}"
+
+def _list_prefix(server: Optional[str]) -> str:
+    return f"{PLAYER_LIST_ID}@{server}" if server else PLAYER_LIST_ID
+
+async def resolve_player_page(directory, page: int, query: str = '',
+                              sort: str = SORT_NAME) -> Tuple[List[Player], int, int]:
+    """
+    Look up one page of the player list in the shared directory.
+    
+    Args:
+        directory: Shared PlayerDirectory
+        page: Requested page (clamped to the pages that exist now)
+        query: Search query, or empty to browse every player by name
+        sort: SORT_NAME or SORT_RELEVANCE (search results only)
+        
+    Returns:
+        Tuple of (players on the page, total players, page actually shown)
+    """
+    if query:
+        players = [player for _, player in await directory.search(query, limit=SEARCH_RESULT_LIMIT)]
+        if sort == SORT_NAME:
+            players.sort(key=lambda player: player.sort_key)
+    else:
+        players = await directory.get_players()
+    total = len(players)
+    page = max(0, min(page, (total - 1) // PAGE_SIZE)) if total else 0
+    return players[page * PAGE_SIZE:(page + 1) * PAGE_SIZE], total, page
+
+def player_list_message(total: int, page: int, query: str = '') -> str:
+    """Message text above a player list page."""
+    start = page * PAGE_SIZE + 1 if total else 0
+    end = min((page + 1) * PAGE_SIZE, total)
+    if query:
+        found = f"{total}+" if total >= SEARCH_RESULT_LIMIT else str(total)
+        return (f"**Search Results** for '{query}' ({found} players found)\n"
+                f"📋 Showing: {start}-{end}\n\nSelect a player from the dropdown:")
+    return f"**Economy Manager**\n📊 Total Players: {total}\n📋 Showing: {start}-{end}"
+
+def _selection_handler(interaction: discord.Interaction) -> Optional[Callable]:
+    """The economy cog's player selection callback, if the cog is loaded."""
+    cog = interaction.client.get_cog('Economy')
+    return cog.on_player_selected if cog else None
+
+async def _get_backend(interaction: discord.Interaction, server: Optional[str]):
+    """
+    The economy backend a persistent component belongs to.
+    
+    Answers the interaction with an error when the server is no longer
+    configured.
+    
+    Args:
+        interaction: Component interaction
+        server: Server from the custom_id, or None for the default one
+        
+    Returns:
+        EconomyBackend, or None if the interaction was answered with an error
+    """
+    backend = interaction.client.backends.get(server)
+    if backend is None:
+        await interaction.response.send_message(
+            f"❌ Economy server `{server}` is no longer configured.", ephemeral=True
+        )
+    return backend
+
+class PlayerListView(ui.View):
+    """
+    Persistent player list: one page of the shared directory, or of a search.
+    
+    The view holds nothing but its components. Page, sort order and query
+    are encoded in each component's custom_id and the components are
+    registered as dynamic items at startup, so any click (also after a
+    restart) rebuilds the page it needs from the directory. Nothing has to
+    be kept per open message.
+    """
+    
+    def __init__(self, players: Sequence[Player], page: int, total: int,
+                 query: str = '', sort: str = SORT_NAME, server: Optional[str] = None):
+        super().__init__(timeout=None)
+        self.total_players = total
+        total_pages = (total - 1) // PAGE_SIZE + 1 if total else 0
+        
+        self.add_item(PlayerPageSelect(players, page, sort, query, server,
+                                       placeholder=f"Choose a player to manage... (page {page + 1}/{total_pages})"))
+        if page > 0:
+            self.add_item(PlayerPageButton('prev', page, sort, query, server))
+        if (page + 1) * PAGE_SIZE < total:
+            self.add_item(PlayerPageButton('next', page, sort, query, server))
+        if query:
+            self.add_item(PlayerPageButton('sort', page, sort, query, server))
+        self.add_item(PlayerSearchButton(server))
+        
+    @classmethod
+    async def build(cls, directory, page: int = 0, query: str = '', sort: Optional[str] = None,
+                    server: Optional[str] = None) -> Tuple['PlayerListView', str]:
+        """
+        Build the view and message text for a page.
+        
+        Args:
+            directory: Shared PlayerDirectory
+            page: Page to show
+            query: Search query, or empty to browse all players
+            sort: Sort order (defaults to relevance for searches, name otherwise)
+            server: Economy server the directory belongs to (None for the default one)
+            
+        Returns:
+            Tuple of (view, message content)
+        """
+        query = query[:MAX_QUERY_LENGTH]
+        sort = sort or (SORT_RELEVANCE if query else SORT_NAME)
+        players, total, page = await resolve_player_page(directory, page, query, sort)
+        content = player_list_message(total, page, query)
+        if server:
+            content = f"🖥️ Server: **{server}**\n{content}"
+        return cls(players, page, total, query, sort, server), content
+
+
+class PlayerPageButton(ui.DynamicItem[ui.Button],
+                       template=PLAYER_LIST_ID + SERVER_ID
+                       + r':(?P<action>prev|next|sort):(?P<page>\d+):(?P<sort>[nr]):(?P<query>.*)'):
+    """Previous/Next/Sort button of a persistent player list."""
+    
+    STYLES = {
+        'prev': ("Previous", "⬅️"),
+        'next': ("Next", "➡️"),
+    }
+    
+    def __init__(self, action: str, page: int, sort: str, query: str = '', server: Optional[str] = None):
+        if action == 'sort':
+            label, emoji = ("Sort: Relevance", "🎯") if sort == SORT_RELEVANCE else ("Sort: Name", "🔤")
+        else:
+            label, emoji = self.STYLES[action]
+        super().__init__(ui.Button(
+            label=label, emoji=emoji, style=discord.ButtonStyle.secondary,
+            custom_id=player_list_id(action, page, sort, query, server)
+        ))
+        self.action = action
+        self.page = page
+        self.sort = sort
+        self.query = query
+        self.server = server
+        
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['action'], int(match['page']), match['sort'], match['query'], match['server'])
+        
+    @timed_interaction('select_page')
+    async def callback(self, interaction: discord.Interaction):
+        """Replace the message with the neighbouring page or the other sort order."""
+        backend = await _get_backend(interaction, self.server)
+        if backend is None:
+            return
+        if self.action == 'sort':
+            page, sort = 0, SORT_NAME if self.sort == SORT_RELEVANCE else SORT_RELEVANCE
+        else:
+            page, sort = self.page + (1 if self.action == 'next' else -1), self.sort
+        view, content = await PlayerListView.build(backend.player_directory, page, self.query, sort, self.server)
+        await interaction.response.edit_message(content=content, view=view)
+
+
+class PlayerPageSelect(ui.DynamicItem[ui.Select],
+                       template=PLAYER_LIST_ID + SERVER_ID + r':pick:(?P<page>\d+):(?P<sort>[nr]):(?P<query>.*)'):
+    """Player dropdown of a persistent player list."""
+    
+    def __init__(self, players: Sequence[Player], page: int, sort: str, query: str = '',
+                 server: Optional[str] = None, placeholder: str = "Choose a player to manage..."):
+        options = [
+            discord.SelectOption(
+                label=(player.name or player.uuid or f'Player {i + 1}')[:100],
+                description=f"💎 {player.gems:.2f} gems | 🪙 {player.coins:.2f} coins",
+                value=player.uuid or f'unknown_{i}'
+            )
+            for i, player in enumerate(players[:PAGE_SIZE])
+        ]
+        super().__init__(ui.Select(
+            placeholder=placeholder, min_values=1, max_values=1, options=options,
+            custom_id=player_list_id('pick', page, sort, query, server)
+        ))
+        self.server = server
+        
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Select, match):
+        # The chosen value arrives with the interaction; the options aren't needed
+        return cls([], int(match['page']), match['sort'], match['query'], match['server'])
+        
+    @timed_interaction('select_player')
+    async def callback(self, interaction: discord.Interaction):
+        """Open the management view for the chosen player."""
+        handler = _selection_handler(interaction)
+        if handler is None:
+            await interaction.response.send_message("❌ Economy commands are not loaded.", ephemeral=True)
+            return
+        await handler(interaction, self.item.values[0], server=self.server)
+
+
+class PlayerSearchButton(ui.DynamicItem[ui.Button], template=PLAYER_LIST_ID + SERVER_ID + r':search'):
+    """Search button of a persistent player list."""
+    
+    def __init__(self, server: Optional[str] = None):
+        super().__init__(ui.Button(
+            label="Search Player", style=discord.ButtonStyle.primary, emoji="🔍", row=4,
+            custom_id=f"{_list_prefix(server)}:search"
+        ))
+        self.server = server
+        
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['server'])
+        
+    @timed_interaction('select_search')
+    async def callback(self, interaction: discord.Interaction):
+        """Ask for a name to search the directory for."""
+        handler = _selection_handler(interaction)
+        if handler is None:
+            await interaction.response.send_message("❌ Economy commands are not loaded.", ephemeral=True)
+            return
+        backend = await _get_backend(interaction, self.server)
+        if backend is None:
+            return
+        await interaction.response.send_modal(PlayerSearchModal(
+            (), functools.partial(handler, server=self.server), backend.player_directory, server=self.server
+        ))
+
+
+# Leaderboard ranks per page
+LEADERBOARD_PAGE_SIZE = 20
+
+async def build_leaderboard(directory, currency: str, page: int = 0,
+                            server: Optional[str] = None) -> Tuple[discord.Embed, ui.View]:
+    """
+    Build one page of a currency leaderboard.
+    
+    Args:
+        directory: Shared PlayerDirectory
+        currency: 'gems' or 'coins'
+        page: Zero-based page (clamped to the ranks available)
+        server: Economy server the directory belongs to (None for the default one)
+        
+    Returns:
+        Tuple of (embed, persistent view with Previous/Next buttons)
+    """
+    board = await directory.get_leaderboard(currency)
+    pages = max(1, (len(board) - 1) // LEADERBOARD_PAGE_SIZE + 1)
+    page = max(0, min(page, pages - 1))
+    emoji = "💎" if currency == "gems" else "🪙"
+    
+    lines = []
+    for rank, player_uuid, balance in board.page(page * LEADERBOARD_PAGE_SIZE, LEADERBOARD_PAGE_SIZE):
+        player = directory.get_cached(player_uuid)
+        name = player.name if player else player_uuid
+        lines.append(f"`#{rank:>4}` **{discord.utils.escape_markdown(name)}** — {emoji} {balance:,.2f}")
+        
+    title = f"🏆 Top {currency.capitalize()}" + (f" on {server}" if server else "")
+    embed = discord.Embed(
+        title=title,
+        description="\n".join(lines) or "No players yet.",
+        color=discord.Color.gold()
+    )
+    embed.set_footer(text=f"Page {page + 1}/{pages} • Top {len(board)} players")
+    return embed, _leaderboard_view(currency, page, page + 1 < pages, server)
+
+async def build_network_leaderboard(backends, currency: str, page: int = 0) -> Tuple[discord.Embed, ui.View]:
+    """
+    Build one page of the leaderboard across every economy server.
+    
+    Each server's leaderboard is read concurrently and the rankings are
+    merged; servers that don't answer are listed in the footer.
+    
+    Args:
+        backends: BackendRegistry
+        currency: 'gems' or 'coins'
+        page: Zero-based page (clamped to the ranks available)
+        
+    Returns:
+        Tuple of (embed, persistent view with Previous/Next buttons)
+    """
+    # One entry past the page tells whether there is a next one
+    ranking, errors = await backends.top(currency, (page + 1) * LEADERBOARD_PAGE_SIZE + 1)
+    if page and len(ranking) <= page * LEADERBOARD_PAGE_SIZE:
+        page = max(0, (len(ranking) - 1) // LEADERBOARD_PAGE_SIZE)
+    start = page * LEADERBOARD_PAGE_SIZE
+    emoji = "💎" if currency == "gems" else "🪙"
+    
+    lines = []
+    for rank, (server, player_uuid, balance) in enumerate(ranking[start:start + LEADERBOARD_PAGE_SIZE], start + 1):
+        player = backends.get(server).player_directory.get_cached(player_uuid)
+        name = player.name if player else player_uuid
+        lines.append(f"`#{rank:>4}` **{discord.utils.escape_markdown(name)}** `{server}` — {emoji} {balance:,.2f}")
+        
+    embed = discord.Embed(
+        title=f"🏆 Top {currency.capitalize()} (all servers)",
+        description="\n".join(lines) or "No players yet.",
+        color=discord.Color.gold()
+    )
+    footer = f"Page {page + 1} • {len(backends) - len(errors)}/{len(backends)} servers"
+    if errors:
+        footer += f" • unavailable: {', '.join(errors)}"
+    embed.set_footer(text=footer)
+    return embed, _leaderboard_view(currency, page, len(ranking) > start + LEADERBOARD_PAGE_SIZE, ALL_SERVERS)
+
+def _leaderboard_view(currency: str, page: int, has_next: bool, server: Optional[str]) -> ui.View:
+    """Previous/Next buttons of a leaderboard page."""
+    view = ui.View(timeout=None)
+    if page > 0:
+        view.add_item(LeaderboardButton(currency, 'prev', page, server))
+    if has_next:
+        view.add_item(LeaderboardButton(currency, 'next', page, server))
+    return view
+
+
+class LeaderboardButton(ui.DynamicItem[ui.Button],
+                        template=r'economy:top(?:@(?P<server>[a-z0-9_-]{1,16}|\*))?'
+                        r':(?P<currency>gems|coins):(?P<action>prev|next):(?P<page>\d+)'):
+    """Previous/Next button of a persistent leaderboard message."""
+    
+    def __init__(self, currency: str, action: str, page: int, server: Optional[str] = None):
+        label, emoji = ("Previous", "⬅️") if action == 'prev' else ("Next", "➡️")
+        prefix = f"economy:top@{server}" if server else "economy:top"
+        super().__init__(ui.Button(
+            label=label, emoji=emoji, style=discord.ButtonStyle.secondary,
+            custom_id=f"{prefix}:{currency}:{action}:{page}"
+        ))
+        self.currency = currency
+        self.action = action
+        self.page = page
+        self.server = server
+        
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['currency'], match['action'], int(match['page']), match['server'])
+        
+    @timed_interaction('leaderboard_page')
+    async def callback(self, interaction: discord.Interaction):
+        """Show the neighbouring page."""
+        page = self.page + (1 if self.action == 'next' else -1)
+        if self.server == ALL_SERVERS:
+            embed, view = await build_network_leaderboard(interaction.client.backends, self.currency, page)
+        else:
+            backend = await _get_backend(interaction, self.server)
+            if backend is None:
+                return
+            embed, view = await build_leaderboard(backend.player_directory, self.currency, page, self.server)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+# Dynamic items registered at startup so player lists and leaderboards survive restarts
+PERSISTENT_ITEMS = (PlayerPageButton, PlayerPageSelect, PlayerSearchButton, LeaderboardButton)
+
+
 class EconomyManagementView(ui.View):
     """View with buttons for managing player economy."""
     
-    def __init__(self, player_name: str, player_data: dict, db_manager, bot=None, player_uuid: str = None):
+    def __init__(self, player_name: str, player_data: Player, db_manager, bot=None, player_uuid: str = None,
+                 backend=None):
         super().__init__(timeout=300)  # 5 minute timeout
         self.player_name = player_name
-        self.player_uuid = player_uuid or player_data.get('uuid', player_name)  # Fallback to name if no UUID
+        self.player_uuid = player_uuid or player_data.uuid or player_name  # Fallback to name if no UUID
         self.player_data = player_data
         self.db_manager = db_manager
         self.bot = bot  # Bot instance for logging
+        self.backend = backend  # Economy server the player belongs to (None for the default one)
         
     @ui.button(label="Add Gems", style=discord.ButtonStyle.success, emoji="💎")
+    @timed_interaction('manage_add_gems')
     async def add_gems_button(self, interaction: discord.Interaction, button: ui.Button):
         """Button to add gems."""
         modal = CurrencyModal(
@@ -149,11 +607,14 @@ class EconomyManagementView(ui.View):
             currency_type="gems",
             operation="add",
             db_manager=self.db_manager,
-            bot=self.bot
+            bot=self.bot,
+            player_uuid=self.player_uuid,
+            backend=self.backend
         )
         await interaction.response.send_modal(modal)
         
     @ui.button(label="Remove Gems", style=discord.ButtonStyle.danger, emoji="💎")
+    @timed_interaction('manage_remove_gems')
     async def remove_gems_button(self, interaction: discord.Interaction, button: ui.Button):
         """Button to remove gems."""
         modal = CurrencyModal(
@@ -162,11 +623,14 @@ class EconomyManagementView(ui.View):
             currency_type="gems",
             operation="remove",
             db_manager=self.db_manager,
-            bot=self.bot
+            bot=self.bot,
+            player_uuid=self.player_uuid,
+            backend=self.backend
         )
         await interaction.response.send_modal(modal)
         
     @ui.button(label="Add Coins", style=discord.ButtonStyle.success, emoji="🪙")
+    @timed_interaction('manage_add_coins')
     async def add_coins_button(self, interaction: discord.Interaction, button: ui.Button):
         """Button to add coins."""
         modal = CurrencyModal(
@@ -175,11 +639,14 @@ class EconomyManagementView(ui.View):
             currency_type="coins",
             operation="add",
             db_manager=self.db_manager,
-            bot=self.bot
+            bot=self.bot,
+            player_uuid=self.player_uuid,
+            backend=self.backend
         )
         await interaction.response.send_modal(modal)
         
     @ui.button(label="Remove Coins", style=discord.ButtonStyle.danger, emoji="🪙")
+    @timed_interaction('manage_remove_coins')
     async def remove_coins_button(self, interaction: discord.Interaction, button: ui.Button):
         """Button to remove coins."""
         modal = CurrencyModal(
@@ -188,19 +655,23 @@ class EconomyManagementView(ui.View):
             currency_type="coins",
             operation="remove",
             db_manager=self.db_manager,
-            bot=self.bot
+            bot=self.bot,
+            player_uuid=self.player_uuid,
+            backend=self.backend
         )
         await interaction.response.send_modal(modal)
         
     @ui.button(label="Refresh", style=discord.ButtonStyle.primary, emoji="🔄")
+    @timed_interaction('manage_refresh')
     async def refresh_button(self, interaction: discord.Interaction, button: ui.Button):
         """Button to refresh player data."""
-        # Fetch updated player data using UUID
-        player_data = await self.db_manager.get_player_balance(self.player_uuid)
+        # Fetch updated player data using UUID, from the primary so a change just confirmed shows up
+        player_data = await self.db_manager.get_player_by_uuid(self.player_uuid, **_table_kwarg(self.backend),
+                                                               fresh=True)
         
         if player_data:
             # Update player name in case it changed
-            self.player_name = player_data.get('name', self.player_name)
+            self.player_name = player_data.name or self.player_name
             embed = create_player_embed(self.player_name, player_data)
             await interaction.response.edit_message(embed=embed, view=self)
         else:
@@ -214,13 +685,15 @@ class CurrencyModal(ui.Modal):
     """Modal for inputting currency amount."""
     
     def __init__(self, title: str, player_name: str, currency_type: str, 
-                 operation: str, db_manager, bot=None):
+                 operation: str, db_manager, bot=None, player_uuid: str = None, backend=None):
         super().__init__(title=title)
         self.player_name = player_name
+        self.player_uuid = player_uuid
         self.currency_type = currency_type
         self.operation = operation
         self.db_manager = db_manager
         self.bot = bot  # Bot instance for logging
+        self.backend = backend  # Economy server the player belongs to
         
         # Add input field
         self.amount_input = ui.TextInput(
@@ -232,6 +705,7 @@ class CurrencyModal(ui.Modal):
         )
         self.add_item(self.amount_input)
         
+    @timed_interaction('currency_modal')
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission."""
         try:
@@ -252,7 +726,9 @@ class CurrencyModal(ui.Modal):
                 amount=amount,
                 operation=self.operation,
                 db_manager=self.db_manager,
-                bot=self.bot
+                bot=self.bot,
+                player_uuid=self.player_uuid,
+                backend=self.backend
             )
             
             emoji = "💎" if self.currency_type == "gems" else "🪙"
@@ -273,35 +749,82 @@ class CurrencyModal(ui.Modal):
             )
 
 
+def _table_kwarg(backend) -> dict:
+    """table_name argument for a backend's queries (none, keeping the default, without a backend)."""
+    return {'table_name': backend.table_name} if backend else {}
+
+def _directory(bot, backend):
+    """Player directory to invalidate after a change."""
+    if backend:
+        return backend.player_directory
+    return bot.player_directory if bot else None
+
+def _server_line(bot, backend) -> str:
+    """Log message line naming the server, when more than one is configured."""
+    if backend and bot and bot.backends and bot.backends.is_multi:
+        return f"**Server:** {backend.name}\n"
+    return ""
+
+
 class ConfirmationView(ui.View):
     """View for confirming currency transactions."""
     
     def __init__(self, player_name: str, currency_type: str, amount: int,
-                 operation: str, db_manager, bot=None):
+                 operation: str, db_manager, bot=None, player_uuid: str = None, source: str = 'manage',
+                 backend=None):
         super().__init__(timeout=60)
         self.player_name = player_name
+        self.player_uuid = player_uuid
+        self.source = source  # Recorded in the ledger
         self.currency_type = currency_type
         self.amount = amount
         self.operation = operation
         self.db_manager = db_manager
         self.bot = bot  # Bot instance for logging
+        self.backend = backend  # Economy server the player belongs to (None for the default one)
         
     @ui.button(label="Confirm", style=discord.ButtonStyle.success, emoji="✅")
+    @timed_interaction('currency_confirm')
     async def confirm_button(self, interaction: discord.Interaction, button: ui.Button):
         """Confirm the transaction."""
-        success, message = await self.db_manager.update_currency(
-            player_name=self.player_name,
-            currency_type=self.currency_type,
-            amount=self.amount,
-            operation=self.operation
-        )
-        
+        if self.player_uuid:
+            success, message = await self.db_manager.update_currency_by_uuid(
+                player_uuid=self.player_uuid,
+                currency_type=self.currency_type,
+                amount=self.amount,
+                operation=self.operation,
+                **_table_kwarg(self.backend),
+                admin_id=interaction.user.id,
+                source=self.source
+            )
+        else:
+            success, message = await self.db_manager.update_currency_by_name(
+                player_name=self.player_name,
+                currency_type=self.currency_type,
+                amount=self.amount,
+                operation=self.operation,
+                **_table_kwarg(self.backend),
+                admin_id=interaction.user.id,
+                source=self.source
+            )
+            
         if success:
             await interaction.response.edit_message(
                 content=f"✅ {message}",
                 view=None
             )
             
+            # Reload this player in the shared directory on its next read
+            directory = _directory(self.bot, self.backend)
+            if directory:
+                player_uuid = self.player_uuid
+                if not player_uuid:
+                    # Matched by name: the write pinned the player to the primary, so this sees it
+                    player = await self.db_manager.get_player_by_name(self.player_name, **_table_kwarg(self.backend))
+                    player_uuid = player.uuid if player else None
+                if player_uuid:
+                    directory.invalidate(player_uuid)
+                
             # Send log to log channel
             if self.bot:
                 emoji = "💎" if self.currency_type == "gems" else "🪙"
@@ -310,6 +833,7 @@ class ConfirmationView(ui.View):
                     f"{emoji} **Economy Update**\n"
                     f"**Action:** {action} {self.amount:.2f} {self.currency_type}\n"
                     f"**Player:** {self.player_name}\n"
+                    f"{_server_line(self.bot, self.backend)}"
                     f"**Admin:** {interaction.user.mention}\n"
                     f"**Time:** <t:{int(interaction.created_at.timestamp())}:F>"
                 )
@@ -325,6 +849,7 @@ class ConfirmationView(ui.View):
             item.disabled = True
             
     @ui.button(label="Cancel", style=discord.ButtonStyle.danger, emoji="❌")
+    @timed_interaction('currency_cancel')
     async def cancel_button(self, interaction: discord.Interaction, button: ui.Button):
         """Cancel the transaction."""
         await interaction.response.edit_message(
@@ -333,13 +858,192 @@ class ConfirmationView(ui.View):
         )
 
 
+class BulkConfirmationView(ui.View):
+    """View for confirming a bulk currency adjustment from a CSV file."""
+    
+    def __init__(self, rows: List[Tuple[str, str, float]], filename: str, db_manager,
+                 bot=None, table_name: str = 'coinsengine_users', backend=None):
+        super().__init__(timeout=120)
+        self.rows = rows
+        self.filename = filename
+        self.db_manager = db_manager
+        self.bot = bot  # Bot instance for logging
+        self.table_name = table_name
+        self.backend = backend  # Economy server the file applies to (None for the default one)
+        
+    @ui.button(label="Apply", style=discord.ButtonStyle.success, emoji="✅")
+    @timed_interaction('bulk_confirm')
+    async def confirm_button(self, interaction: discord.Interaction, button: ui.Button):
+        """Apply all rows in one transaction and reply with the per-row report."""
+        await interaction.response.edit_message(
+            content=f"⏳ Applying {len(self.rows)} adjustments from `{self.filename}`...",
+            view=None
+        )
+        
+        results = await self.db_manager.bulk_update_currency(self.rows, self.table_name,
+                                                             admin_id=interaction.user.id)
+        applied = [r for r in results if r['success']]
+        failed = len(results) - len(applied)
+        
+        report = discord.File(io.BytesIO(build_bulk_report(results)), filename="bulk_report.csv")
+        await interaction.edit_original_response(
+            content=(
+                f"{'✅' if not failed else '⚠️'} **Bulk Update Complete**\n"
+                f"Applied: **{len(applied)}** | Failed: **{failed}**\n"
+                f"Per-row results are attached."
+            ),
+            attachments=[report]
+        )
+        
+        if applied and self.bot:
+            # Reload changed players in the shared directory (batched on its next refresh)
+            directory = _directory(self.bot, self.backend)
+            if directory:
+                for player_uuid in {r['uuid'] for r in applied}:
+                    directory.invalidate(player_uuid)
+                        
+            totals = {'gems': 0.0, 'coins': 0.0}
+            for r in applied:
+                totals[r['currency']] += r['delta']
+            log_message = (
+                f"📦 **Bulk Economy Update**\n"
+                f"**File:** {self.filename}\n"
+                f"{_server_line(self.bot, self.backend)}"
+                f"**Rows:** {len(applied)} applied, {failed} failed\n"
+                f"**Net:** 💎 {totals['gems']:+,.2f} gems | 🪙 {totals['coins']:+,.2f} coins\n"
+                f"**Admin:** {interaction.user.mention}\n"
+                f"**Time:** <t:{int(interaction.created_at.timestamp())}:F>"
+            )
+            await self.bot.send_log(log_message)
+            
+    @ui.button(label="Cancel", style=discord.ButtonStyle.danger, emoji="❌")
+    @timed_interaction('bulk_cancel')
+    async def cancel_button(self, interaction: discord.Interaction, button: ui.Button):
+        """Cancel the bulk update."""
+        await interaction.response.edit_message(
+            content="❌ Bulk update cancelled.",
+            view=None
+        )
+
+
+def upload_limit(interaction: discord.Interaction) -> int:
+    """Largest attachment the bot may send in the interaction's channel."""
+    return interaction.guild.filesize_limit if interaction.guild else DEFAULT_UPLOAD_LIMIT
+
+def restore_message(report: RestoreReport, snapshot: str, server: Optional[str] = None) -> str:
+    """
+    Summary of a restore or dry run.
+    
+    Args:
+        report: Result of restore_snapshot
+        snapshot: Snapshot file name
+        server: Economy server name to show, if any
+        
+    Returns:
+        Message text
+    """
+    if report.apply:
+        title = "⚠️ **Restore Stopped**" if report.error else "✅ **Restore Complete**"
+    else:
+        title = "🔍 **Restore Preview** (dry run, nothing changed)"
+    lines = [title, f"📄 Snapshot: `{snapshot}`"]
+    if server:
+        lines.append(f"🖥️ Server: **{server}**")
+    lines.append(f"📊 Rows: {report.rows:,} | {'Restored' if report.apply else 'To restore'}: **{report.changed:,}** | "
+                 f"Unchanged: {report.unchanged:,} | Not in table: {report.missing:,}"
+                 + (f" | Duplicates: {report.duplicates:,}" if report.duplicates else ""))
+    lines.append(f"**Net change:** 💎 {report.net['gems']:+,.2f} gems | 🪙 {report.net['coins']:+,.2f} coins")
+    largest = report.largest_changes()
+    if largest:
+        lines.append("**Largest changes:**")
+        lines.extend(
+            f"• `{player_uuid}` 💎 {gems_before:,.2f} → {gems_after:,.2f} | 🪙 {coins_before:,.2f} → {coins_after:,.2f}"
+            for player_uuid, gems_before, coins_before, gems_after, coins_after in largest[:5]
+        )
+    if report.invalid:
+        lines.append(f"**Skipped {report.invalid:,} invalid line(s):** " + "; ".join(report.errors[:3]))
+    if report.error:
+        lines.append(f"❌ Stopped after {report.chunks} chunk(s): {report.error}. "
+                     f"Earlier chunks stay applied; running the restore again only writes what still differs.")
+    return "\n".join(lines)[:2000]
+
+def _diff_attachment(interaction: discord.Interaction, path: Path) -> Tuple[List[discord.File], str]:
+    """The diff file as an attachment when it fits, otherwise a note with its location."""
+    if path.stat().st_size <= upload_limit(interaction):
+        return [discord.File(path)], "Every change is listed in the attached diff."
+    return [], f"Every change is listed in `{path}` on the bot host."
+
+class RestoreConfirmationView(ui.View):
+    """View for applying a snapshot restore after its dry run."""
+    
+    def __init__(self, snapshot: Path, export_dir: str, db_manager, bot=None,
+                 table_name: str = 'coinsengine_users', backend=None):
+        super().__init__(timeout=300)
+        self.snapshot = snapshot
+        self.export_dir = Path(export_dir)  # Where the diff of the applied restore is written
+        self.db_manager = db_manager
+        self.bot = bot  # Bot instance for logging
+        self.table_name = table_name
+        self.backend = backend  # Economy server the snapshot is restored to (None for the default one)
+        
+    @ui.button(label="Restore", style=discord.ButtonStyle.danger, emoji="♻️")
+    @timed_interaction('restore_confirm')
+    async def confirm_button(self, interaction: discord.Interaction, button: ui.Button):
+        """Apply the snapshot chunk by chunk and reply with the report and diff."""
+        await interaction.response.edit_message(
+            content=f"⏳ Restoring balances from `{self.snapshot.name}`...",
+            view=None,
+            attachments=[]
+        )
+        
+        server = self.backend.name if self.backend else 'main'
+        diff_path = self.export_dir / f"restore_{server}_{time.strftime('%Y%m%d_%H%M%S', time.gmtime())}.csv.gz"
+        report = await restore_snapshot(self.db_manager, self.snapshot, self.table_name, apply=True,
+                                        diff_path=diff_path, admin_id=interaction.user.id)
+        files, note = _diff_attachment(interaction, diff_path)
+        show_server = self.backend.name if self.backend and self.bot and self.bot.backends.is_multi else None
+        await interaction.edit_original_response(
+            content=f"{restore_message(report, self.snapshot.name, show_server)}\n{note}",
+            attachments=files
+        )
+        
+        if report.changed and self.bot:
+            directory = _directory(self.bot, self.backend)
+            if directory:
+                directory.invalidate()
+            log_message = (
+                f"♻️ **Economy Restore**\n"
+                f"**Snapshot:** {self.snapshot.name}\n"
+                f"{_server_line(self.bot, self.backend)}"
+                f"**Players:** {report.changed:,} restored{' (stopped early)' if report.error else ''}\n"
+                f"**Net:** 💎 {report.net['gems']:+,.2f} gems | 🪙 {report.net['coins']:+,.2f} coins\n"
+                f"**Diff:** `{diff_path}`\n"
+                f"**Admin:** {interaction.user.mention}\n"
+                f"**Time:** <t:{int(interaction.created_at.timestamp())}:F>"
+            )
+            await self.bot.send_log(log_message)
+            
+    @ui.button(label="Cancel", style=discord.ButtonStyle.secondary, emoji="❌")
+    @timed_interaction('restore_cancel')
+    async def cancel_button(self, interaction: discord.Interaction, button: ui.Button):
+        """Cancel the restore."""
+        await interaction.response.edit_message(
+            content="❌ Restore cancelled.",
+            view=None,
+            attachments=[]
+        )
+
+
 class PlayerSearchModal(ui.Modal):
     """Modal for searching players by name with fuzzy matching."""
     
-    def __init__(self, all_players: List[dict], callback: Callable):
+    def __init__(self, all_players: Sequence[Player], callback: Callable, directory=None,
+                 server: Optional[str] = None):
         super().__init__(title="Search Player")
         self.all_players = all_players
         self.callback_func = callback
+        self.directory = directory  # Search the whole directory rather than the current list
+        self.server = server  # Economy server the directory belongs to
         
         # Add search input field
         self.search_input = ui.TextInput(
@@ -350,44 +1054,36 @@ class PlayerSearchModal(ui.Modal):
             max_length=50
         )
         self.add_item(self.search_input)
-    
+        
     def fuzzy_match_score(self, search_term: str, player_name: str) -> float:
         """
         Calculate fuzzy match score between search term and player name.
         Returns a score between 0 and 1, where 1 is perfect match.
         """
-        search_lower = search_term.lower()
-        name_lower = player_name.lower()
-        
-        # Exact match gets highest score
-        if search_lower == name_lower:
-            return 1.0
-        
-        # Contains gets high score
-        if search_lower in name_lower:
-            return 0.9
+        return fuzzy_match_score(search_term, player_name)
         
-        # Use SequenceMatcher for fuzzy matching
-        return SequenceMatcher(None, search_lower, name_lower).ratio()
-    
+    @timed_interaction('search_modal')
     async def on_submit(self, interaction: discord.Interaction):
         """Handle search submission with fuzzy matching."""
         await interaction.response.defer()
         
         search_term = self.search_input.value.strip()
         
-        # Calculate fuzzy match scores for all players
-        scored_players = []
-        for player in self.all_players:
-            player_name = player.get('name', '')
-            score = self.fuzzy_match_score(search_term, player_name)
-            
-            # Only include players with score > 0.4 (40% similarity)
-            if score > 0.4:
-                scored_players.append((score, player))
-        
-        # Sort by score (highest first)
-        scored_players.sort(key=lambda x: x[0], reverse=True)
+        if self.directory:
+            # Indexed search over the shared directory (already sorted by score)
+            scored_players = await self.directory.search(search_term, limit=SEARCH_RESULT_LIMIT)
+        else:
+            # Calculate fuzzy match scores for all players
+            scored_players = []
+            for player in self.all_players:
+                score = self.fuzzy_match_score(search_term, player.name)
+                
+                # Only include players with score > 0.4 (40% similarity)
+                if score > MATCH_THRESHOLD:
+                    scored_players.append((score, player))
+                    
+            # Sort by score (highest first)
+            scored_players.sort(key=lambda x: x[0], reverse=True)
         matches = [player for score, player in scored_players]
         
         if not matches:
@@ -396,23 +1092,28 @@ class PlayerSearchModal(ui.Modal):
                 ephemeral=True
             )
             return
-        
+            
         if len(matches) == 1:
             # Only one match, directly select it
-            player_uuid = matches[0].get('uuid')
+            player_uuid = matches[0].uuid
             await self.callback_func(interaction, player_uuid)
+        elif self.directory:
+            # Persistent list that re-runs the search on every page
+            view, content = await PlayerListView.build(self.directory, query=search_term, server=self.server)
+            await interaction.followup.send(content, view=view, ephemeral=True)
         else:
             # Multiple matches, show dropdown with results (sorted by relevance)
-            view = PlayerSelectView(matches, self.callback_func)
+            view = PlayerSelectView(matches, self.callback_func, directory=self.directory)
             
             # Show top 5 match names as preview
-            preview_names = [m.get('name', 'Unknown') for m in matches[:5]]
+            preview_names = [m.name or 'Unknown' for m in matches[:5]]
             preview_text = "\n".join([f"• {name}" for name in preview_names])
             if len(matches) > 5:
                 preview_text += f"\n• ... and {len(matches) - 5} more"
-            
+                
+            found = f"{len(matches)}+" if len(matches) >= SEARCH_RESULT_LIMIT else str(len(matches))
             await interaction.followup.send(
-                f"**Search Results** ({len(matches)} players found)\n"
+                f"**Search Results** ({found} players found)\n"
                 f"Results sorted by relevance:\n{preview_text}\n\n"
                 f"Select a player from the dropdown:",
                 view=view,
@@ -420,20 +1121,20 @@ class PlayerSearchModal(ui.Modal):
             )
 
 
-def create_player_embed(player_name: str, player_data: dict) -> discord.Embed:
+def create_player_embed(player_name: str, player_data: Player) -> discord.Embed:
     """
     Create an embed displaying player economy information.
     
     Args:
         player_name: Player name
-        player_data: Dictionary with player data
+        player_data: Player record
         
     Returns:
         Discord Embed object
     """
-    gems = float(player_data.get('gems', 0))
-    coins = float(player_data.get('coins', 0))
-    uuid = player_data.get('uuid', 'N/A')
+    gems = player_data.gems
+    coins = player_data.coins
+    uuid = player_data.uuid or 'N/A'
     
     embed = discord.Embed(
         title=f"💰 Economy Manager",
@@ -0,0 +1,130 @@
+"""
+Economy Analytics for Economy Manager Bot
+Version: 0.5.0
+Vectorized supply, distribution and activity statistics over the player table
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from bot.utils.leaderboard import CURRENCIES
+
+# Percentiles reported per currency
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+# Days since last online splitting players into activity groups (the last group is open-ended)
+ACTIVITY_DAYS = (7, 30, 90)
+
+DAY_MS = 86_400_000
+
+def _percentile(ordered: np.ndarray, q: float) -> float:
+    """Linear-interpolated percentile of an already sorted array (like numpy's default)."""
+    position = (ordered.size - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, ordered.size - 1)
+    return float(ordered[low] + (ordered[high] - ordered[low]) * (position - low))
+
+def currency_stats(values: np.ndarray) -> dict:
+    """
+    Distribution statistics for one currency.
+    
+    Args:
+        values: Balance of every player
+        
+    Returns:
+        Dict with total, mean, median, percentiles, gini, top1_share and
+        histogram (list of (label, players) from zero balances up in powers of ten)
+    """
+    count = values.size
+    if not count:
+        return {'total': 0.0, 'mean': 0.0, 'median': 0.0, 'percentiles': {p: 0.0 for p in PERCENTILES},
+                'gini': 0.0, 'top1_share': 0.0, 'histogram': []}
+                
+    ordered = np.sort(values)
+    total = float(ordered.sum())
+    # Gini from the sorted values: sum((2i - n - 1) * x_i) / (n * total), i = 1..n
+    ranks = np.arange(1, count + 1, dtype=np.float64)
+    gini = float(np.dot(2 * ranks - count - 1, ordered) / (count * total)) if total > 0 else 0.0
+    top = max(1, math.ceil(count / 100))
+    top1_share = float(ordered[-top:].sum() / total) if total > 0 else 0.0
+    
+    zeros = int(np.searchsorted(ordered, 0, side='right'))
+    histogram = [("0", zeros)]
+    positive = ordered[zeros:]
+    if positive.size:
+        decades = max(1, math.ceil(math.log10(max(float(positive[-1]), 1.0) + 1)))
+        edges = np.concatenate(([0.0], 10.0 ** np.arange(1, decades + 1)))
+        counts, _ = np.histogram(positive, bins=edges)
+        histogram += [(f"{_short(edges[i])}–{_short(edges[i + 1])}", int(n)) for i, n in enumerate(counts)]
+        
+    return {
+        'total': total,
+        'mean': total / count,
+        'median': _percentile(ordered, 50),
+        'percentiles': {p: _percentile(ordered, p) for p in PERCENTILES},
+        'gini': gini,
+        'top1_share': top1_share,
+        'histogram': histogram,
+    }
+
+def activity_split(last_online: np.ndarray, balances: Dict[str, np.ndarray], now_ms: int) -> List[dict]:
+    """
+    Players and wealth per activity group.
+    
+    Args:
+        last_online: Last online time per player (ms since the epoch, 0 if never)
+        balances: Balance arrays per currency, aligned with last_online
+        now_ms: Current time in ms since the epoch
+        
+    Returns:
+        One dict per group: label, players and the summed balance per currency
+    """
+    age_days = (now_ms - last_online) / DAY_MS
+    groups = np.digitize(age_days, ACTIVITY_DAYS)
+    slots = len(ACTIVITY_DAYS) + 1
+    players = np.bincount(groups, minlength=slots)
+    sums = {c: np.bincount(groups, weights=v, minlength=slots) for c, v in balances.items()}
+    
+    labels = [f"< {ACTIVITY_DAYS[0]}d"]
+    labels += [f"{a}–{b}d" for a, b in zip(ACTIVITY_DAYS, ACTIVITY_DAYS[1:])]
+    labels.append(f"{ACTIVITY_DAYS[-1]}d+")
+    return [
+        {'label': label, 'players': int(players[i]), **{c: float(sums[c][i]) for c in balances}}
+        for i, label in enumerate(labels)
+    ]
+
+def compute_economy_stats(table, now_ms: Optional[int] = None) -> dict:
+    """
+    Compute economy statistics from the directory's columnar snapshot.
+    
+    The typed-array columns are copied into NumPy arrays (a memcpy each) and
+    everything after that is vectorized; no per-player Python objects are
+    created. Runs off the event loop.
+    
+    Args:
+        table: PlayerTable snapshot
+        now_ms: Reference time for the activity split (defaults to now)
+        
+    Returns:
+        Dict with players, currencies (per-currency stats), activity and elapsed_ms
+    """
+    started = time.perf_counter()
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    balances = {c: np.array(getattr(table, c), dtype=np.float64) for c in CURRENCIES}
+    last_online = np.array(table.last_online, dtype=np.int64)
+    return {
+        'players': len(table),
+        'currencies': {c: currency_stats(values) for c, values in balances.items()},
+        'activity': activity_split(last_online, balances, now_ms),
+        'elapsed_ms': (time.perf_counter() - started) * 1000,
+    }
+
+def _short(value: float) -> str:
+    """Compact number for histogram labels (10k, 1M)."""
+    for divisor, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'k')):
+        if value >= divisor:
+            return f"{value / divisor:g}{suffix}"
+    return f"{value:g}"
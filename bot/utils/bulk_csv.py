@@ -0,0 +1,107 @@
+"""
+Bulk CSV helpers for Economy Manager Bot
+Version: 0.5.0
+Parses bulk currency adjustment files and builds result reports
+"""
+
+import csv
+import io
+from typing import Dict, List, Tuple
+
+# Accepted header names for each column
+PLAYER_COLUMNS = ('player', 'uuid', 'name')
+CURRENCY_COLUMNS = ('currency', 'currency_type')
+DELTA_COLUMNS = ('delta', 'amount')
+
+def parse_bulk_csv(data: bytes) -> Tuple[List[Tuple[str, str, float]], List[str]]:
+    """
+    Parse a bulk adjustment CSV.
+    
+    Columns are player (name or UUID), currency ('gems' or 'coins') and a
+    signed delta. A header row is optional; when present the columns may be
+    in any order.
+    
+    Args:
+        data: Raw file contents (UTF-8, optional BOM)
+        
+    Returns:
+        Tuple of (rows, errors) where errors are human-readable line messages
+    """
+    text = data.decode('utf-8-sig')
+    reader = csv.reader(io.StringIO(text))
+    rows: List[Tuple[str, str, float]] = []
+    errors: List[str] = []
+    order = (0, 1, 2)
+    
+    for line_number, record in enumerate(reader, start=1):
+        if not record or all(not field.strip() for field in record):
+            continue
+        fields = [field.strip() for field in record]
+        
+        if line_number == 1 and not _is_number(fields[-1]):
+            header = [field.lower() for field in fields]
+            try:
+                order = (
+                    _find_column(header, PLAYER_COLUMNS),
+                    _find_column(header, CURRENCY_COLUMNS),
+                    _find_column(header, DELTA_COLUMNS),
+                )
+            except ValueError as e:
+                errors.append(f"Line 1: {e}")
+                break
+            continue
+            
+        if len(fields) <= max(order):
+            errors.append(f"Line {line_number}: expected 3 columns, got {len(fields)}")
+            continue
+        player, currency, delta = (fields[i] for i in order)
+        if not player:
+            errors.append(f"Line {line_number}: missing player")
+            continue
+        if not _is_number(delta):
+            errors.append(f"Line {line_number}: invalid delta '{delta}'")
+            continue
+        rows.append((player, currency.lower(), float(delta)))
+        
+    return rows, errors
+
+def build_bulk_report(results: List[Dict[str, any]]) -> bytes:
+    """
+    Build a CSV report with one line per bulk adjustment result.
+    
+    Args:
+        results: Rows returned by DatabaseManager.bulk_update_currency
+        
+    Returns:
+        UTF-8 encoded CSV
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['row', 'player', 'uuid', 'currency', 'delta', 'status', 'new_balance', 'message'])
+    for result in results:
+        writer.writerow([
+            result['row'],
+            result['player'],
+            result['uuid'] or '',
+            result['currency'],
+            result['delta'],
+            'ok' if result['success'] else 'failed',
+            '' if result['new_balance'] is None else f"{result['new_balance']:.2f}",
+            result['message'],
+        ])
+    return output.getvalue().encode('utf-8')
+
+def _find_column(header: List[str], names: Tuple[str, ...]) -> int:
+    """Index of the first header matching one of the names."""
+    for name in names:
+        if name in header:
+            return header.index(name)
+    raise ValueError(f"missing column, expected one of: {', '.join(names)}")
+
+def _is_number(value: str) -> bool:
+    """Whether a string parses as a finite float."""
+    try:
+        number = float(value)
+    except ValueError:
+        return False
+    return number == number and number not in (float('inf'), float('-inf'))
@@ -0,0 +1,86 @@
+"""
+Command Sync for Economy Manager Bot
+Version: 0.5.0
+Syncs the application command tree only when its definition changed
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger('economy_bot')
+
+def command_tree_fingerprint(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """
+    Hash of the command payloads a sync would upload.
+    
+    Names, descriptions, options, choices, permissions and localizations are
+    all part of the payload, so any change that needs a sync changes the hash.
+    
+    Args:
+        tree: Command tree
+        guild: Guild scope, or None for global commands
+        
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda command: (command.get('type', 1), command['name']))
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def _load_state(path: Path) -> Dict[str, str]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable command sync state {path}: {e}")
+        return {}
+
+def _save_state(path: Path, state: Dict[str, str]):
+    """Write the state file atomically, so a crash can't leave half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + '.tmp')
+    temporary.write_text(json.dumps(state, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporary, path)
+
+async def sync_command_tree(tree: app_commands.CommandTree, state_file: str,
+                            guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> Optional[int]:
+    """
+    Sync the command tree unless it matches the last successful sync.
+    
+    The fingerprint of each synced scope (application and guild) is stored
+    in `state_file`; restarts and reconnects with unchanged commands skip
+    the sync request and its rate limit entirely.
+    
+    Args:
+        tree: Command tree (guild commands must already be copied in)
+        state_file: JSON file holding the last synced fingerprints
+        guild: Guild to sync to, or None for a global sync
+        force: Sync even if the fingerprint is unchanged
+        
+    Returns:
+        Number of commands synced, or None if the sync was skipped
+    """
+    scope = f"{tree.client.application_id}:{guild.id if guild else 'global'}"
+    path = Path(state_file)
+    state = _load_state(path)
+    fingerprint = command_tree_fingerprint(tree, guild)
+    if not force and state.get(scope) == fingerprint:
+        logger.info(f"Command tree unchanged ({fingerprint[:12]}), skipping sync")
+        return None
+        
+    synced = await tree.sync(guild=guild)
+    state[scope] = fingerprint
+    try:
+        _save_state(path, state)
+    except OSError as e:
+        logger.warning(f"Could not save command sync state to {path}: {e}")
+    return len(synced)
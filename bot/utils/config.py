@@ -4,40 +4,166 @@ Version: 0.1.0
 """
 
 import os
-from typing import Optional
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Allowed economy server names (they appear in commands and persistent component ids)
+SERVER_NAME_PATTERN = re.compile(r'^[a-z0-9_-]{1,16}$')
+
+def parse_endpoints(value: str, default_port: int = 3306) -> List[Tuple[str, int]]:
+    """
+    Parse a comma-separated list of host[:port] endpoints.
+    
+    Args:
+        value: e.g. "db-replica-1,db-replica-2:3307"
+        default_port: Port for entries without one
+        
+    Returns:
+        List of (host, port) tuples
+    """
+    endpoints = []
+    for entry in value.split(','):
+        host, _, port = entry.strip().partition(':')
+        if host:
+            endpoints.append((host, int(port) if port else default_port))
+    return endpoints
 
 class Config:
     """Bot configuration loaded from environment variables."""
     
-    def __init__(self):
+    def __init__(self, validate: bool = True):
         # Database Configuration
         self.DB_HOST: str = os.getenv('DB_HOST', 'localhost')
         self.DB_PORT: int = int(os.getenv('DB_PORT', '3306'))
         self.DB_USER: str = os.getenv('DB_USER', '')
         self.DB_PASSWORD: str = os.getenv('DB_PASSWORD', '')
         self.DB_NAME: str = os.getenv('DB_NAME', 'coinsengine_shared')
+        self.DB_MAX_WORKERS: Optional[int] = self._get_optional_int('DB_MAX_WORKERS')
+        self.DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
+        self.DB_POOL_MAX_OVERFLOW: int = int(os.getenv('DB_POOL_MAX_OVERFLOW', '0'))
+        self.DB_POOL_TIMEOUT: float = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+        self.DB_POOL_RECYCLE: float = float(os.getenv('DB_POOL_RECYCLE', '3600'))
+        self.DB_POOL_PRE_PING: bool = self._get_bool('DB_POOL_PRE_PING', True)
+        self.DB_CONNECT_TIMEOUT: int = int(os.getenv('DB_CONNECT_TIMEOUT', '10'))
+        self.DB_CREATE_INDEXES: bool = self._get_bool('DB_CREATE_INDEXES', False)
+        # Admission control: queued operations per pool before new ones are shed (0 never sheds),
+        # and connections full-table reads and bulk updates may use at once (default: all but one)
+        self.DB_MAX_QUEUE: int = int(os.getenv('DB_MAX_QUEUE', '100'))
+        self.DB_BULK_CONCURRENCY: Optional[int] = self._get_optional_int('DB_BULK_CONCURRENCY')
+        
+        # Read replicas (host[:port], comma-separated) serving the bot's read-only queries
+        self.DB_REPLICAS: List[Tuple[str, int]] = parse_endpoints(os.getenv('DB_REPLICAS', ''))
+        self.DB_REPLICA_MAX_LAG: float = float(os.getenv('DB_REPLICA_MAX_LAG', '5'))
+        self.DB_REPLICA_CHECK_INTERVAL: float = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '5'))
         
         # Discord Configuration
         self.DISCORD_TOKEN: str = os.getenv('DISCORD_TOKEN', '')
         self.GUILD_ID: Optional[int] = self._get_optional_int('GUILD_ID')
         
+        # Slash commands are synced only when they differ from the fingerprint saved here
+        self.COMMAND_SYNC_STATE_FILE: str = os.getenv('COMMAND_SYNC_STATE_FILE', 'data/command_sync.json')
+        self.COMMAND_SYNC_FORCE: bool = self._get_bool('COMMAND_SYNC_FORCE', False)
+        
         # Optional Configuration
         self.TABLE_NAME: str = os.getenv('TABLE_NAME', 'coinsengine_users')
         self.ADMIN_ROLE_ID: Optional[int] = self._get_optional_int('ADMIN_ROLE_ID')
         self.LOG_CHANNEL_ID: Optional[int] = self._get_optional_int('LOG_CHANNEL_ID')
+        self.LOG_CHANNEL_QUEUE_SIZE: int = int(os.getenv('LOG_CHANNEL_QUEUE_SIZE', '1000'))
+        self.LOG_CHANNEL_FLUSH_INTERVAL: float = float(os.getenv('LOG_CHANNEL_FLUSH_INTERVAL', '2'))
+        
+        # Economy servers: one database per Minecraft server, configured with
+        # SERVER_<NAME>_DB_HOST etc.; empty means a single server named 'main' using DB_*
+        self.ECONOMY_SERVERS: List[str] = [
+            name.strip().lower() for name in os.getenv('ECONOMY_SERVERS', '').split(',') if name.strip()
+        ] or ['main']
+        self.SERVER_QUERY_TIMEOUT: float = float(os.getenv('SERVER_QUERY_TIMEOUT', '10'))
+        
+        # Transaction ledger (append-only history of balance changes)
+        self.LEDGER_ENABLED: bool = self._get_bool('LEDGER_ENABLED', True)
+        self.LEDGER_TABLE: str = os.getenv('LEDGER_TABLE', 'economy_ledger')
+        self.LEDGER_FLUSH_INTERVAL: float = float(os.getenv('LEDGER_FLUSH_INTERVAL', '1'))
+        self.LEDGER_BATCH_SIZE: int = int(os.getenv('LEDGER_BATCH_SIZE', '500'))
+        self.LEDGER_QUEUE_SIZE: int = int(os.getenv('LEDGER_QUEUE_SIZE', '10000'))
+        
+        # Player Directory Cache (seconds)
+        self.PLAYER_CACHE_TTL: float = float(os.getenv('PLAYER_CACHE_TTL', '900'))
+        self.PLAYER_CACHE_REFRESH: float = float(os.getenv('PLAYER_CACHE_REFRESH', '30'))
+        
+        # Balance watcher: polls for changes made outside the bot and alerts on unusual ones.
+        # Absolute thresholds (0 disables) and a robust z-score over recent changes (0 disables)
+        self.WATCH_ENABLED: bool = self._get_bool('WATCH_ENABLED', True)
+        self.WATCH_INTERVAL: float = float(os.getenv('WATCH_INTERVAL', '60'))
+        self.WATCH_ALERT_GEMS: float = float(os.getenv('WATCH_ALERT_GEMS', '0'))
+        self.WATCH_ALERT_COINS: float = float(os.getenv('WATCH_ALERT_COINS', '0'))
+        self.WATCH_ZSCORE: float = float(os.getenv('WATCH_ZSCORE', '10'))
+        self.WATCH_SCAN_ROWS: int = int(os.getenv('WATCH_SCAN_ROWS', '200000'))
+        
+        # Ranks kept per currency for /leaderboard
+        self.LEADERBOARD_SIZE: int = int(os.getenv('LEADERBOARD_SIZE', '1000'))
+        
+        # /export snapshots too large to upload are kept here
+        self.EXPORT_DIR: str = os.getenv('EXPORT_DIR', 'exports')
+        
+        # Player list pagination: 'cache' (player directory) or 'keyset' (fetch each page from the database)
+        self.PAGINATION_MODE: str = os.getenv('PAGINATION_MODE', 'cache').lower()
         
         # Logging
         self.LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
         self.LOG_FILE: str = os.getenv('LOG_FILE', 'logs/bot.log')
+        self.LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'text').lower()  # 'text' or 'json'
+        self.LOG_QUEUE: bool = self._get_bool('LOG_QUEUE', True)
+        self.LOG_MAX_BYTES: int = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+        self.LOG_BACKUP_COUNT: int = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+        self.LOG_ROTATE_WHEN: Optional[str] = os.getenv('LOG_ROTATE_WHEN') or None
         
-        # Validate required configuration
-        self._validate()
+        # Metrics endpoint (Prometheus text format, disabled without a port)
+        self.METRICS_PORT: Optional[int] = self._get_optional_int('METRICS_PORT')
+        self.METRICS_HOST: str = os.getenv('METRICS_HOST', '127.0.0.1')
         
+        # Validate required configuration
+        if validate:
+            self._validate()
+            
     def _get_optional_int(self, key: str) -> Optional[int]:
         """Get optional integer from environment."""
         value = os.getenv(key)
         return int(value) if value else None
         
+    def _get_bool(self, key: str, default: bool) -> bool:
+        """Get boolean from environment (true/false, yes/no, 1/0)."""
+        value = os.getenv(key)
+        if not value:
+            return default
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+        
+    def server_settings(self, name: str) -> Dict[str, object]:
+        """
+        Connection settings for one economy server.
+        
+        Each value is read from SERVER_<NAME>_<KEY> and falls back to the
+        top-level setting, so servers sharing a host only override DB_NAME.
+        
+        Args:
+            name: Server name from ECONOMY_SERVERS
+            
+        Returns:
+            Dict with host, port, user, password, database, replicas and table_name
+        """
+        prefix = f"SERVER_{name.upper().replace('-', '_')}_"
+        
+        def get(key: str, default):
+            return os.getenv(prefix + key) or default
+            
+        return {
+            'host': get('DB_HOST', self.DB_HOST),
+            'port': int(get('DB_PORT', self.DB_PORT)),
+            'user': get('DB_USER', self.DB_USER),
+            'password': get('DB_PASSWORD', self.DB_PASSWORD),
+            'database': get('DB_NAME', self.DB_NAME),
+            'replicas': parse_endpoints(get('DB_REPLICAS', '')) or self.DB_REPLICAS,
+            'table_name': get('TABLE_NAME', self.TABLE_NAME),
+        }
+        
     def _validate(self):
         """Validate required configuration values."""
         if not self.DISCORD_TOKEN:
@@ -46,3 +172,28 @@ class Config:
             raise ValueError("DB_USER is required in .env file")
         if not self.DB_PASSWORD:
             raise ValueError("DB_PASSWORD is required in .env file")
+        if self.DB_POOL_SIZE < 1 or self.DB_POOL_MAX_OVERFLOW < 0:
+            raise ValueError("DB_POOL_SIZE must be at least 1 and DB_POOL_MAX_OVERFLOW at least 0")
+        if self.LEADERBOARD_SIZE < 1:
+            raise ValueError("LEADERBOARD_SIZE must be at least 1")
+        if self.LEDGER_BATCH_SIZE < 1:
+            raise ValueError("LEDGER_BATCH_SIZE must be at least 1")
+        for name in self.ECONOMY_SERVERS:
+            if not SERVER_NAME_PATTERN.match(name):
+                raise ValueError(f"Invalid economy server name '{name}' (use up to 16 of a-z, 0-9, _ and -)")
+        if len(set(self.ECONOMY_SERVERS)) != len(self.ECONOMY_SERVERS):
+            raise ValueError("ECONOMY_SERVERS contains duplicate names")
+        if self.DB_REPLICA_MAX_LAG < 0:
+            raise ValueError("DB_REPLICA_MAX_LAG must not be negative")
+        if self.DB_MAX_QUEUE < 0:
+            raise ValueError("DB_MAX_QUEUE must not be negative")
+        if self.DB_BULK_CONCURRENCY is not None and self.DB_BULK_CONCURRENCY < 1:
+            raise ValueError("DB_BULK_CONCURRENCY must be at least 1")
+        if self.WATCH_INTERVAL <= 0:
+            raise ValueError("WATCH_INTERVAL must be positive")
+        if min(self.WATCH_ALERT_GEMS, self.WATCH_ALERT_COINS, self.WATCH_ZSCORE) < 0:
+            raise ValueError("WATCH_ALERT_GEMS, WATCH_ALERT_COINS and WATCH_ZSCORE must not be negative")
+        if self.WATCH_SCAN_ROWS < 0:
+            raise ValueError("WATCH_SCAN_ROWS must not be negative")
+        if self.PAGINATION_MODE not in ('cache', 'keyset'):
+            raise ValueError("PAGINATION_MODE must be 'cache' or 'keyset'")
@@ -0,0 +1,91 @@
+"""
+Economy Export for Economy Manager Bot
+Version: 0.5.0
+Streams the players table into gzip-compressed CSV or JSONL snapshots
+"""
+
+import asyncio
+import csv
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from bot.database.db_manager import FETCH_BATCH_SIZE
+from bot.database.models import PLAYER_COLUMNS, Player
+
+# Supported snapshot formats
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+def export_filename(server: str, fmt: str, timestamp: Optional[float] = None) -> str:
+    """
+    File name for a snapshot, e.g. economy_main_20250101_120000.csv.gz.
+    
+    Args:
+        server: Economy server name
+        fmt: 'csv' or 'jsonl'
+        timestamp: Unix time of the snapshot (defaults to now)
+        
+    Returns:
+        File name
+    """
+    stamp = time.strftime('%Y%m%d_%H%M%S', time.gmtime(timestamp))
+    return f"economy_{server}_{stamp}.{fmt}.gz"
+
+def _batch_writer(handle, fmt: str) -> Callable[[List[Player]], None]:
+    """Writer appending one batch of players to an open text file."""
+    if fmt == 'csv':
+        writer = csv.writer(handle)
+        writer.writerow(PLAYER_COLUMNS)
+        return lambda batch: writer.writerows(
+            (p.id, p.uuid, p.name, p.gems, p.coins, p.last_online) for p in batch
+        )
+    return lambda batch: handle.write(
+        ''.join(json.dumps(p.to_dict(), separators=(',', ':')) + '\n' for p in batch)
+    )
+
+async def export_players(db_manager, path: Path, fmt: str = 'csv', table_name: str = 'coinsengine_users',
+                         batch_size: int = FETCH_BATCH_SIZE) -> int:
+    """
+    Write every player to a gzip-compressed snapshot file.
+    
+    Batches from DatabaseManager.stream_players are encoded and compressed in
+    a worker thread as they arrive, so memory stays at one batch however
+    large the table is. A failed export leaves no partial file behind.
+    
+    Args:
+        db_manager: DatabaseManager to read from
+        path: File to create (parent directories are created)
+        fmt: 'csv' (with a header row) or 'jsonl' (one object per line)
+        table_name: Name of the players table
+        batch_size: Rows per batch
+        
+    Returns:
+        Number of players written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+        
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = gzip.open(path, 'wt', encoding='utf-8', newline='')
+    rows = 0
+    try:
+        write = _batch_writer(handle, fmt)
+        stream = db_manager.stream_players(table_name, batch_size)
+        try:
+            async for batch in stream:
+                await asyncio.to_thread(write, batch)
+                rows += len(batch)
+        finally:
+            await stream.aclose()
+        await asyncio.to_thread(handle.close)
+    except BaseException:
+        handle.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return rows
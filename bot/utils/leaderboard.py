@@ -0,0 +1,127 @@
+"""
+Leaderboard for Economy Manager Bot
+Version: 0.5.0
+Incrementally maintained top-N players per currency
+"""
+
+import bisect
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+# Currencies with a leaderboard
+CURRENCIES = ('gems', 'coins')
+
+class Leaderboard:
+    """
+    Top `size` players by one currency column.
+    
+    Built once from the directory's PlayerTable, then kept current from the
+    changed rows of each refresh instead of re-sorting the whole table. A
+    little more than `size` entries are kept, and `floor` records the best
+    possible key of any player outside them (every outsider ranks at or
+    below it), so an update only needs the changed player:
+    
+    - a member that drops past the floor leaves (and lowers the floor);
+    - an outsider that rises above the floor joins (the last entry is
+      evicted once over capacity, lowering the floor to it).
+      
+    Only when members drop out faster than outsiders join, leaving fewer
+    than `size` entries while outsiders exist, does `needs_rebuild` ask for
+    another pass over the table.
+    
+    Entries are ordered by balance, highest first, then by player id.
+    """
+    
+    def __init__(self, currency: str, size: int = 1000, slack: Optional[int] = None):
+        """
+        Initialize an empty leaderboard.
+        
+        Args:
+            currency: Player column to rank by ('gems' or 'coins')
+            size: Ranks served
+            slack: Extra entries kept to absorb drop-outs (defaults to a quarter of size)
+        """
+        self.currency = currency
+        self.size = size
+        self.capacity = size + (size // 4 if slack is None else slack)
+        self._entries: List[Tuple[float, int, str]] = []  # (-balance, id, uuid), best first
+        self._members: Dict[str, Tuple[float, int, str]] = {}  # UUID -> entry
+        self._floor: Optional[Tuple[float, int]] = None  # Best key any outsider can have; None if no outsiders
+        
+    def __len__(self) -> int:
+        return min(len(self._entries), self.size)
+        
+    @property
+    def needs_rebuild(self) -> bool:
+        """Whether too few entries are left to serve every rank."""
+        return self._floor is not None and len(self._entries) < self.size
+        
+    def build(self, table):
+        """
+        Rebuild from a full PlayerTable (runs off the event loop for large tables).
+        
+        Args:
+            table: PlayerTable to rank
+        """
+        balances, ids, uuids = getattr(table, self.currency), table.ids, table.uuids
+        best = heapq.nsmallest(self.capacity + 1, range(len(ids)), key=lambda i: (-balances[i], ids[i]))
+        entries = [(-balances[i], ids[i], uuids[i]) for i in best]
+        self._floor = entries.pop()[:2] if len(entries) > self.capacity else None
+        self._entries = entries
+        self._members = {entry[2]: entry for entry in entries}
+        
+    def update(self, player_uuid: str, player_id: int, balance: float) -> bool:
+        """
+        Apply a player's current balance.
+        
+        Args:
+            player_uuid: Player's UUID
+            player_id: Player's row id (tie-breaker)
+            balance: Current balance in this leaderboard's currency
+            
+        Returns:
+            True if the leaderboard changed
+        """
+        entry = (-balance, player_id, player_uuid)
+        old = self._members.get(player_uuid)
+        if old is not None:
+            if old == entry:
+                return False
+            del self._entries[bisect.bisect_left(self._entries, old)]
+            del self._members[player_uuid]
+            if self._floor is not None and entry[:2] > self._floor:
+                # Dropped past players we aren't tracking: it becomes an
+                # outsider, ranked below the floor, which stays as it is
+                return True
+        elif self._floor is not None and entry[:2] >= self._floor:
+            return False
+            
+        bisect.insort(self._entries, entry)
+        self._members[player_uuid] = entry
+        while len(self._entries) > self.capacity:
+            evicted = self._entries.pop()
+            del self._members[evicted[2]]
+            self._floor = evicted[:2] if self._floor is None else min(self._floor, evicted[:2])
+        return True
+        
+    def page(self, offset: int = 0, limit: int = 20) -> List[Tuple[int, str, float]]:
+        """
+        Get a slice of the ranking.
+        
+        Args:
+            offset: Zero-based rank to start at
+            limit: Entries to return
+            
+        Returns:
+            List of (rank, uuid, balance) tuples, rank starting at 1
+        """
+        end = min(offset + limit, len(self))
+        return [(rank + 1, self._entries[rank][2], -self._entries[rank][0]) for rank in range(offset, end)]
+        
+    def rank(self, player_uuid: str) -> Optional[int]:
+        """A player's rank, or None if not within the top `size`."""
+        entry = self._members.get(player_uuid)
+        if entry is None:
+            return None
+        rank = bisect.bisect_left(self._entries, entry) + 1
+        return rank if rank <= self.size else None
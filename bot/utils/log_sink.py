@@ -0,0 +1,219 @@
+"""
+Log Channel Sink for Economy Manager Bot
+Version: 0.5.0
+Batches log channel messages off the interaction path
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('economy_bot')
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_DESCRIPTION = 4096
+MAX_MESSAGE_EMBED_CHARS = 6000
+
+class RateLimiter:
+    """Token bucket allowing `rate` sends per `per` seconds."""
+    
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        
+    async def acquire(self):
+        """Wait until a send is allowed, then consume a token."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+class LogSink:
+    """
+    Background pipeline for log channel messages.
+    
+    `submit()` only enqueues, so callers never wait on Discord. A worker task
+    drains the queue, coalesces text entries into combined embeds (flushing
+    when a batch is full or `flush_interval` seconds after its first entry),
+    and sends them under a token-bucket rate limit that stays inside the
+    channel's message rate limit. Entries submitted before `set_channel()`
+    wait in the queue. Entries that overflow the queue, have no channel to go
+    to or fail to send are counted and written to the local log file instead.
+    """
+    
+    def __init__(self, channel: Optional[discord.abc.Messageable] = None, max_queue: int = 1000,
+                 flush_interval: float = 2.0, max_batch: int = 25,
+                 rate: int = 5, per: float = 5.0):
+        """
+        Initialize the log sink.
+        
+        Args:
+            channel: Channel to send to (can be set later with `set_channel()`)
+            max_queue: Entries buffered before new ones are dropped
+            flush_interval: Seconds to wait for more entries before sending a batch
+            max_batch: Entries per batch
+            rate: Messages allowed per `per` seconds
+            per: Rate limit window in seconds
+        """
+        self.channel = channel
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.limiter = RateLimiter(rate, per)
+        self.sent = 0  # Entries delivered
+        self.dropped = 0  # Entries lost to a full queue or a missing channel
+        self.failed = 0  # Entries whose send raised
+        self._channel_known = asyncio.Event()  # Set once set_channel() has said where entries go
+        if channel is not None:
+            self._channel_known.set()
+        self._task: Optional[asyncio.Task] = None
+        
+    def set_channel(self, channel: Optional[discord.abc.Messageable]):
+        """
+        Start delivering queued and future entries.
+        
+        Args:
+            channel: Channel to send to, or None if there is none (entries go to the local log file)
+        """
+        self.channel = channel
+        self._channel_known.set()
+        
+    def start(self):
+        """Start the background worker."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+            
+    async def stop(self, timeout: float = 10.0):
+        """
+        Flush pending entries and stop the worker.
+        
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        if self._task is None:
+            return
+        if not self._channel_known.is_set():
+            # The channel never resolved; write what was buffered locally instead of waiting
+            self.set_channel(None)
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Log sink stopped with {self.queue.qsize()} entries unsent")
+        self._task.cancel()
+        self._task = None
+        
+    def submit(self, message: str, embed: Optional[discord.Embed] = None) -> bool:
+        """
+        Queue an entry for the log channel without waiting.
+        
+        Args:
+            message: Text to log
+            embed: Optional embed sent alongside the text
+            
+        Returns:
+            True if queued, False if dropped
+        """
+        if self.channel is None and self._channel_known.is_set():
+            self._spill([(message, embed)], "no log channel")
+            return False
+        try:
+            self.queue.put_nowait((message, embed))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Log channel queue full ({self.dropped} dropped), spilled: {message}")
+            return False
+            
+    async def _worker(self):
+        """Collect batches from the queue and send them."""
+        while True:
+            batch = [await self.queue.get()]
+            await self._channel_known.wait()
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+                    
+            try:
+                if self.channel is None:
+                    self._spill(batch, "no log channel")
+                    continue
+                await self._send_batch(batch)
+                self.sent += len(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += len(batch)
+                logger.error(f"Failed to send log to channel: {e}")
+                for message, _ in batch:
+                    logger.info(f"Unsent log channel entry: {message}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+                    
+    def _spill(self, entries: List[Tuple[str, Optional[discord.Embed]]], reason: str):
+        """Count entries as dropped and write them to the local log."""
+        self.dropped += len(entries)
+        for message, _ in entries:
+            logger.info(f"Unsent log channel entry ({reason}): {message}")
+            
+    async def _send_batch(self, batch: List[Tuple[str, Optional[discord.Embed]]]):
+        """Coalesce a batch into as few messages as Discord allows and send them."""
+        if len(batch) == 1:
+            # Lone entries keep their original look
+            message, embed = batch[0]
+            await self.limiter.acquire()
+            if embed:
+                await self.channel.send(message, embed=embed)
+            else:
+                await self.channel.send(message)
+            return
+            
+        embeds: List[discord.Embed] = []
+        text = ""
+        for message, embed in batch:
+            entry = message[:MAX_EMBED_DESCRIPTION]
+            if text and len(text) + len(entry) + 2 > MAX_EMBED_DESCRIPTION:
+                embeds.append(self._text_embed(text))
+                text = ""
+            text = f"{text}\n\n{entry}" if text else entry
+            if embed:
+                embeds.append(embed)
+        if text:
+            embeds.append(self._text_embed(text))
+            
+        # Split into messages within the per-message embed count and size limits
+        message_embeds: List[discord.Embed] = []
+        size = 0
+        for embed in embeds:
+            embed_size = len(embed)
+            if message_embeds and (len(message_embeds) >= MAX_EMBEDS_PER_MESSAGE
+                                   or size + embed_size > MAX_MESSAGE_EMBED_CHARS):
+                await self.limiter.acquire()
+                await self.channel.send(embeds=message_embeds)
+                message_embeds, size = [], 0
+            message_embeds.append(embed)
+            size += embed_size
+        if message_embeds:
+            await self.limiter.acquire()
+            await self.channel.send(embeds=message_embeds)
+            
+    @staticmethod
+    def _text_embed(text: str) -> discord.Embed:
+        """Embed holding several coalesced text entries."""
+        return discord.Embed(description=text, color=discord.Color.gold())
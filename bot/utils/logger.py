@@ -3,42 +3,96 @@ Logging setup for Economy Manager Bot
 Version: 0.1.0
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+from datetime import datetime, timezone
+from typing import Optional
 
-def setup_logger(name: str = 'economy_bot', level: str = 'INFO') -> logging.Logger:
+# Active queue listener (one per process), stopped on exit
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def setup_logger(name: str = 'economy_bot', level: str = 'INFO', log_file: str = 'logs/bot.log',
+                 use_queue: bool = True, json_format: bool = False, max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5, rotate_when: Optional[str] = None) -> logging.Logger:
     """
     Setup and configure logger for the bot.
     
+    In queue mode the logger only puts records on an in-memory queue; a
+    listener thread does the formatting and the disk/console writes, so
+    logging never blocks the event loop.
+    
     Args:
         name: Logger name
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_file: Path of the log file
+        use_queue: Write through a background listener thread
+        json_format: Write the log file as JSON lines
+        max_bytes: Rotate the log file at this size (0 disables size rotation)
+        backup_count: Rotated log files to keep
+        rotate_when: Rotate by time instead of size (e.g. 'midnight', 'H')
         
     Returns:
         Configured logger instance
     """
+    global _listener
+    
     # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper()))
+    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
     
+    # Replace handlers from an earlier call instead of duplicating them
+    if _listener:
+        _listener.stop()
+        _listener = None
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+        
     # Create logs directory if it doesn't exist
-    log_dir = 'logs'
-    if not os.path.exists(log_dir):
+    log_dir = os.path.dirname(log_file)
+    if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
+        
     # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    if json_format:
+        file_formatter = JsonFormatter()
+    else:
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
     console_formatter = logging.Formatter(
         '%(levelname)s: %(message)s'
     )
     
     # File handler
-    log_file = os.path.join(log_dir, 'bot.log')
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=rotate_when, backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(file_formatter)
     
@@ -48,7 +102,46 @@ def setup_logger(name: str = 'economy_bot', level: str = 'INFO') -> logging.Logg
     console_handler.setFormatter(console_formatter)
     
     # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        
     return logger
+
+def setup_logger_from_config(config, name: str = 'economy_bot') -> logging.Logger:
+    """
+    Setup the logger from the LOG_* settings of a Config.
+    
+    Args:
+        config: Config instance
+        name: Logger name
+        
+    Returns:
+        Configured logger instance
+    """
+    return setup_logger(
+        name=name,
+        level=config.LOG_LEVEL,
+        log_file=config.LOG_FILE,
+        use_queue=config.LOG_QUEUE,
+        json_format=config.LOG_FORMAT == 'json',
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT,
+        rotate_when=config.LOG_ROTATE_WHEN
+    )
+
+def shutdown_logger():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logger)
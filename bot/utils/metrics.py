@@ -0,0 +1,307 @@
+"""
+Metrics for Economy Manager Bot
+Version: 0.5.0
+Counters, gauges and latency histograms with Prometheus text export
+"""
+
+import asyncio
+import bisect
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger('economy_bot')
+
+# Latency buckets in seconds (1ms .. 30s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Recent samples kept per histogram series for p50/p99
+QUANTILE_WINDOW = 2048
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    """Stable hashable key for a label set."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key: LabelKey) -> str:
+    """Render a label set as {a="b",...}."""
+    if not key:
+        return ''
+    pairs = (
+        f'{k}="' + v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for k, v in key
+    )
+    return '{' + ','.join(pairs) + '}'
+
+class Counter:
+    """Monotonically increasing value per label set."""
+    
+    type_name = 'counter'
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+        
+    def inc(self, amount: float = 1.0, **labels):
+        """Increase the counter."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+            
+    def value(self, **labels) -> float:
+        """Current value for a label set."""
+        return self._values.get(_label_key(labels), 0.0)
+        
+    def samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key, value in list(self._values.items()):
+            yield self.name, key, value
+
+class Gauge:
+    """Value that can go up and down, either set directly or read from a callback."""
+    
+    type_name = 'gauge'
+    
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._functions: Dict[LabelKey, Callable[[], float]] = {}
+        
+    def set(self, value: float, **labels):
+        """Set the gauge."""
+        self._values[_label_key(labels)] = value
+        
+    def set_function(self, func: Callable[[], float], **labels):
+        """Read the gauge from func whenever it is collected."""
+        self._functions[_label_key(labels)] = func
+        
+    def value(self, **labels) -> float:
+        """Current value for a label set."""
+        key = _label_key(labels)
+        if key in self._functions:
+            return float(self._functions[key]())
+        return self._values.get(key, 0.0)
+        
+    def samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key, value in list(self._values.items()):
+            yield self.name, key, value
+        for key, func in list(self._functions.items()):
+            try:
+                yield self.name, key, float(func())
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} callback failed: {e}")
+
+class Histogram:
+    """
+    Latency distribution per label set.
+    
+    Cumulative buckets are exported for Prometheus; a window of the most
+    recent samples gives exact p50/p99 for `/stats`.
+    """
+    
+    type_name = 'histogram'
+    
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, dict] = {}
+        self._lock = threading.Lock()
+        
+    def observe(self, value: float, **labels):
+        """Record one sample."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'counts': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                    'recent': deque(maxlen=QUANTILE_WINDOW),
+                }
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+            series['recent'].append(value)
+            
+    @contextmanager
+    def time(self, **labels):
+        """Context manager observing the elapsed seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+            
+    def label_sets(self) -> List[Dict[str, str]]:
+        """All label sets observed so far."""
+        return [dict(key) for key in list(self._series)]
+        
+    def count(self, **labels) -> int:
+        """Total samples for a label set."""
+        series = self._series.get(_label_key(labels))
+        return series['count'] if series else 0
+        
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """
+        Quantile of the recent samples.
+        
+        Args:
+            q: Quantile between 0 and 1 (0.5 for p50)
+            
+        Returns:
+            Value in seconds, or None without samples
+        """
+        series = self._series.get(_label_key(labels))
+        if not series or not series['recent']:
+            return None
+        recent: Deque[float] = series['recent']
+        ordered = sorted(recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        
+    def samples(self) -> Iterator[Tuple[str, LabelKey, float]]:
+        for key, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (('le', repr(bound)),), cumulative
+            yield f"{self.name}_bucket", key + (('le', '+Inf'),), series['count']
+            yield f"{self.name}_sum", key, series['sum']
+            yield f"{self.name}_count", key, series['count']
+
+class MetricsRegistry:
+    """Process-wide collection of metrics."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help_text, **kwargs)
+        return metric
+        
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, help_text)
+        
+    def gauge(self, name: str, help_text: str = '') -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, help_text)
+        
+    def histogram(self, name: str, help_text: str = '',
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+        
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {value}")
+        return '\n'.join(lines) + '\n'
+
+# Shared registry used across the bot
+registry = MetricsRegistry()
+
+DB_QUERY_SECONDS = registry.histogram(
+    'economy_db_query_seconds', 'DatabaseManager operation latency including executor wait')
+DB_CHECKOUT_SECONDS = registry.histogram(
+    'economy_db_pool_checkout_seconds', 'Time to check a connection out of the pool')
+DB_POOL_TIMEOUTS = registry.counter(
+    'economy_db_pool_timeouts_total', 'Operations that gave up waiting for a connection')
+DB_ERRORS = registry.counter(
+    'economy_db_errors_total', 'DatabaseManager operations that raised')
+DB_REPLICA_FALLBACKS = registry.counter(
+    'economy_db_replica_fallbacks_total', 'Reads sent to the primary because a replica failed')
+DB_WAIT_SECONDS = registry.histogram(
+    'economy_db_wait_seconds', 'Time operations waited for a scheduler slot, per lane')
+DB_SHED = registry.counter(
+    'economy_db_shed_total', 'Operations rejected because too much work was queued')
+DB_SINGLE_FLIGHT = registry.counter(
+    'economy_db_single_flight_total', 'Reads answered by an identical read already in flight')
+BALANCE_CHANGES = registry.counter(
+    'economy_balance_changes_total', 'Balance changes not made by the bot, seen by the balance watcher')
+BALANCE_ALERTS = registry.counter(
+    'economy_balance_alerts_total', 'External balance changes flagged as unusual')
+INTERACTION_SECONDS = registry.histogram(
+    'economy_interaction_seconds', 'Slash command and UI callback latency')
+INTERACTION_ERRORS = registry.counter(
+    'economy_interaction_errors_total', 'Slash command and UI callbacks that raised')
+
+def timed_interaction(handler: str):
+    """
+    Decorator recording an async interaction callback's latency and errors.
+    
+    Args:
+        handler: Name used as the `handler` label
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                INTERACTION_ERRORS.inc(handler=handler)
+                raise
+            finally:
+                INTERACTION_SECONDS.observe(time.perf_counter() - started, handler=handler)
+        return wrapper
+    return decorator
+
+class MetricsServer:
+    """Minimal HTTP server exposing /metrics in Prometheus text format."""
+    
+    def __init__(self, metrics: MetricsRegistry, host: str = '127.0.0.1', port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        
+    async def start(self):
+        """Start listening."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+        
+    async def stop(self):
+        """Stop listening."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Drain headers
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', self.metrics.render().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            else:
+                status, body, content_type = '404 Not Found', b'Not Found\n', 'text/plain'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
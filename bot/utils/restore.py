@@ -0,0 +1,215 @@
+"""
+Snapshot Restore for Economy Manager Bot
+Version: 0.5.0
+Streams an /export snapshot back into the players table, chunk by chunk
+"""
+
+import asyncio
+import csv
+import gzip
+import heapq
+import json
+from pathlib import Path
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+from mysql.connector import Error
+
+from bot.database.db_manager import BULK_CHUNK_SIZE, UUID_PATTERN, normalize_uuid
+from bot.database.scheduler import DatabaseOverloadedError
+from bot.utils.export import EXPORT_FORMATS
+
+# Changes listed in a restore summary (largest first); the full diff goes to the diff file
+TOP_CHANGES = 10
+
+# Invalid snapshot lines kept for the summary
+MAX_REPORTED_ERRORS = 10
+
+DIFF_COLUMNS = ('uuid', 'gems_before', 'gems_after', 'coins_before', 'coins_after')
+
+def snapshot_format(path: Path) -> str:
+    """
+    Format of a snapshot file from its name (e.g. economy_main_20250101_120000.jsonl.gz -> jsonl).
+    
+    Raises:
+        ValueError: The name doesn't end in .csv or .jsonl (optionally followed by .gz)
+    """
+    name = path.name.lower()
+    if name.endswith('.gz'):
+        name = name[:-len('.gz')]
+    fmt = name.rsplit('.', 1)[-1]
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"{path.name} is not a .csv or .jsonl snapshot (optionally .gz)")
+    return fmt
+
+def _open_snapshot(path: Path) -> IO[str]:
+    if path.name.lower().endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+    return open(path, 'r', encoding='utf-8-sig', newline='')
+
+def iter_snapshot(path: Path, on_error: Callable[[str], None],
+                  chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[List[Tuple[str, float, float]]]:
+    """
+    Read a snapshot written by /export as chunks of balances.
+    
+    The file is read as a stream, so only one chunk is in memory at a time.
+    CSV files need uuid, gems and coins columns in the header; JSONL lines
+    need those keys. Other columns are ignored. UUIDs are normalized to
+    the lowercase dashed form stored in the table.
+    
+    Args:
+        path: Snapshot file (.csv, .jsonl, optionally gzip-compressed)
+        on_error: Called with a message (line number and reason) for each skipped invalid line
+        chunk_size: Players per chunk
+        
+    Yields:
+        Lists of (uuid, gems, coins)
+        
+    Raises:
+        ValueError: Unknown format or a CSV header without the needed columns
+    """
+    fmt = snapshot_format(path)
+    with _open_snapshot(path) as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            missing = {'uuid', 'gems', 'coins'} - set(reader.fieldnames or ())
+            if missing:
+                raise ValueError(f"{path.name} has no {', '.join(sorted(missing))} column(s)")
+            records = ((reader.line_num, record) for record in reader)
+        else:
+            records = ((number, line) for number, line in enumerate(handle, start=1) if line.strip())
+            
+        chunk: List[Tuple[str, float, float]] = []
+        for line_number, record in records:
+            try:
+                if fmt == 'jsonl':
+                    record = json.loads(record)
+                player_uuid = str(record['uuid']).strip()
+                if not UUID_PATTERN.match(player_uuid):
+                    raise ValueError(f"invalid UUID '{player_uuid}'")
+                gems, coins = float(record['gems']), float(record['coins'])
+                if gems < 0 or coins < 0:
+                    raise ValueError("negative balance")
+            except (KeyError, TypeError, ValueError) as e:
+                on_error(f"Line {line_number}: {e}")
+                continue
+            chunk.append((normalize_uuid(player_uuid), gems, coins))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+class RestoreReport:
+    """Outcome of a restore or dry run, accumulated chunk by chunk in constant memory."""
+    
+    def __init__(self, apply: bool):
+        self.apply = apply
+        self.rows = 0  # Valid snapshot rows read
+        self.duplicates = 0  # Rows replaced by a later row for the same UUID in their chunk
+        self.changed = 0  # Players whose balances differ from the snapshot
+        self.missing = 0  # Snapshot UUIDs not in the table
+        self.net = {'gems': 0.0, 'coins': 0.0}  # Sum of (snapshot - current) over changed players
+        self.invalid = 0  # Invalid snapshot lines skipped
+        self.errors: List[str] = []  # The first MAX_REPORTED_ERRORS of them
+        self.chunks = 0  # Chunks processed (each one applied in full, or not at all)
+        self.error: Optional[str] = None  # Why the restore stopped early
+        self.top: List[Tuple[float, str, float, float, float, float]] = []  # Min-heap of the largest changes
+        
+    @property
+    def unchanged(self) -> int:
+        return self.rows - self.duplicates - self.changed - self.missing
+        
+    def add_error(self, message: str):
+        """Count an invalid snapshot line."""
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+            
+    def add(self, rows: int, changes: List[Tuple[str, float, float, float, float]], missing: int,
+            duplicates: int = 0):
+        """Count one processed chunk (restore_balances keeps only the last row per UUID)."""
+        self.rows += rows
+        self.duplicates += duplicates
+        self.changed += len(changes)
+        self.missing += missing
+        self.chunks += 1
+        for change in changes:
+            player_uuid, gems_before, coins_before, gems_after, coins_after = change
+            self.net['gems'] += gems_after - gems_before
+            self.net['coins'] += coins_after - coins_before
+            size = abs(gems_after - gems_before) + abs(coins_after - coins_before)
+            entry = (size,) + change
+            if len(self.top) < TOP_CHANGES:
+                heapq.heappush(self.top, entry)
+            elif entry > self.top[0]:
+                heapq.heapreplace(self.top, entry)
+                
+    def largest_changes(self) -> List[Tuple[str, float, float, float, float]]:
+        """Biggest changes first, as (uuid, gems before, coins before, gems after, coins after)."""
+        return [entry[1:] for entry in sorted(self.top, reverse=True)]
+
+async def restore_snapshot(db_manager, path: Path, table_name: str = 'coinsengine_users', apply: bool = False,
+                           diff_path: Optional[Path] = None, admin_id: Optional[int] = None,
+                           chunk_size: int = BULK_CHUNK_SIZE) -> RestoreReport:
+    """
+    Diff a snapshot against the players table and, with apply, restore the changed balances.
+    
+    The snapshot is read in a worker thread one chunk ahead of the database,
+    and every chunk is diffed (and written) in its own short transaction via
+    DatabaseManager.restore_balances, so players are never locked for more
+    than one chunk and memory stays flat for any snapshot size. Players not
+    in the snapshot are left alone.
+    
+    A chunk that fails stops the restore with report.error set; the chunks
+    before it stay applied. Running the restore again is safe, as only
+    balances that still differ from the snapshot are written.
+    
+    Args:
+        db_manager: DatabaseManager of the server to restore
+        path: Snapshot file written by /export
+        table_name: Name of the players table
+        apply: Write the changes (otherwise only report them)
+        diff_path: Optional gzip CSV receiving every change (uuid, before and after balances)
+        admin_id: Discord user restoring, recorded in the ledger
+        chunk_size: Players per chunk and transaction (at most BULK_CHUNK_SIZE)
+        
+    Returns:
+        RestoreReport
+        
+    Raises:
+        ValueError: The snapshot can't be read
+    """
+    report = RestoreReport(apply)
+    chunks = iter_snapshot(path, report.add_error, min(chunk_size, BULK_CHUNK_SIZE))
+    diff = None
+    if diff_path is not None:
+        diff_path.parent.mkdir(parents=True, exist_ok=True)
+        diff = gzip.open(diff_path, 'wt', encoding='utf-8', newline='')
+        diff_writer = csv.writer(diff)
+        diff_writer.writerow(DIFF_COLUMNS)
+    pending = None
+    try:
+        pending = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+        while True:
+            chunk = await pending
+            if chunk is None:
+                break
+            # Parse the next chunk while this one is at the database
+            pending = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+            try:
+                changes, missing = await db_manager.restore_balances(chunk, table_name, apply, admin_id)
+            except (Error, DatabaseOverloadedError) as e:
+                report.error = str(e)
+                break
+            report.add(len(chunk), changes, missing, len(chunk) - len({u for u, _, _ in chunk}))
+            if diff is not None and changes:
+                await asyncio.to_thread(diff_writer.writerows,
+                                        ((u, gb, ga, cb, ca) for u, gb, cb, ga, ca in changes))
+    finally:
+        if pending is not None:
+            # Let the reader thread finish its chunk before the file is closed under it
+            await asyncio.gather(pending, return_exceptions=True)
+        chunks.close()
+        if diff is not None:
+            diff.close()
+    return report
@@ -0,0 +1,266 @@
+"""
+Player Search Index for Economy Manager Bot
+Version: 0.5.0
+Trigram inverted index for fast fuzzy player name search
+"""
+
+import bisect
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from functools import partial
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Minimum fuzzy score for a player to count as a match (40% similarity)
+MATCH_THRESHOLD = 0.4
+
+# Scores for the exact and substring tiers
+EXACT_SCORE = 1.0
+CONTAINS_SCORE = 0.9
+
+def fuzzy_match_score(search_term: str, player_name: str) -> float:
+    """
+    Calculate fuzzy match score between search term and player name.
+    Returns a score between 0 and 1, where 1 is perfect match.
+    """
+    search_lower = search_term.lower()
+    name_lower = player_name.lower()
+    
+    # Exact match gets highest score
+    if search_lower == name_lower:
+        return EXACT_SCORE
+        
+    # Contains gets high score
+    if search_lower in name_lower:
+        return CONTAINS_SCORE
+        
+    # Use SequenceMatcher for fuzzy matching
+    return SequenceMatcher(None, search_lower, name_lower).ratio()
+
+def ngrams(text: str, n: int) -> List[str]:
+    """
+    Split lowercase text into n-grams, padded with a space on each side.
+    
+    Padding gives the first and last characters their own grams, so a typo
+    at either end of a name only costs one or two shared grams.
+    """
+    padded = f" {text} "
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+class PlayerSearchIndex:
+    """
+    Inverted n-gram index over player names.
+    
+    Results are exactly those of scoring every name with `fuzzy_match_score`
+    and keeping scores above MATCH_THRESHOLD, best first (ties in name
+    order): exact matches, then names containing the query, then fuzzy
+    matches. Substring matches come from intersecting trigram postings.
+    
+    Fuzzy candidates come from a character index: the characters a name
+    shares with the query (counted with multiplicity) give SequenceMatcher's
+    quick_ratio(), an upper bound of ratio(), for every name at once. Names
+    whose bound can't clear the threshold are never scored, and the rest are
+    scored best bound first, stopping as soon as no remaining name can make
+    the top `limit`. Nothing that could match is pruned.
+    
+    Players are stored in slots as (uuid, name); results are UUIDs, which
+    the caller resolves to player records. Removals leave a tombstone that is
+    skipped on lookup and reclaimed by `compact()`.
+    """
+    
+    def __init__(self, players: Iterable[Tuple[str, str]] = ()):
+        """
+        Build the index.
+        
+        Args:
+            players: (uuid, name) pairs
+        """
+        self._uuids: List[Optional[str]] = []
+        self._names: List[Optional[str]] = []  # Lowercase name per slot, None when removed
+        self._lengths = array('i')  # Name length per slot, -1 when removed
+        self._slots: Dict[str, int] = {}  # UUID -> slot
+        self._trigrams: Dict[str, array] = defaultdict(partial(array, 'i'))  # Trigram -> slots (may include tombstones)
+        # (character, k) -> slots whose name has at least k of that character (may include tombstones)
+        self._characters: Dict[Tuple[str, int], array] = defaultdict(partial(array, 'i'))
+        self._exact: Dict[str, List[int]] = {}  # Lowercase name -> slots
+        self._sorted: List[Tuple[str, int]] = []  # (lowercase name, slot) for prefix lookups
+        self._removed = 0
+        
+        for player_uuid, name in players:
+            self._add(player_uuid, name)
+        self._sorted = sorted((name, slot) for slot, name in enumerate(self._names))
+        
+    def __len__(self) -> int:
+        return len(self._slots)
+        
+    def upsert(self, player_uuid: str, name: str):
+        """
+        Add a player or replace the stored name for its UUID.
+        
+        Args:
+            player_uuid: Player's UUID
+            name: Player's name
+        """
+        slot = self._slots.get(player_uuid)
+        if slot is not None:
+            if self._names[slot] == (name or '').lower():
+                return
+            self.remove(player_uuid)
+        slot = self._add(player_uuid, name)
+        bisect.insort(self._sorted, (self._names[slot], slot))
+        
+    def remove(self, player_uuid: str):
+        """
+        Remove a player from the index.
+        
+        Args:
+            player_uuid: Player's UUID
+        """
+        slot = self._slots.pop(player_uuid, None)
+        if slot is None:
+            return
+        name = self._names[slot]
+        index = bisect.bisect_left(self._sorted, (name, slot))
+        del self._sorted[index]
+        exact = self._exact[name]
+        exact.remove(slot)
+        if not exact:
+            del self._exact[name]
+        self._names[slot] = None
+        self._uuids[slot] = None
+        self._lengths[slot] = -1
+        self._removed += 1
+        if self._removed > 1000 and self._removed > len(self._slots) // 4:
+            self.compact()
+            
+    def compact(self):
+        """Rebuild the index without tombstones."""
+        players = [(u, n) for u, n in zip(self._uuids, self._names) if u is not None]
+        self.__init__(players)
+        
+    def _add(self, player_uuid: str, name: str) -> int:
+        """Store a player in a new slot (prefix list is maintained by the caller)."""
+        name = (name or '').lower()
+        slot = len(self._uuids)
+        self._uuids.append(player_uuid)
+        self._names.append(name)
+        self._lengths.append(len(name))
+        self._slots[player_uuid] = slot
+        self._exact.setdefault(name, []).append(slot)
+        for gram in set(ngrams(name, 3)):
+            self._trigrams[gram].append(slot)
+        for character, count in Counter(name).items():
+            for k in range(1, count + 1):
+                self._characters[character, k].append(slot)
+        return slot
+        
+    def prefix(self, prefix: str, limit: int = 25) -> List[str]:
+        """
+        Get players whose name starts with a prefix, in name order.
+        
+        Args:
+            prefix: Name prefix (case-insensitive)
+            limit: Maximum number of players to return
+            
+        Returns:
+            List of player UUIDs
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._sorted, (prefix, -1))
+        results = []
+        for name, slot in self._sorted[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            results.append(self._uuids[slot])
+        return results
+        
+    def search(self, search_term: str, limit: Optional[int] = None) -> List[Tuple[float, str]]:
+        """
+        Search players by name.
+        
+        Args:
+            search_term: Text to search for (case-insensitive)
+            limit: Maximum number of results, or None for all
+            
+        Returns:
+            List of (score, uuid) tuples, best match first
+        """
+        query = search_term.strip().lower()
+        if not query:
+            return []
+            
+        matches = [(EXACT_SCORE, slot) for slot in self._exact.get(query, ())]
+        matches += [(CONTAINS_SCORE, slot) for slot in self._contains(query) if self._names[slot] != query]
+        matches += self._fuzzy(query, {slot for _, slot in matches}, limit, [score for score, _ in matches])
+        matches.sort(key=lambda match: (-match[0], self._names[match[1]], match[1]))
+        if limit is not None:
+            matches = matches[:limit]
+        return [(score, self._uuids[slot]) for score, slot in matches]
+        
+    def _contains(self, query: str) -> Iterable[int]:
+        """Slots whose name contains the query."""
+        grams = [g for g in ngrams(query, 3) if g[0] != ' ' and g[-1] != ' ']
+        if not grams:
+            # Query too short for an unpadded trigram; a plain scan is cheap enough
+            return [slot for slot, name in enumerate(self._names) if name is not None and query in name]
+            
+        postings = sorted((self._trigrams.get(g, ()) for g in set(grams)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return [slot for slot in candidates if self._names[slot] is not None and query in self._names[slot]]
+        
+    def _fuzzy(self, query: str, matched: Set[int], limit: Optional[int],
+               scores: List[float]) -> List[Tuple[float, int]]:
+        """
+        Fuzzy matches above MATCH_THRESHOLD among names not already matched.
+        
+        Args:
+            query: Lowercase search text
+            matched: Slots already matched exactly or as substrings
+            limit: Results wanted overall, or None for all
+            scores: Scores of the matches found so far
+            
+        Returns:
+            List of (score, slot)
+        """
+        postings = [
+            np.frombuffer(self._characters[character, k], dtype=np.int32)
+            for character, count in Counter(query).items()
+            for k in range(1, count + 1)
+            if (character, k) in self._characters
+        ]
+        if not postings:
+            return []
+        # Characters each name shares with the query, with multiplicity
+        shared = np.bincount(np.concatenate(postings), minlength=len(self._lengths))
+        lengths = np.frombuffer(self._lengths, dtype=np.int32)
+        # quick_ratio() = 2 * shared / (len(a) + len(b)) >= ratio()
+        bounds = 2.0 * shared / (len(query) + np.maximum(lengths, 0))
+        candidates = np.flatnonzero((bounds > MATCH_THRESHOLD) & (lengths >= 0))
+        candidates = candidates[np.argsort(-bounds[candidates], kind='stable')]
+        
+        # Scores of the best `limit` matches so far; a name bounded below the worst of them can't place
+        best = heapq.nsmallest(limit, scores, key=lambda score: -score) if limit else []
+        heapq.heapify(best)
+        results = []
+        for slot in candidates.tolist():
+            if limit and len(best) >= limit and bounds[slot] < best[0]:
+                break
+            if slot in matched:
+                continue
+            score = SequenceMatcher(None, query, self._names[slot]).ratio()
+            if score <= MATCH_THRESHOLD:
+                continue
+            results.append((score, slot))
+            if limit:
+                if len(best) < limit:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+        return results
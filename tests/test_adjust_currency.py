@@ -0,0 +1,56 @@
+"""
+Currency Adjustment Tests for Economy Manager Bot
+Version: 0.5.0
+DatabaseManager.adjust_currency over the SQLite stand-in
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.sqlite_backend import attach_pool, seed_database
+from bot.database.db_manager import DatabaseManager
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 20)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=4)
+    attach_pool(db, path)
+    yield db, players
+    asyncio.run(db.close())
+
+def test_adjust_returns_the_new_balance(database):
+    db, players = database
+    before = asyncio.run(db.get_player_by_uuid(players[0]['uuid']))
+    success, message, new_balance = asyncio.run(db.adjust_currency(players[0]['name'], 'coins', 12.5))
+    assert success and new_balance == before.coins + 12.5
+    assert message == f"New balance: {new_balance:.2f}"
+    assert asyncio.run(db.get_player_by_uuid(before.uuid)).coins == new_balance
+
+def test_adjust_rejects_overdrafts_and_unknown_players(database):
+    db, players = database
+    player = asyncio.run(db.get_player_by_uuid(players[1]['uuid']))
+    success, message, new_balance = asyncio.run(db.adjust_currency(player.uuid, 'gems', -player.gems - 1))
+    assert not success and new_balance is None
+    assert message == f"Insufficient balance. Current: {player.gems:.2f}, Trying to remove: {player.gems + 1:.2f}"
+    assert asyncio.run(db.get_player_by_uuid(player.uuid)).gems == player.gems
+    
+    success, message, _ = asyncio.run(db.adjust_currency('NobodyByThisName', 'gems', 1.0))
+    assert not success and message == "Player not found."
+
+def test_concurrent_removals_never_overdraw(database):
+    db, players = database
+    player = asyncio.run(db.get_player_by_uuid(players[2]['uuid']))
+    
+    async def scenario():
+        results = []
+        for _ in range(10):
+            # Each round asks for four times what the balance covers, on every connection at once
+            await db.adjust_currency(player.uuid, 'gems', 10.0 - (await db.get_player_by_uuid(player.uuid)).gems)
+            results += await asyncio.gather(*(db.adjust_currency(player.uuid, 'gems', -10.0) for _ in range(4)))
+        return results
+        
+    results = asyncio.run(scenario())
+    assert [balance for success, _, balance in results if success] == [0.0] * 10
+    assert asyncio.run(db.get_player_by_uuid(player.uuid)).gems == 0
@@ -0,0 +1,176 @@
+"""
+Balance Watcher Tests for Economy Manager Bot
+Version: 0.5.0
+External change detection, balance sweeps and robust z-scores
+"""
+
+import asyncio
+import sqlite3
+
+import numpy as np
+import pytest
+
+from benchmarks.sqlite_backend import attach_pool, seed_database
+from bot.database import player_directory
+from bot.database.balance_watcher import MIN_SAMPLES, BalanceChanges, BalanceWatcher
+from bot.database.db_manager import DatabaseManager
+from bot.database.models import Player, PlayerTable
+from bot.database.player_directory import PlayerDirectory
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 2000)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=2)
+    attach_pool(db, path)
+    yield db, players, path
+    asyncio.run(db.close())
+
+def console_edit(path: str, sql: str, params=()):
+    """Change the table behind the bot's back, like the server console would."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(sql, params)
+        connection.commit()
+    finally:
+        connection.close()
+
+async def watched_directory(db):
+    """Loaded directory with a watcher that alerts on 1,000 gems."""
+    directory = PlayerDirectory(db, refresh_interval=0)
+    sent = []
+    
+    async def send(message):
+        sent.append(message)
+        
+    watcher = BalanceWatcher(directory, send, thresholds={'gems': 1000}, scan_rows=10_000)
+    directory.balance_watcher = db.balance_watcher = watcher
+    await directory.refresh()
+    return directory, watcher, sent
+
+def offline_player(directory: PlayerDirectory) -> Player:
+    """The player seen longest ago, whose row is far below the last_online watermark."""
+    last_online = np.frombuffer(directory._players.last_online, dtype=np.int64)
+    return directory._players.row(int(np.argmin(last_online)))
+
+def test_offline_change_found_by_balance_check(database):
+    db, players, path = database
+    
+    async def scenario():
+        directory, watcher, sent = await watched_directory(db)
+        player = offline_player(directory)
+        console_edit(path, "UPDATE coinsengine_users SET gems = gems + 5000 WHERE id = ?", (player.id,))
+        
+        await directory.refresh()
+        assert watcher.observed == 0  # Neither watermark moved
+        
+        await watcher.poll()
+        assert watcher.observed == 1
+        assert directory.get_cached(player.uuid).gems == player.gems + 5000
+        assert len(sent) == 1 and player.uuid in sent[0] and '+5,000.00 gems' in sent[0]
+        assert directory._scan_after == 0  # Whole table read, next sweep starts over
+        
+    asyncio.run(scenario())
+
+def test_balance_check_resumes_where_it_stopped(database):
+    db, players, path = database
+    
+    async def scenario():
+        directory, watcher, sent = await watched_directory(db)
+        assert await directory.check_balances(700) == 0
+        assert directory._scan_after == players[699]['id']
+        
+        console_edit(path, "UPDATE coinsengine_users SET coins = coins + 1 WHERE id IN (?, ?)",
+                     (players[100]['id'], players[1000]['id']))
+        assert await directory.check_balances(700) == 1  # Rows 700-1399 only
+        assert directory._scan_after == players[1399]['id']
+        assert await directory.check_balances(700) == 0
+        assert directory._scan_after == 0
+        assert await directory.check_balances(700) == 1  # Wrapped around to row 100
+        
+    asyncio.run(scenario())
+
+def test_stale_rows_are_not_merged(database):
+    db, players, path = database
+    
+    async def scenario():
+        directory, watcher, sent = await watched_directory(db)
+        player = offline_player(directory)
+        # As if a lagging replica returned the row from before a change the directory already has
+        directory._players.last_online[directory._rows[player.uuid]] = player.last_online + 1
+        console_edit(path, "UPDATE coinsengine_users SET gems = gems + 5000 WHERE id = ?", (player.id,))
+        assert await directory.check_balances(10_000) == 0
+        assert directory.get_cached(player.uuid).gems == player.gems
+        
+    asyncio.run(scenario())
+
+def test_bot_changes_are_not_flagged(database):
+    db, players, path = database
+    
+    async def scenario():
+        directory, watcher, sent = await watched_directory(db)
+        player = offline_player(directory)
+        success, message = await db.update_currency_by_uuid(player.uuid, 'gems', 5000, 'add')
+        assert success, message
+        
+        await watcher.poll()
+        assert directory.get_cached(player.uuid).gems == player.gems + 5000
+        assert watcher.observed == 0 and not sent
+        
+    asyncio.run(scenario())
+
+def test_changed_rows_are_paged(database, monkeypatch):
+    db, players, path = database
+    monkeypatch.setattr(player_directory, 'CHANGED_ROWS_LIMIT', 10)
+    
+    async def scenario():
+        directory = PlayerDirectory(db, refresh_interval=3600)
+        await directory.refresh()
+        now = directory._max_last_online + 1
+        console_edit(path, "UPDATE coinsengine_users SET last_online = ? + id, gems = gems + 1 WHERE id <= 25",
+                     (now,))
+        directory._refreshed_at = 0.0
+        
+        rounds = 0
+        while directory._refresh_due():
+            await directory.refresh()
+            rounds += 1
+        assert rounds == 3  # Pages of 10, 10 and 5
+        assert all(directory.get_cached(p['uuid']).last_online == now + p['id'] for p in players[:25])
+        
+    asyncio.run(scenario())
+
+def test_robust_zscore_flags_outliers():
+    watcher = BalanceWatcher(None, None, zscore=10)
+    rng = np.random.default_rng(7)
+    
+    def changes(sizes):
+        sizes = np.asarray(sizes, dtype=np.float64)
+        names = [f"p{i}" for i in range(sizes.size)]
+        return BalanceChanges(names, names, np.zeros((sizes.size, 2)), np.column_stack([sizes, sizes]))
+        
+    history = rng.normal(100, 10, MIN_SAMPLES)
+    watcher.observe(changes(history))
+    assert watcher.flagged == 0  # Not enough history yet
+    
+    watcher.observe(changes([105, 90, 220]))
+    assert watcher.flagged == 2  # The outlier, in both currencies
+    median = np.median(history)
+    expected = (220 - median) / (1.4826 * np.median(np.abs(history - median)))
+    assert [item[0] for item in watcher._pending] == pytest.approx([expected, expected])
+
+def test_changes_between_snapshots():
+    old = PlayerTable.from_players([
+        Player(1, 'a', 'Alpha', 10.0, 5.0, 0),
+        Player(2, 'b', 'Bravo', 20.0, 5.0, 0),
+        Player(3, 'c', 'Charlie', 30.0, 5.0, 0),
+    ])
+    new = PlayerTable.from_players([
+        Player(4, 'd', 'Delta', 1.0, 1.0, 0),  # Only in the new snapshot
+        Player(3, 'c', 'Charlie', 30.0, 7.5, 0),
+        Player(1, 'a', 'Alpha', 10.0, 5.0, 0),
+    ])
+    changes = BalanceChanges.between(old, new)
+    assert changes.uuids == ['c'] and changes.names == ['Charlie']
+    assert changes.before.tolist() == [[30.0, 5.0]] and changes.after.tolist() == [[30.0, 7.5]]
+    assert not len(BalanceChanges.between(PlayerTable(), new))
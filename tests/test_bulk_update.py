@@ -0,0 +1,60 @@
+"""
+Bulk Update Tests for Economy Manager Bot
+Version: 0.5.0
+Bulk CSV parsing and DatabaseManager.bulk_update_currency over the SQLite stand-in
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.sqlite_backend import attach_pool, seed_database
+from bot.database.db_manager import DatabaseManager, normalize_uuid
+from bot.utils.bulk_csv import parse_bulk_csv
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 50)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=2)
+    attach_pool(db, path)
+    yield db, players
+    asyncio.run(db.close())
+
+def test_parse_with_header_in_any_order():
+    rows, errors = parse_bulk_csv(b'\xef\xbb\xbfamount,currency,player\n10,GEMS,Steve\n-2.5,coins,Alex\n')
+    assert rows == [('Steve', 'gems', 10.0), ('Alex', 'coins', -2.5)]
+    assert errors == []
+
+def test_parse_reports_bad_lines():
+    rows, errors = parse_bulk_csv(b'Steve,gems,10\nAlex,coins\n,gems,1\nBob,gems,lots\n')
+    assert rows == [('Steve', 'gems', 10.0)]
+    assert errors == ["Line 2: expected 3 columns, got 2", "Line 3: missing player", "Line 4: invalid delta 'lots'"]
+
+def test_normalize_uuid():
+    assert normalize_uuid('069A79F444E94726A5BEFCA90E38AAF5') == '069a79f4-44e9-4726-a5be-fca90e38aaf5'
+    assert normalize_uuid('069a79f4-44e9-4726-a5be-fca90e38aaf5') == '069a79f4-44e9-4726-a5be-fca90e38aaf5'
+
+def test_uuids_in_any_form_are_found(database):
+    db, players = database
+    stored = players[0]['uuid']
+    rows = [
+        (stored.upper(), 'gems', 5.0),
+        (stored.replace('-', ''), 'gems', 5.0),
+        (players[1]['name'], 'coins', 1.0),
+    ]
+    before = asyncio.run(db.get_player_by_uuid(stored))
+    results = asyncio.run(db.bulk_update_currency(rows))
+    assert [r['success'] for r in results] == [True, True, True], [r['message'] for r in results]
+    assert {r['uuid'] for r in results[:2]} == {stored}
+    assert results[1]['new_balance'] == before.gems + 10
+    assert asyncio.run(db.get_player_by_uuid(stored)).gems == before.gems + 10
+
+def test_running_balance_rejects_overdraft(database):
+    db, players = database
+    player = asyncio.run(db.get_player_by_uuid(players[2]['uuid']))
+    rows = [(player.uuid, 'gems', -player.gems), (player.uuid, 'gems', -1.0), (player.uuid, 'stars', 1.0)]
+    results = asyncio.run(db.bulk_update_currency(rows))
+    assert [r['success'] for r in results] == [True, False, False]
+    assert results[1]['message'].startswith("Insufficient balance. Current: 0.00")
+    assert asyncio.run(db.get_player_by_uuid(player.uuid)).gems == 0
@@ -0,0 +1,71 @@
+"""
+Leaderboard Tests for Economy Manager Bot
+Version: 0.5.0
+Incremental updates checked against a full sort
+"""
+
+import random
+
+from bot.database.models import Player, PlayerTable
+from bot.utils.leaderboard import Leaderboard
+
+def make_table(count: int, seed: int = 3) -> PlayerTable:
+    rng = random.Random(seed)
+    return PlayerTable.from_players(
+        Player(i + 1, f"uuid-{i}", f"Player{i}", float(rng.randint(0, 500)), float(rng.randint(0, 50)))
+        for i in range(count)
+    )
+
+def ranking(table: PlayerTable, currency: str, size: int):
+    """Reference: sort the whole table."""
+    balances = getattr(table, currency)
+    order = sorted(range(len(table)), key=lambda i: (-balances[i], table.ids[i]))[:size]
+    return [(rank + 1, table.uuids[i], balances[i]) for rank, i in enumerate(order)]
+
+def test_build_matches_full_sort():
+    table = make_table(300)
+    board = Leaderboard('gems', size=20)
+    board.build(table)
+    assert board.page(0, 20) == ranking(table, 'gems', 20)
+    assert board.page(15, 10) == ranking(table, 'gems', 20)[15:]
+    assert len(board) == 20 and not board.needs_rebuild
+
+def test_ties_are_broken_by_id():
+    table = PlayerTable.from_players(Player(i, f"u{i}", f"P{i}", 0.0, 5.0) for i in (3, 1, 2))
+    board = Leaderboard('coins', size=3)
+    board.build(table)
+    assert [uuid for _, uuid, _ in board.page()] == ['u1', 'u2', 'u3']
+
+def test_updates_match_full_sort():
+    rng = random.Random(11)
+    table = make_table(400)
+    board = Leaderboard('gems', size=25, slack=5)
+    board.build(table)
+    for step in range(3000):
+        index = rng.randrange(len(table))
+        player = table.row(index)
+        player.gems = float(rng.choice([0, rng.randint(0, 600), player.gems + rng.randint(-50, 50)]))
+        table.update(index, player)
+        board.update(player.uuid, player.id, player.gems)
+        if board.needs_rebuild:
+            board.build(table)
+        assert board.page(0, 25) == ranking(table, 'gems', 25), step
+
+def test_rank():
+    table = make_table(100)
+    board = Leaderboard('coins', size=10)
+    board.build(table)
+    expected = ranking(table, 'coins', 11)
+    assert board.rank(expected[0][1]) == 1
+    assert board.rank(expected[9][1]) == 10
+    assert board.rank(expected[10][1]) is None  # Tracked as slack, not ranked
+
+def test_drop_outs_ask_for_a_rebuild():
+    table = make_table(50)
+    board = Leaderboard('gems', size=5, slack=0)
+    board.build(table)
+    top = board.page(0, 5)
+    for _, player_uuid, _ in top:
+        index = table.uuids.index(player_uuid)
+        board.update(player_uuid, table.ids[index], -1.0)
+    assert board.needs_rebuild
@@ -0,0 +1,63 @@
+"""
+Log Sink Tests for Economy Manager Bot
+Version: 0.5.0
+Buffering until the log channel is known, batching and local spills
+"""
+
+import asyncio
+
+from bot.utils.log_sink import LogSink
+
+class FakeChannel:
+    """Records what would have been sent to Discord."""
+    
+    def __init__(self):
+        self.messages = []
+        
+    async def send(self, content=None, embed=None, embeds=None):
+        self.messages.append((content, embed, embeds))
+
+def test_entries_wait_for_the_channel():
+    async def scenario():
+        sink = LogSink(flush_interval=0.01)
+        sink.start()
+        assert sink.submit("before the channel is known")
+        assert sink.submit("second entry")
+        await asyncio.sleep(0.05)
+        assert sink.sent == 0 and sink.queue.qsize() == 1  # The worker holds the first entry
+        
+        channel = FakeChannel()
+        sink.set_channel(channel)
+        await asyncio.wait_for(sink.queue.join(), 1.0)
+        assert sink.sent == 2 and sink.dropped == 0
+        embeds = channel.messages[0][2]
+        assert len(channel.messages) == 1 and "before the channel is known" in embeds[0].description
+        await sink.stop()
+        
+    asyncio.run(scenario())
+
+def test_missing_channel_spills_to_the_local_log(caplog):
+    async def scenario():
+        sink = LogSink(flush_interval=0.01)
+        sink.start()
+        sink.submit("buffered")
+        sink.set_channel(None)
+        await asyncio.wait_for(sink.queue.join(), 1.0)
+        assert not sink.submit("after the lookup failed")
+        assert sink.dropped == 2 and sink.sent == 0
+        await sink.stop()
+        
+    with caplog.at_level('INFO', logger='economy_bot'):
+        asyncio.run(scenario())
+    spilled = [r.getMessage() for r in caplog.records if 'Unsent log channel entry' in r.getMessage()]
+    assert len(spilled) == 2 and spilled[0].endswith("buffered")
+
+def test_stop_spills_entries_when_the_channel_never_resolved():
+    async def scenario():
+        sink = LogSink(flush_interval=0.01)
+        sink.start()
+        sink.submit("pending")
+        await asyncio.wait_for(sink.stop(timeout=1.0), 2.0)
+        assert sink.dropped == 1 and sink.queue.qsize() == 0
+        
+    asyncio.run(scenario())
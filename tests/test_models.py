@@ -0,0 +1,53 @@
+"""
+Player Model Tests for Economy Manager Bot
+Version: 0.5.0
+Player records and the columnar PlayerTable
+"""
+
+import pytest
+
+from bot.database.models import PLAYER_COLUMNS, Player, PlayerTable
+
+ROWS = [
+    (3, 'u3', 'charlie', 1.5, 10.0, 300),
+    (1, 'u1', 'Bravo', 2.0, 0.0, 100),
+    (2, 'u2', 'alpha', 0.0, 5.0, 200),
+    (4, 'u4', 'bravo', 7.0, 1.0, None),
+]
+
+def test_player_from_row_and_dict_access():
+    player = Player.from_row(ROWS[0])
+    assert player.to_dict() == dict(zip(PLAYER_COLUMNS, ROWS[0]))
+    assert player['gems'] == 1.5 and player.get('missing', 'x') == 'x'
+    assert player.sort_key == ('charlie', 3)
+    assert Player.from_row(None) is None
+
+def test_table_round_trips_rows():
+    table = PlayerTable.from_rows(ROWS)
+    assert len(table) == 4
+    assert table[0] == Player(*ROWS[0])
+    assert table[-1].last_online == 0  # NULL becomes 0
+    assert [p.uuid for p in table[1:3]] == ['u1', 'u2']
+    assert list(table) == table[:]
+    with pytest.raises(IndexError):
+        table[4]
+
+def test_sorted_by_name_and_bisect():
+    table = PlayerTable.from_rows(ROWS).sorted_by_name()
+    assert table.uuids == ['u2', 'u1', 'u4', 'u3']  # Case-insensitive, then id
+    assert table.bisect(('bravo', 1)) == 1
+    assert table.bisect(('bravo', 2)) == 2
+    assert table.bisect(('bravo', 5)) == 3
+    table.insert(table.bisect(('beta', 9)), Player(9, 'u9', 'Beta'))
+    assert table.uuids == ['u2', 'u9', 'u1', 'u4', 'u3']
+    assert table.uuid_positions()['u4'] == 3
+
+def test_copy_and_take_are_independent():
+    table = PlayerTable.from_rows(ROWS)
+    copy = table.copy()
+    copy.update(0, Player(3, 'u3', 'charlie', 99.0, 10.0, 300))
+    del copy[1]
+    assert table[0].gems == 1.5 and len(table) == 4
+    assert len(copy) == 3 and copy[0].gems == 99.0
+    subset = table.take([2, 0])
+    assert subset.uuids == ['u2', 'u3'] and list(subset.gems) == [0.0, 1.5]
@@ -0,0 +1,84 @@
+"""
+Player Directory Tests for Economy Manager Bot
+Version: 0.5.0
+Incremental refreshes over the SQLite stand-in
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.sqlite_backend import attach_pool, seed_database
+from bot.database.db_manager import DatabaseManager
+from bot.database.player_directory import PlayerDirectory
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 2000)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=2)
+    attach_pool(db, path)
+    yield db, players
+    asyncio.run(db.close())
+
+def test_update_by_name_reloads_only_that_player(database):
+    db, players = database
+    
+    async def scenario():
+        directory = PlayerDirectory(db, refresh_interval=3600)
+        await directory.refresh()
+        loaded_at = directory._loaded_at
+        player = directory.get_cached(players[5]['uuid'])
+        
+        success, message = await db.update_currency_by_name(player.name, 'gems', 25, 'add')
+        assert success, message
+        # What ConfirmationView does when it only knows the name
+        directory.invalidate((await db.get_player_by_name(player.name)).uuid)
+        await directory.refresh()
+        
+        assert directory._loaded_at == loaded_at  # No full reload
+        assert directory.get_cached(player.uuid).gems == player.gems + 25
+        
+    asyncio.run(scenario())
+
+def test_failed_update_messages(database):
+    db, players = database
+    
+    async def scenario():
+        player = await db.get_player_by_uuid(players[0]['uuid'])
+        success, message = await db.update_currency_by_uuid(player.uuid, 'gems', player.gems + 1, 'remove')
+        assert not success
+        assert message == f"Insufficient balance. Current: {player.gems:.2f}, Trying to remove: {player.gems + 1:.2f}"
+        assert await db.update_currency_by_name('nobody-here', 'gems', 1, 'add') == (False, "Player not found.")
+        
+    asyncio.run(scenario())
+
+def test_bulk_invalidation_is_batched(database):
+    db, players = database
+    
+    async def scenario():
+        directory = PlayerDirectory(db, refresh_interval=3600)
+        await directory.refresh()
+        loaded_at = directory._loaded_at
+        rows = [(p['uuid'], 'coins', 3.0) for p in players[:1500]]
+        results = await db.bulk_update_currency(rows)
+        assert all(r['success'] for r in results)
+        
+        calls = []
+        original = db.get_players_by_uuids
+        
+        async def counted(uuids, table_name='coinsengine_users'):
+            calls.append(len(uuids))
+            return await original(uuids, table_name)
+            
+        db.get_players_by_uuids = counted
+        for r in results:
+            directory.invalidate(r['uuid'])
+        await directory.refresh()
+        
+        assert directory._loaded_at == loaded_at
+        assert len(calls) == 1  # One batched read (players seen by the watermark query are skipped)
+        for r in results[:50]:
+            assert directory.get_cached(r['uuid']).coins == r['new_balance']
+            
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+"""
+Connection Pool Tests for Economy Manager Bot
+Version: 0.5.0
+Overflow, checkout timeouts, recycling and validation
+"""
+
+import time
+
+import pytest
+
+from bot.database import pool as pool_module
+from bot.database.pool import ConnectionPool, PoolClosedError, PoolTimeoutError
+
+class FakeConnection:
+    """Stands in for a mysql.connector connection."""
+    
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+        self.in_transaction = False
+        self.rollbacks = 0
+        
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+            
+    def rollback(self):
+        self.rollbacks += 1
+        
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def opened():
+    return []
+
+@pytest.fixture
+def make_pool(opened):
+    def factory():
+        opened.append(FakeConnection())
+        return opened[-1]
+        
+    def make(**kwargs):
+        kwargs.setdefault('timeout', 0.05)
+        return ConnectionPool(factory, **kwargs)
+    return make
+
+def test_overflow_connections_close_on_return(make_pool, opened):
+    pool = make_pool(pool_size=1, max_overflow=1)
+    first, second = pool.get_connection(), pool.get_connection()
+    assert pool.checked_out == 2 and len(opened) == 2
+    with pytest.raises(PoolTimeoutError):
+        pool.get_connection()
+        
+    second.close()
+    assert opened[1].closed and pool.idle == 0  # Over pool_size: not kept
+    first.close()
+    assert not opened[0].closed and pool.idle == 1
+    
+    again = pool.get_connection()
+    assert again._record.raw is opened[0] and len(opened) == 2
+    again.close()
+    second.close()  # Closing twice is harmless
+    assert pool.checked_out == 0
+
+def test_returned_connection_is_rolled_back_if_in_transaction(make_pool, opened):
+    pool = make_pool(pool_size=1)
+    connection = pool.get_connection()
+    connection.close()
+    assert opened[0].rollbacks == 0
+    connection = pool.get_connection()
+    opened[0].in_transaction = True
+    connection.close()
+    assert opened[0].rollbacks == 1
+
+def test_old_connections_are_recycled(make_pool, opened):
+    pool = make_pool(pool_size=1, recycle=0.01)
+    pool.get_connection().close()
+    time.sleep(0.02)
+    connection = pool.get_connection()
+    assert len(opened) == 2 and opened[0].closed
+    assert connection._record.raw is opened[1]
+
+def test_dead_idle_connections_are_replaced(make_pool, opened, monkeypatch):
+    monkeypatch.setattr(pool_module, 'PING_IDLE_SECONDS', 0.0)
+    pool = make_pool(pool_size=1)
+    pool.get_connection().close()
+    opened[0].alive = False
+    connection = pool.get_connection()
+    assert connection._record.raw is opened[1] and opened[0].closed
+    assert pool.reconnects == 1
+
+def test_invalidated_connections_are_discarded(make_pool, opened):
+    pool = make_pool(pool_size=2)
+    connection = pool.get_connection()
+    connection.invalidate()
+    connection.close()
+    assert opened[0].closed and pool.idle == 0 and pool.reconnects == 1
+
+def test_closed_pool_refuses_checkouts(make_pool, opened):
+    pool = make_pool(pool_size=2)
+    pool.get_connection().close()
+    held = pool.get_connection()
+    assert pool.close(timeout=0.01) == 1  # Still checked out
+    with pytest.raises(PoolClosedError):
+        pool.get_connection()
+    held.close()
+    assert all(c.closed for c in opened)
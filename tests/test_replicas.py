@@ -0,0 +1,79 @@
+"""
+Read Replica Tests for Economy Manager Bot
+Version: 0.5.0
+Read routing and primary fallback over the SQLite stand-in
+"""
+
+import asyncio
+import time
+
+import pytest
+from mysql.connector import errors
+
+from benchmarks.sqlite_backend import SQLiteConnection, attach_pool, seed_database
+from bot.database.db_manager import DatabaseManager
+from bot.database.pool import ConnectionPool
+from bot.database.replicas import Replica
+from bot.database.scheduler import Lane, WorkScheduler
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 20)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=2)
+    attach_pool(db, path)
+    yield db, players, path
+    asyncio.run(db.close())
+
+def add_replica(db: DatabaseManager, factory, name: str, max_queue: int = 100) -> Replica:
+    """Attach a replica that counts as caught up until its next lag check."""
+    replica = Replica(ConnectionPool(factory, pool_size=1, name=name),
+                      WorkScheduler(name, 1, max_queue=max_queue))
+    replica.record_lag(0.0)
+    db.replicas.append(replica)
+    return replica
+
+def test_reads_use_a_caught_up_replica(database):
+    db, players, path = database
+    replica = add_replica(db, lambda: SQLiteConnection(path), 'test-replica-reads')
+    
+    async def scenario():
+        player = await db.get_player_by_uuid(players[0]['uuid'])
+        assert player.uuid == players[0]['uuid']
+        assert replica.pool.idle == 1  # The replica answered
+        
+    asyncio.run(scenario())
+
+def test_overloaded_replica_falls_back_without_leaving_rotation(database):
+    db, players, path = database
+    replica = add_replica(db, lambda: SQLiteConnection(path), 'test-replica-busy', max_queue=1)
+    
+    async def scenario():
+        await replica.scheduler.acquire(Lane.LOOKUP)
+        queued = asyncio.create_task(replica.scheduler.acquire(Lane.LOOKUP))
+        await asyncio.sleep(0)
+        
+        player = await db.get_player_by_uuid(players[0]['uuid'])
+        assert player.uuid == players[0]['uuid']  # Answered by the primary
+        assert replica.pool.idle == 0 and replica.usable(db.replica_max_lag)
+        
+        replica.scheduler.release(Lane.LOOKUP)
+        await queued
+        replica.scheduler.release(Lane.LOOKUP)
+        
+    asyncio.run(scenario())
+
+def test_unreachable_replica_is_taken_out_of_rotation(database):
+    db, players, path = database
+    
+    def refuse():
+        raise errors.InterfaceError("Can't connect to MySQL server")
+        
+    replica = add_replica(db, refuse, 'test-replica-down')
+    
+    async def scenario():
+        player = await db.get_player_by_uuid(players[0]['uuid'])
+        assert player.uuid == players[0]['uuid']
+        assert not replica.usable(db.replica_max_lag) and replica.failed_until > time.monotonic()
+        
+    asyncio.run(scenario())
@@ -0,0 +1,131 @@
+"""
+Snapshot Restore Tests for Economy Manager Bot
+Version: 0.5.0
+Snapshot parsing and restore counts over the SQLite stand-in
+"""
+
+import asyncio
+import gzip
+import json
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from benchmarks.sqlite_backend import SQLiteConnection, attach_pool, seed_database
+from bot.database.db_manager import DatabaseManager
+from bot.database.pool import ConnectionPool
+from bot.database.replicas import Replica
+from bot.database.scheduler import WorkScheduler
+from bot.utils.restore import iter_snapshot, restore_snapshot, snapshot_format
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 50)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=2)
+    attach_pool(db, path)
+    yield db, players
+    asyncio.run(db.close())
+
+def read_all(path: Path, chunk_size: int = 1000):
+    errors = []
+    chunks = list(iter_snapshot(path, errors.append, chunk_size))
+    return chunks, errors
+
+def test_snapshot_format():
+    assert snapshot_format(Path('economy_main_20250101_120000.jsonl.gz')) == 'jsonl'
+    assert snapshot_format(Path('Economy.CSV')) == 'csv'
+    with pytest.raises(ValueError):
+        snapshot_format(Path('economy.txt'))
+
+def test_csv_snapshot_is_parsed_in_chunks(tmp_path):
+    path = tmp_path / 'economy.csv'
+    path.write_text(
+        "uuid,name,gems,coins\n"
+        "069A79F444E94726A5BEFCA90E38AAF5,Notch,10,20.5\n"
+        "not-a-uuid,Bad,1,1\n"
+        "853c80ef-3c37-49fd-aa49-938b674adae6,jeb_,-1,0\n"
+        "61699b2e-d327-4a01-9f1e-0ea8c3f06bc6,Dinnerbone,3,abc\n"
+        "61699b2e-d327-4a01-9f1e-0ea8c3f06bc6,Dinnerbone,3,4\n"
+        "853c80ef-3c37-49fd-aa49-938b674adae6,jeb_,0,0\n",
+        encoding='utf-8'
+    )
+    chunks, errors = read_all(path, chunk_size=2)
+    assert chunks == [
+        [('069a79f4-44e9-4726-a5be-fca90e38aaf5', 10.0, 20.5), ('61699b2e-d327-4a01-9f1e-0ea8c3f06bc6', 3.0, 4.0)],
+        [('853c80ef-3c37-49fd-aa49-938b674adae6', 0.0, 0.0)],
+    ]
+    assert errors == ["Line 3: invalid UUID 'not-a-uuid'", "Line 4: negative balance",
+                      "Line 5: could not convert string to float: 'abc'"]
+
+def test_csv_snapshot_needs_balance_columns(tmp_path):
+    path = tmp_path / 'economy.csv'
+    path.write_text("uuid,gems\n069a79f4-44e9-4726-a5be-fca90e38aaf5,1\n", encoding='utf-8')
+    with pytest.raises(ValueError, match='coins'):
+        read_all(path)
+
+def test_gzip_jsonl_snapshot(tmp_path):
+    path = tmp_path / 'economy.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as handle:
+        handle.write(json.dumps({'uuid': '069a79f4-44e9-4726-a5be-fca90e38aaf5', 'gems': 1, 'coins': 2}) + "\n\n")
+        handle.write(json.dumps({'uuid': '853c80ef-3c37-49fd-aa49-938b674adae6', 'gems': 1}) + "\n")
+        handle.write("{broken\n")
+    chunks, errors = read_all(path)
+    assert chunks == [[('069a79f4-44e9-4726-a5be-fca90e38aaf5', 1.0, 2.0)]]
+    assert len(errors) == 2 and errors[0] == "Line 3: 'coins'" and errors[1].startswith("Line 4: ")
+
+def test_duplicates_are_not_counted_as_unchanged(database, tmp_path):
+    db, players = database
+    
+    async def scenario():
+        current = {p.uuid: p for p in await db.get_players_by_uuids([p['uuid'] for p in players[:3]])}
+        first, second, third = (current[p['uuid']] for p in players[:3])
+        path = tmp_path / 'economy.csv'
+        path.write_text(
+            "uuid,gems,coins\n"
+            f"{first.uuid},{first.gems + 1},{first.coins}\n"
+            f"{first.uuid.upper()},{first.gems + 2},{first.coins}\n"  # Replaces the row above
+            f"{second.uuid},{second.gems},{second.coins}\n"
+            f"{second.uuid},{second.gems},{second.coins}\n"
+            f"{third.uuid},{third.gems},{third.coins}\n"
+            "00000000-0000-4000-8000-000000000000,1,1\n",
+            encoding='utf-8'
+        )
+        
+        report = await restore_snapshot(db, path)
+        assert (report.rows, report.duplicates, report.changed, report.unchanged, report.missing) == (6, 2, 1, 2, 1)
+        assert report.net == {'gems': 2.0, 'coins': 0.0}
+        
+        report = await restore_snapshot(db, path, apply=True)
+        assert report.changed == 1 and report.unchanged == 2
+        assert (await db.get_player_by_uuid(first.uuid, fresh=True)).gems == first.gems + 2
+        assert (await restore_snapshot(db, path)).changed == 0
+        
+    asyncio.run(scenario())
+
+def test_dry_run_ignores_lagging_replicas(database, tmp_path):
+    db, players = database
+    # A replica still holding the balances from before the edit below
+    stale = str(tmp_path / 'replica.db')
+    shutil.copy(tmp_path / 'economy.db', stale)
+    replica = Replica(ConnectionPool(lambda: SQLiteConnection(stale), pool_size=1, name='test-restore-replica'),
+                      WorkScheduler('test-restore-replica', 1))
+    replica.record_lag(0.0)
+    db.replicas.append(replica)
+    
+    connection = sqlite3.connect(tmp_path / 'economy.db')
+    connection.execute("UPDATE coinsengine_users SET gems = 12345 WHERE uuid = ?", (players[0]['uuid'],))
+    connection.commit()
+    connection.close()
+    path = tmp_path / 'economy.jsonl'
+    
+    async def scenario():
+        coins = (await db.get_player_by_uuid(players[0]['uuid'], fresh=True)).coins
+        path.write_text(json.dumps({'uuid': players[0]['uuid'], 'gems': 12345, 'coins': coins}) + "\n",
+                        encoding='utf-8')
+        report = await restore_snapshot(db, path)
+        assert (report.changed, report.unchanged) == (0, 1)  # The replica would have shown a change
+        
+    asyncio.run(scenario())
@@ -0,0 +1,117 @@
+"""
+Work Scheduler Tests for Economy Manager Bot
+Version: 0.5.0
+Lane priority, load shedding and single-flight reads
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.sqlite_backend import attach_pool, seed_database
+from bot.database.db_manager import DatabaseManager
+from bot.database.scheduler import DatabaseOverloadedError, Lane, WorkScheduler
+
+async def run_in(scheduler: WorkScheduler, lane: Lane, name: str, order: list):
+    await scheduler.acquire(lane)
+    order.append(name)
+    scheduler.release(lane)
+
+def test_waiters_start_by_lane_then_arrival():
+    async def scenario():
+        scheduler = WorkScheduler('test-priority', capacity=1)
+        await scheduler.acquire(Lane.WRITE)
+        order = []
+        tasks = [asyncio.create_task(run_in(scheduler, lane, name, order)) for lane, name in (
+            (Lane.BULK, 'scan'), (Lane.LOOKUP, 'lookup 1'), (Lane.WRITE, 'write'), (Lane.LOOKUP, 'lookup 2'),
+        )]
+        await asyncio.sleep(0)
+        assert scheduler.queued() == {'write': 1, 'lookup': 2, 'bulk': 1}
+        
+        scheduler.release(Lane.WRITE)
+        await asyncio.gather(*tasks)
+        assert order == ['write', 'lookup 1', 'lookup 2', 'scan']
+        assert scheduler.active == 0 and scheduler.waiting == 0
+        
+    asyncio.run(scenario())
+
+def test_bulk_work_leaves_a_slot_free():
+    async def scenario():
+        scheduler = WorkScheduler('test-bulk-limit', capacity=3)
+        assert scheduler.bulk_limit == 2
+        await scheduler.acquire(Lane.BULK)
+        await scheduler.acquire(Lane.BULK)
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.acquire(Lane.BULK, timeout=0.01)
+        await asyncio.wait_for(scheduler.acquire(Lane.LOOKUP), 0.1)  # Not held up by the bulk waiter
+        assert scheduler.waiting == 0
+        
+    asyncio.run(scenario())
+
+def test_deep_queues_shed_reads_before_writes():
+    async def scenario():
+        scheduler = WorkScheduler('test-shed', capacity=1, max_queue=2)
+        await scheduler.acquire(Lane.WRITE)
+        order = []
+        tasks = [asyncio.create_task(run_in(scheduler, Lane.LOOKUP, f"lookup {i}", order)) for i in range(2)]
+        await asyncio.sleep(0)
+        
+        with pytest.raises(DatabaseOverloadedError):
+            await scheduler.acquire(Lane.LOOKUP)
+        with pytest.raises(DatabaseOverloadedError):
+            await scheduler.acquire(Lane.BULK)
+        # Writes only count waiting writes
+        tasks.append(asyncio.create_task(run_in(scheduler, Lane.WRITE, 'write', order)))
+        await asyncio.sleep(0)
+        assert scheduler.queued() == {'write': 1, 'lookup': 2, 'bulk': 0}
+        
+        scheduler.release(Lane.WRITE)
+        await asyncio.gather(*tasks)
+        assert order == ['write', 'lookup 0', 'lookup 1']
+        
+    asyncio.run(scenario())
+
+def test_cancelled_waiters_are_not_counted():
+    async def scenario():
+        scheduler = WorkScheduler('test-cancelled', capacity=1, max_queue=1)
+        await scheduler.acquire(Lane.LOOKUP)
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.acquire(Lane.LOOKUP, timeout=0.01)
+        # A waiter cancelled before it could unqueue itself
+        abandoned = asyncio.get_running_loop().create_future()
+        abandoned.cancel()
+        scheduler._waiters[Lane.WRITE].append(abandoned)
+        assert scheduler.waiting == 0 and scheduler.queued()['write'] == 0
+        
+        scheduler.release(Lane.LOOKUP)
+        await asyncio.wait_for(scheduler.acquire(Lane.LOOKUP), 0.1)  # Fast path, nothing is really queued
+        assert scheduler.active == 1 and not scheduler._waiters[Lane.WRITE]
+        
+    asyncio.run(scenario())
+
+def test_identical_reads_share_one_query(tmp_path):
+    path = str(tmp_path / 'economy.db')
+    players = seed_database(path, 20)
+    db = DatabaseManager('localhost', 3306, 'test', '', 'test', pool_size=2)
+    attach_pool(db, path)
+    queries = []
+    read_once = db._read_once
+    
+    async def counted(func, args, kwargs):
+        queries.append(args)
+        return await read_once(func, args, kwargs)
+        
+    db._read_once = counted
+    
+    async def scenario():
+        first, second = players[0]['uuid'], players[1]['uuid']
+        results = await asyncio.gather(*(db.get_player_by_uuid(u) for u in [first] * 5 + [second] * 3))
+        assert [p.uuid for p in results] == [first] * 5 + [second] * 3
+        assert len(queries) == 2
+        assert results[0] is results[4]  # Shared, not copied
+        
+        await db.get_player_by_uuid(first)
+        assert len(queries) == 3  # Nothing in flight any more
+        await db.close()
+        
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+"""
+Search Index Tests for Economy Manager Bot
+Version: 0.5.0
+The index must return exactly what scoring every name with fuzzy_match_score does
+"""
+
+import random
+import string
+
+import pytest
+
+from bot.utils.search_index import MATCH_THRESHOLD, PlayerSearchIndex, fuzzy_match_score
+
+def make_corpus(count: int = 3000, seed: int = 11):
+    """Deterministic (uuid, name) pairs with shared stems, repeats, digits and underscores."""
+    rng = random.Random(seed)
+    stems = ['steve', 'alex', 'notch', 'dragon', 'shadow', 'miner', 'craft', 'pvp', 'xx', 'qwerty']
+    players = []
+    for i in range(count):
+        style = rng.random()
+        if style < 0.5:
+            name = rng.choice(stems) + rng.choice(['', '_', '']) + str(rng.randint(0, 999))
+        elif style < 0.8:
+            name = ''.join(rng.choice(string.ascii_letters + '_') for _ in range(rng.randint(3, 16)))
+        else:
+            name = rng.choice(stems).capitalize() + rng.choice(stems)
+        players.append((f"uuid-{i:05d}", name[:16]))
+    return players
+
+def linear_search(players, query, limit=None):
+    """Reference: score every name, keep scores above the threshold, best first, ties in name order."""
+    scored = []
+    for player_uuid, name in players:
+        score = fuzzy_match_score(query, name)
+        if score > MATCH_THRESHOLD:
+            scored.append((-score, name.lower(), player_uuid))
+    scored.sort()
+    return [(-score, player_uuid) for score, _, player_uuid in scored][:limit]
+
+PLAYERS = make_corpus()
+QUERIES = ['steve', 'Steve12', 'stv', 'xx', 'x', 'dragonshadow', 'shadwo', 'notch_5', 'qwertyuiop',
+           'a', 'zz', 'minre', 'CRAFT', 'pvp_9', 'abcdefghijklmnop', 'ALEX', PLAYERS[42][1], PLAYERS[7][1]]
+
+@pytest.fixture(scope='module')
+def index():
+    return PlayerSearchIndex(PLAYERS)
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_unlimited_results_match_linear_scan(index, query):
+    assert index.search(query) == linear_search(PLAYERS, query)
+
+@pytest.mark.parametrize('limit', [1, 5, 25, 500])
+@pytest.mark.parametrize('query', QUERIES)
+def test_limited_results_are_the_linear_top(index, query, limit):
+    assert index.search(query, limit=limit) == linear_search(PLAYERS, query, limit)
+
+def test_fuzzy_scores_above_contains_rank_first():
+    # 20/22 = 0.909: a near miss outranks names that merely contain the query
+    players = [('a', 'abcdefghijx'), ('b', 'zabcdefghijk'), ('c', 'abcdefghijk')]
+    index = PlayerSearchIndex(players)
+    query = 'abcdefghijk'
+    assert [u for _, u in index.search(query)] == ['c', 'a', 'b']
+    assert index.search(query) == linear_search(players, query)
+
+def test_updates_and_removals():
+    index = PlayerSearchIndex(PLAYERS[:500])
+    players = dict(PLAYERS[:500])
+    index.upsert('uuid-00003', 'DragonSlayer')
+    players['uuid-00003'] = 'DragonSlayer'
+    index.upsert('new-player', 'steve_new')
+    players['new-player'] = 'steve_new'
+    index.remove('uuid-00010')
+    del players['uuid-00010']
+    for query in ('dragonslayer', 'steve', 'stev_new', PLAYERS[10][1]):
+        assert index.search(query) == linear_search(sorted(players.items(), key=lambda p: p[1].lower()), query)
+    assert len(index) == len(players)
+
+def test_prefix_in_name_order():
+    index = PlayerSearchIndex([('1', 'Steve'), ('2', 'stevenson'), ('3', 'Alex'), ('4', 'STEVE2')])
+    assert index.prefix('ste') == ['1', '4', '2']
+    assert index.prefix('ste', limit=1) == ['1']
+
+def test_blank_query():
+    assert PlayerSearchIndex(PLAYERS[:10]).search('   ') == []